@@ -12,9 +12,9 @@ from app.models.user import User
 from app.models.organizer import OrganizationDetails
 from app.models.organizer.tournament import Tournament, TournamentDetails, TournamentPayment, TournamentEnrollment
 from app.models.organizer.fixture import FixtureRound, Match, PlayingXI
-from app.models.organizer.match_score import MatchScore, BallByBall, PlayerMatchStats
+from app.models.organizer.match_score import MatchScore, BallByBall, InningsOver, PlayerMatchStats
 from app.models.club import Club
-from app.models.player import PlayerProfile
+from app.models.player import PlayerProfile, PlayerCareerStats
 from app.models.club_player import ClubPlayer
 from app.models.club_player_invitation import ClubPlayerInvitation
 from app.models.admin.plan_pricing import TournamentPricingPlan
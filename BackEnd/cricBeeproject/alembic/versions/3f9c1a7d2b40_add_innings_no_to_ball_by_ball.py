@@ -0,0 +1,66 @@
+"""add innings_no to ball_by_ball
+
+Revision ID: 3f9c1a7d2b40
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1a7d2b40'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('ball_by_ball'):
+        # Fresh database: the app's create_all builds the table with the column and indexes
+        return
+
+    columns = {column['name'] for column in inspector.get_columns('ball_by_ball')}
+    if 'innings_no' not in columns:
+        op.add_column('ball_by_ball', sa.Column('innings_no', sa.Integer(), nullable=True))
+
+        # Second innings overs were stored after the tournament's max overs (20 when unset)
+        op.execute("""
+            UPDATE ball_by_ball
+            SET innings_no = CASE
+                WHEN over_number > COALESCE((
+                    SELECT tournament_details.overs
+                    FROM matches
+                    JOIN tournament_details ON tournament_details.tournament_id = matches.tournament_id
+                    WHERE matches.id = ball_by_ball.match_id
+                ), 20) THEN 2
+                ELSE 1
+            END
+        """)
+
+        op.alter_column('ball_by_ball', 'innings_no', nullable=False, server_default='1')
+
+    indexes = {index['name'] for index in inspector.get_indexes('ball_by_ball')}
+    if 'ix_ball_by_ball_innings_position' not in indexes:
+        op.create_index(
+            'ix_ball_by_ball_innings_position', 'ball_by_ball',
+            ['match_id', 'innings_no', 'over_number', 'ball_number', 'id']
+        )
+    if 'ix_ball_by_ball_legal_balls' not in indexes:
+        op.create_index(
+            'ix_ball_by_ball_legal_balls', 'ball_by_ball',
+            ['match_id', 'innings_no', 'over_number'],
+            postgresql_where=sa.text('is_wide = false AND is_no_ball = false')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ball_by_ball_legal_balls', table_name='ball_by_ball')
+    op.drop_index('ix_ball_by_ball_innings_position', table_name='ball_by_ball')
+    op.drop_column('ball_by_ball', 'innings_no')
@@ -0,0 +1,111 @@
+"""add innings_overs
+
+Revision ID: 8b2e5d1c9a63
+Revises: 3f9c1a7d2b40
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e5d1c9a63'
+down_revision: Union[str, Sequence[str], None] = '3f9c1a7d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('ball_by_ball'):
+        # Fresh database: the app's create_all builds the table
+        return
+
+    # create_all may already have made it empty when the app started on the old schema
+    if not inspector.has_table('innings_overs'):
+        op.create_table(
+            'innings_overs',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('match_id', sa.Integer(), sa.ForeignKey('matches.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('innings_no', sa.Integer(), nullable=False),
+            sa.Column('over_number', sa.Integer(), nullable=False),
+            sa.Column('bowler_id', sa.Integer(), sa.ForeignKey('player_profiles.id', ondelete='SET NULL'), nullable=True),
+            sa.Column('deliveries', sa.Integer(), nullable=False),
+            sa.Column('legal_balls', sa.Integer(), nullable=False),
+            sa.Column('runs', sa.Integer(), nullable=False),
+            sa.Column('bowler_runs', sa.Integer(), nullable=False),
+            sa.Column('wickets', sa.Integer(), nullable=False),
+            sa.Column('extras', sa.Integer(), nullable=False),
+            sa.Column('total_runs', sa.Integer(), nullable=False),
+            sa.Column('total_wickets', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.UniqueConstraint('match_id', 'innings_no', 'over_number', name='uq_innings_over'),
+        )
+        op.create_index('ix_innings_overs_id', 'innings_overs', ['id'])
+
+    # Rebuilt from ball_by_ball; second innings overs are renumbered from 1
+    op.execute("DELETE FROM innings_overs")
+    op.execute("""
+        INSERT INTO innings_overs (
+            match_id, innings_no, over_number, bowler_id, deliveries, legal_balls, runs,
+            bowler_runs, wickets, extras, total_runs, total_wickets, updated_at
+        )
+        SELECT
+            o.match_id,
+            o.innings_no,
+            o.over_number - CASE WHEN o.innings_no = 2 THEN COALESCE((
+                SELECT tournament_details.overs
+                FROM matches
+                JOIN tournament_details ON tournament_details.tournament_id = matches.tournament_id
+                WHERE matches.id = o.match_id
+            ), 20) ELSE 0 END,
+            (SELECT ball_by_ball.bowler_id FROM ball_by_ball WHERE ball_by_ball.id = o.first_ball_id),
+            o.deliveries,
+            o.legal_balls,
+            o.runs,
+            o.bowler_runs,
+            o.wickets,
+            o.extras,
+            SUM(o.runs) OVER (PARTITION BY o.match_id, o.innings_no ORDER BY o.over_number),
+            SUM(o.wickets) OVER (PARTITION BY o.match_id, o.innings_no ORDER BY o.over_number),
+            CURRENT_TIMESTAMP
+        FROM (
+            SELECT
+                match_id,
+                innings_no,
+                over_number,
+                MIN(id) AS first_ball_id,
+                COUNT(*) AS deliveries,
+                SUM(CASE WHEN is_wide OR is_no_ball THEN 0 ELSE 1 END) AS legal_balls,
+                SUM(runs) AS runs,
+                SUM(CASE WHEN is_bye OR is_leg_bye THEN 0 ELSE runs END) AS bowler_runs,
+                SUM(CASE WHEN is_wicket THEN 1 ELSE 0 END) AS wickets,
+                SUM(CASE WHEN is_wide OR is_no_ball OR is_bye OR is_leg_bye THEN runs ELSE 0 END) AS extras
+            FROM ball_by_ball
+            GROUP BY match_id, innings_no, over_number
+        ) o
+    """)
+
+    # Maidens were never counted before
+    op.execute("""
+        UPDATE player_match_stats
+        SET maidens = (
+            SELECT COUNT(*)
+            FROM innings_overs
+            WHERE innings_overs.match_id = player_match_stats.match_id
+              AND innings_overs.bowler_id = player_match_stats.player_id
+              AND innings_overs.legal_balls >= 6
+              AND innings_overs.bowler_runs = 0
+              AND innings_overs.deliveries = innings_overs.legal_balls
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_innings_overs_id', table_name='innings_overs')
+    op.drop_table('innings_overs')
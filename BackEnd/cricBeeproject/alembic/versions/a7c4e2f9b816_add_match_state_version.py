@@ -0,0 +1,33 @@
+"""add matches.state_version
+
+Revision ID: a7c4e2f9b816
+Revises: f2b8c5d7a913
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e2f9b816'
+down_revision: Union[str, Sequence[str], None] = 'f2b8c5d7a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('matches'):
+        columns = {column['name'] for column in inspector.get_columns('matches')}
+        if 'state_version' not in columns:
+            op.add_column('matches', sa.Column('state_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('matches', 'state_version')
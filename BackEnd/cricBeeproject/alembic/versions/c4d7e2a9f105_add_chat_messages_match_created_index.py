@@ -0,0 +1,38 @@
+"""add chat_messages match/created_at index
+
+Revision ID: c4d7e2a9f105
+Revises: 8b2e5d1c9a63
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e2a9f105'
+down_revision: Union[str, Sequence[str], None] = '8b2e5d1c9a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('chat_messages'):
+        # Fresh database: the app's create_all builds the table with the index
+        return
+
+    indexes = {index['name'] for index in inspector.get_indexes('chat_messages')}
+    if 'ix_chat_messages_match_created' not in indexes:
+        op.create_index(
+            'ix_chat_messages_match_created', 'chat_messages',
+            ['match_id', 'created_at', 'id']
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_messages_match_created', table_name='chat_messages')
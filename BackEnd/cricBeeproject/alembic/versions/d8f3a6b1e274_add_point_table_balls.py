@@ -0,0 +1,113 @@
+"""add point_table ball counts and matches.standings_applied
+
+Revision ID: d8f3a6b1e274
+Revises: c4d7e2a9f105
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3a6b1e274'
+down_revision: Union[str, Sequence[str], None] = 'c4d7e2a9f105'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rebuild_point_table_rows(bind) -> None:
+    # The old rows summed overs notation as decimals (three innings of 10.5 made
+    # 31.5), so they can't be converted back to balls; every tournament's rows are
+    # recomputed from match_scores instead, with the same tallies as the app
+    from app.services.organizer.point_table_service import TALLY_FIELDS, point_columns, tally_matches
+
+    matches = sa.table(
+        'matches',
+        sa.column('id'), sa.column('tournament_id'), sa.column('team_a_id'),
+        sa.column('team_b_id'), sa.column('winner_id'), sa.column('match_status'),
+        sa.column('standings_applied'),
+    )
+    match_scores = sa.table(
+        'match_scores',
+        sa.column('match_id'), sa.column('team_id'), sa.column('runs'),
+        sa.column('wickets'), sa.column('balls'), sa.column('overs'),
+    )
+    tournament_details = sa.table('tournament_details', sa.column('tournament_id'), sa.column('overs'))
+    point_table = sa.table(
+        'point_table',
+        sa.column('tournament_id'), sa.column('team_id'),
+        *[sa.column(name) for name in point_columns(dict.fromkeys(TALLY_FIELDS, 0))],
+    )
+
+    completed = bind.execute(
+        sa.select(matches.c.id, matches.c.tournament_id, matches.c.team_a_id, matches.c.team_b_id, matches.c.winner_id)
+        .where(matches.c.match_status == 'completed')
+    ).all()
+    scores = {
+        (score.match_id, score.team_id): score
+        for score in bind.execute(
+            sa.select(match_scores).where(match_scores.c.match_id.in_(
+                sa.select(matches.c.id).where(matches.c.match_status == 'completed')
+            ))
+        ).all()
+    }
+    max_overs = dict(bind.execute(sa.select(tournament_details.c.tournament_id, tournament_details.c.overs)).all())
+
+    by_tournament = {}
+    for match in completed:
+        by_tournament.setdefault(match.tournament_id, []).append(match)
+    existing = set(bind.execute(sa.select(point_table.c.tournament_id, point_table.c.team_id)).all())
+
+    counted = []
+    for tournament_id in sorted({tournament_id for tournament_id, _ in existing} | set(by_tournament)):
+        tournament_counted, totals_by_team = tally_matches(
+            by_tournament.get(tournament_id, []), scores, max_overs.get(tournament_id)
+        )
+        counted.extend(tournament_counted)
+        team_ids = {team_id for row_tournament_id, team_id in existing if row_tournament_id == tournament_id}
+        for team_id in sorted(team_ids | set(totals_by_team)):
+            values = point_columns(totals_by_team.get(team_id, dict.fromkeys(TALLY_FIELDS, 0)))
+            if (tournament_id, team_id) in existing:
+                bind.execute(
+                    point_table.update().where(
+                        point_table.c.tournament_id == tournament_id,
+                        point_table.c.team_id == team_id
+                    ).values(**values)
+                )
+            else:
+                bind.execute(point_table.insert().values(tournament_id=tournament_id, team_id=team_id, **values))
+
+    # Exactly the matches now in the rows count as applied
+    bind.execute(matches.update().values(standings_applied=False))
+    if counted:
+        bind.execute(matches.update().where(matches.c.id.in_(counted)).values(standings_applied=True))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if inspector.has_table('point_table'):
+        columns = {column['name'] for column in inspector.get_columns('point_table')}
+        for name in ('balls_faced', 'balls_bowled'):
+            if name not in columns:
+                op.add_column('point_table', sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+
+    if inspector.has_table('matches'):
+        columns = {column['name'] for column in inspector.get_columns('matches')}
+        if 'standings_applied' not in columns:
+            op.add_column('matches', sa.Column('standings_applied', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    if inspector.has_table('point_table') and inspector.has_table('match_scores'):
+        _rebuild_point_table_rows(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('matches', 'standings_applied')
+    op.drop_column('point_table', 'balls_bowled')
+    op.drop_column('point_table', 'balls_faced')
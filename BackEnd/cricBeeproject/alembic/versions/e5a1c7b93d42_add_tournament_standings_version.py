@@ -0,0 +1,33 @@
+"""add tournaments.standings_version
+
+Revision ID: e5a1c7b93d42
+Revises: d8f3a6b1e274
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c7b93d42'
+down_revision: Union[str, Sequence[str], None] = 'd8f3a6b1e274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('tournaments'):
+        columns = {column['name'] for column in inspector.get_columns('tournaments')}
+        if 'standings_version' not in columns:
+            op.add_column('tournaments', sa.Column('standings_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tournaments', 'standings_version')
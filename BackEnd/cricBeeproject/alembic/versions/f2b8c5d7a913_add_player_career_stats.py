@@ -0,0 +1,64 @@
+"""add player_career_stats and matches.career_stats_applied
+
+Revision ID: f2b8c5d7a913
+Revises: e5a1c7b93d42
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8c5d7a913'
+down_revision: Union[str, Sequence[str], None] = 'e5a1c7b93d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('matches'):
+        columns = {column['name'] for column in inspector.get_columns('matches')}
+        if 'career_stats_applied' not in columns:
+            # Matches already completed are picked up by the career stats backfill
+            # (app.tasks.career_stats_tasks), not here
+            op.add_column('matches', sa.Column('career_stats_applied', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    if inspector.has_table('player_profiles') and not inspector.has_table('player_career_stats'):
+        counter = lambda name: sa.Column(name, sa.Integer(), nullable=False, server_default='0')
+        op.create_table(
+            'player_career_stats',
+            sa.Column('player_id', sa.Integer(), sa.ForeignKey('player_profiles.id', ondelete='CASCADE'), primary_key=True),
+            counter('matches'),
+            counter('batting_innings'),
+            counter('not_outs'),
+            counter('runs'),
+            counter('balls_faced'),
+            counter('fours'),
+            counter('sixes'),
+            counter('fifties'),
+            counter('hundreds'),
+            counter('ducks'),
+            sa.Column('highest_score', sa.Integer(), nullable=True),
+            sa.Column('highest_score_not_out', sa.Boolean(), nullable=False, server_default=sa.false()),
+            counter('bowling_innings'),
+            counter('balls_bowled'),
+            counter('maidens'),
+            counter('runs_conceded'),
+            counter('wickets'),
+            counter('five_wicket_hauls'),
+            sa.Column('best_bowling_wickets', sa.Integer(), nullable=True),
+            sa.Column('best_bowling_runs', sa.Integer(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('player_career_stats')
+    op.drop_column('matches', 'career_stats_applied')
@@ -1,53 +1,93 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import AsyncSessionLocal, get_async_db
 from app.models.user import User
+from app.models.organizer.fixture import Match
 from app.utils.admin_dependencies import get_current_user
-from app.services.chat_services import (
-    create_chat_message,
-    get_chat_messages,
-    format_chat_message_for_response
-)
+from app.services import chat_history
 from app.schemas.chat import ChatMessageCreate, ChatMessageResponse
-from app.core.websocket_manager import manager
-from typing import List
+from app.core.websocket_manager import (
+    manager, requested_topics, requested_encoding, chat_topic, score_topic, notifications_topic,
+    TOPIC_CHAT, TOPIC_SCORE, TOPIC_TICKER, TOPIC_NOTIFICATIONS
+)
+from app.services.organizer import score_feed
+from app.services.fans.live_ticker import live_ticker
+from app.services.chat_writer import chat_writer
+from typing import List, Optional
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# A stalled database only holds up the socket waiting on it, and not for longer than this
+CHAT_DB_TIMEOUT_SECONDS = 5.0
+# Messages a socket gets on connect; older ones are paged through GET /messages/{match_id}?before=
+CHAT_HISTORY_ON_CONNECT = 50
+
 
 @router.get("/messages/{match_id}", response_model=List[ChatMessageResponse])
-def get_messages(
+async def get_messages(
     match_id: int,
-    db: Session = Depends(get_db),
+    before: Optional[int] = Query(None, description="Id of the oldest message already loaded; returns the page before it"),
+    limit: int = Query(chat_history.BUFFER_SIZE, ge=1, le=chat_history.BUFFER_SIZE),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    messages = get_chat_messages(db, match_id)
-    return [format_chat_message_for_response(msg) for msg in reversed(messages)]
+    if before is None:
+        # Latest page straight from the recent-messages buffer, already encoded
+        encoded = await chat_history.get_recent_messages(match_id, limit)
+        return Response(content=f"[{','.join(encoded)}]", media_type="application/json")
+    
+    messages = await chat_history.get_messages_before(db, match_id, before, limit)
+    if messages is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return messages
 
 
 @router.post("/send", response_model=ChatMessageResponse)
 async def send_message(
     payload: ChatMessageCreate,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if not current_user.is_active:
         raise HTTPException(status_code=403, detail="User account is inactive")
+    if not await _match_exists(payload.match_id):
+        raise HTTPException(status_code=404, detail="Match not found")
     
-    chat_message = create_chat_message(
-        db=db,
+    message_data = await chat_writer.enqueue(
         user_id=current_user.id,
+        user_name=current_user.full_name,
         match_id=payload.match_id,
         message=payload.message
     )
+    await chat_history.remember_message(payload.match_id, message_data)
     
-    message_data = format_chat_message_for_response(chat_message)
-    await manager.broadcast_to_match(message_data, payload.match_id)
+    await manager.broadcast(chat_topic(payload.match_id), message_data)
     return message_data
 
 
+async def _match_exists(match_id: int) -> bool:
+    # Checked before queueing: the writer can't store a message for a match that isn't there
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(Match.id).where(Match.id == match_id)) is not None
+
+
+async def _load_chat_user(user_id: int):
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        if not user or not user.is_active:
+            return None
+        return user.id, user.full_name
+
+
 @router.websocket("/ws/{match_id}")
-async def websocket_endpoint(websocket: WebSocket, match_id: int, db: Session = Depends(get_db)):
+async def websocket_endpoint(websocket: WebSocket, match_id: int):
+    # No session is held for the life of the socket; each read/write opens a short async one
     
     token = websocket.query_params.get("token")
     if not token:
@@ -62,48 +102,88 @@ async def websocket_endpoint(websocket: WebSocket, match_id: int, db: Session =
     try:
         payload = verify_token(token, token_type="access")
         user_id = int(payload.get("sub"))
-        
-        
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user or not user.is_active:
-            await websocket.close(code=1008, reason="Invalid or inactive user")
-            return
     except JWTError:
         await websocket.close(code=1008, reason="Invalid token")
         return
     
+    try:
+        user = await asyncio.wait_for(_load_chat_user(user_id), CHAT_DB_TIMEOUT_SECONDS)
+        match_exists = await asyncio.wait_for(_match_exists(match_id), CHAT_DB_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, SQLAlchemyError, OSError) as e:
+        logger.error(f"Chat user lookup failed for match {match_id}: {e!r}")
+        await websocket.close(code=1011, reason="Chat unavailable")
+        return
+    if not user:
+        await websocket.close(code=1008, reason="Invalid or inactive user")
+        return
+    if not match_exists:
+        await websocket.close(code=1008, reason="Match not found")
+        return
+    user_id, user_name = user
     
-    await manager.connect(websocket, match_id)
+    # ?topics=chat,score,ticker,notifications adds the match's live score, the ticker
+    # and this user's notifications to the chat on one socket
+    names = requested_topics(websocket, (TOPIC_CHAT, TOPIC_SCORE, TOPIC_TICKER, TOPIC_NOTIFICATIONS), TOPIC_CHAT)
+    topics = {
+        TOPIC_CHAT: chat_topic(match_id),
+        TOPIC_SCORE: score_topic(match_id),
+        TOPIC_TICKER: TOPIC_TICKER,
+        TOPIC_NOTIFICATIONS: notifications_topic(user_id),
+    }
+    if not await manager.connect(websocket, [topics[name] for name in names], encoding=requested_encoding(websocket)):
+        return
     
     try:
+        if TOPIC_SCORE in names:
+            await score_feed.send_catch_up(websocket, match_id, score_feed.parse_since(websocket.query_params.get("since")))
+        
+        if TOPIC_TICKER in names:
+            await live_ticker.send_snapshot(websocket)
         
-        recent_messages = get_chat_messages(db, match_id, limit=50)
-        for msg in reversed(recent_messages):
-            message_data = format_chat_message_for_response(msg)
-            await websocket.send_json(message_data)
+        if TOPIC_CHAT in names:
+            try:
+                recent_messages = await asyncio.wait_for(
+                    chat_history.get_recent_messages(match_id, CHAT_HISTORY_ON_CONNECT),
+                    CHAT_DB_TIMEOUT_SECONDS
+                )
+            except (asyncio.TimeoutError, SQLAlchemyError, OSError) as e:
+                logger.error(f"Chat history load failed for match {match_id}: {e!r}")
+                recent_messages = []
+            for encoded in recent_messages:
+                await manager.send_personal_text(encoded, websocket)
         
         while True:
             
-            data = await websocket.receive_json()
+            data = json.loads(await manager.receive_text(websocket))
+            
+            # Same score resync as the score socket, for clients that noticed a seq gap
+            if data.get("type") == "resync" and TOPIC_SCORE in names:
+                await score_feed.send_catch_up(websocket, match_id, score_feed.parse_since(data.get("since")))
+                continue
             
             message_text = data.get("message", "").strip()
             if not message_text:
                 continue
             
             
-            chat_message = create_chat_message(
-                db=db,
-                user_id=user.id,
-                match_id=match_id,
-                message=message_text
-            )
+            try:
+                message_data = await asyncio.wait_for(
+                    chat_writer.enqueue(user_id, user_name, match_id, message_text),
+                    CHAT_DB_TIMEOUT_SECONDS
+                )
+            except (asyncio.TimeoutError, SQLAlchemyError, OSError) as e:
+                logger.error(f"Chat message save failed for match {match_id}: {e!r}")
+                await manager.send_personal_message(
+                    {"type": "chat_error", "message": "Message could not be sent, please try again"},
+                    websocket
+                )
+                continue
+            await chat_history.remember_message(match_id, message_data)
             
-           
-            message_data = format_chat_message_for_response(chat_message)
-            await manager.broadcast_to_match(message_data, match_id)
+            await manager.broadcast(chat_topic(match_id), message_data)
             
     except WebSocketDisconnect:
-        manager.disconnect(websocket, match_id)
+        manager.disconnect(websocket)
     except Exception as e:
         print(f"WebSocket error: {e}")
-        manager.disconnect(websocket, match_id)
\ No newline at end of file
+        manager.disconnect(websocket)
\ No newline at end of file
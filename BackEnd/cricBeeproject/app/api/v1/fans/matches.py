@@ -1,12 +1,21 @@
 """Fan API endpoints for matches - no authentication required"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.utils.http_cache import cached_json_response
+from app.core.sse import EventStreamResponse, SseConnection, last_event_id
+from app.core.websocket_manager import manager, requested_encoding, score_topic, TOPIC_TICKER
+from app.services.fans.live_ticker import live_ticker
+from app.services.organizer import score_feed
 from app.services.fans.match_service import (
     get_live_matches_for_fans,
-    get_match_scoreboard_for_fans
+    get_match_scoreboard_for_fans_async,
+    get_match_commentary_for_fans,
+    get_match_worm_for_fans,
+    get_match_manhattan_for_fans
 )
-from typing import List
+from app.schemas.organizer.match_score import CommentaryPageResponse, ManhattanResponse, WormResponse
+from typing import List, Optional
 
 router = APIRouter(prefix="/matches", tags=["fans-matches"])
 
@@ -19,17 +28,124 @@ def get_live_matches(
     return get_live_matches_for_fans(db)
 
 
+@router.websocket("/live/ws")
+async def live_matches_websocket(websocket: WebSocket):
+    """Live ticker: a snapshot of every live match, then ticker_update / ticker_remove as they change"""
+    if not await manager.connect(websocket, [TOPIC_TICKER], encoding=requested_encoding(websocket)):
+        return
+    try:
+        await live_ticker.send_snapshot(websocket)
+        while True:
+            await manager.receive_text(websocket)
+    except WebSocketDisconnect:
+        manager.disconnect(websocket)
+
+
+def _server_busy() -> Response:
+    return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "5"})
+
+
+@router.get("/live/stream")
+async def live_matches_stream():
+    """Live ticker as Server-Sent Events; every (re)connect starts with a fresh ticker_snapshot"""
+    connection = SseConnection()
+    if not await manager.connect(connection, [TOPIC_TICKER], reap_idle=False):
+        return _server_busy()
+    try:
+        await live_ticker.send_snapshot(connection)
+    except Exception:
+        # Nothing reaps an SSE connection that never got a response, so free its slot here
+        manager.disconnect(connection)
+        raise
+    return EventStreamResponse(connection)
+
+
+@router.get("/{match_id}/stream")
+async def match_score_stream(match_id: int, request: Request):
+    """
+    Live score as Server-Sent Events: a snapshot, then one patch per ball, the same as the delta WebSocket.
+    Reconnects with Last-Event-ID (or ?since=<event_seq>) get just the events they missed.
+    """
+    connection = SseConnection()
+    if not await manager.connect(connection, [score_topic(match_id)], reap_idle=False):
+        return _server_busy()
+    try:
+        await score_feed.send_catch_up(connection, match_id, score_feed.parse_since(last_event_id(request)))
+    except ValueError as e:
+        manager.disconnect(connection)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception:
+        manager.disconnect(connection)
+        raise
+    return EventStreamResponse(connection)
+
+
 @router.get("/{match_id}/scoreboard")
-def get_match_scoreboard(
+async def get_match_scoreboard(
     match_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    include_balls: bool = Query(True, description="False leaves all_balls empty; page through /commentary instead")
 ):
     """Get match scoreboard for public viewing (fans)"""
     try:
-        return get_match_scoreboard_for_fans(db, match_id)
+        snapshot = await get_match_scoreboard_for_fans_async(match_id, include_balls)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    return cached_json_response(request, snapshot.body, snapshot.etag)
+
+
+@router.get("/{match_id}/commentary", response_model=CommentaryPageResponse)
+def get_match_commentary(
+    match_id: int,
+    innings: int = Query(1, ge=1, le=2),
+    from_over: Optional[int] = Query(None, ge=1),
+    to_over: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(30, ge=1, le=100),
+    order: str = Query("desc", pattern="^(desc|asc)$"),
+    db: Session = Depends(get_db)
+):
+    """Ball-by-ball commentary for one innings, newest first by default, paged with next_cursor"""
+    try:
+        return get_match_commentary_for_fans(db, match_id, innings, from_over, to_over, cursor, limit, order)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND if str(e) == "Match not found" else status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/{match_id}/worm", response_model=WormResponse)
+def get_match_worm(
+    match_id: int,
+    db: Session = Depends(get_db)
+):
+    """Cumulative score and run rate after each over, per innings"""
+    try:
+        return get_match_worm_for_fans(db, match_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
 
+
+@router.get("/{match_id}/manhattan", response_model=ManhattanResponse)
+def get_match_manhattan(
+    match_id: int,
+    db: Session = Depends(get_db)
+):
+    """Runs, wickets and maidens in each over, per innings"""
+    try:
+        return get_match_manhattan_for_fans(db, match_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
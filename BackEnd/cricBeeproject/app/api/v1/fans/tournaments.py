@@ -1,7 +1,9 @@
 """Fan API endpoints for tournaments - no authentication required"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.services.organizer.qualification_scenarios import MAX_TOP_N, get_qualification_snapshot
+from app.utils.http_cache import cached_json_response
 from app.services.fans.tournament_service import (
     get_all_tournaments_for_fans,
     get_tournament_details_for_fans
@@ -34,3 +36,20 @@ def get_tournament_details(
             detail=str(e)
         )
 
+
+@router.get("/{tournament_id}/qualification")
+def get_qualification_scenarios(
+    tournament_id: int,
+    request: Request,
+    top_n: int = Query(4, ge=1, le=MAX_TOP_N, description="Number of teams that qualify from the league round"),
+    db: Session = Depends(get_db)
+):
+    """Each team's chance of qualifying and the league matches it must win"""
+    try:
+        snapshot = get_qualification_snapshot(db, tournament_id, top_n)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    return cached_json_response(request, snapshot.body, snapshot.etag)
@@ -35,6 +35,8 @@ from app.services.organizer.fixture_service import (
     generate_semi_finals,
     generate_final
 )
+from app.services.organizer.qualification_scenarios import MAX_TOP_N, get_qualification_snapshot
+from app.utils.http_cache import cached_json_response
 from typing import List
 from app.models.organizer.fixture import Match
 
@@ -379,6 +381,30 @@ def get_qualified_teams(
             detail=str(e)
         )
 
+@router.get("/tournaments/{tournament_id}/qualification-scenarios")
+def get_qualification_scenarios(
+    tournament_id: int,
+    request: Request,
+    top_n: int = Query(4, ge=1, le=MAX_TOP_N, description="Number of top teams to qualify"),
+    db: Session = Depends(get_db)
+):
+    #What each team needs from the remaining league matches to finish in the top_n
+    current_user = get_current_user(request, db)
+    if current_user.role != UserRole.ORGANIZER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only organizers can view qualification scenarios"
+        )
+    
+    try:
+        snapshot = get_qualification_snapshot(db, tournament_id, top_n)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return cached_json_response(request, snapshot.body, snapshot.etag)
+
 @router.patch("/matches/{match_id}/details", response_model=MatchResponse)
 def update_match_details_endpoint(
     match_id: int,
@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, WebSocket, WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.session import get_db
+import json
+from app.db.session import get_async_db, get_db
 from app.models.user import UserRole
 from app.utils.jwt import get_current_user
-from app.core.websocket_manager import manager
+from app.core.websocket_manager import (
+    manager, requested_topics, requested_encoding, score_topic,
+    SCORE_PROTOCOLS, SCORE_PROTOCOL_DELTA, TOPIC_SCORE, TOPIC_TICKER
+)
+from app.services.organizer import score_feed
+from app.services.fans.live_ticker import live_ticker
 from app.schemas.organizer.match_score import (
     TossUpdate,
     TossResponse,
@@ -20,8 +27,8 @@ from app.schemas.organizer.match_score import (
 from app.services.organizer.match_score_service import (
     update_toss,
     start_match,
-    update_score,
-    get_live_scoreboard,
+    update_score_async,
+    get_live_scoreboard_async,
     end_innings,
     get_available_batsmen,
     get_available_bowlers,
@@ -89,14 +96,11 @@ def start_match_endpoint(
         
         
         try:
-            import asyncio
-            asyncio.create_task(
-                manager.broadcast_to_match({
-                    "type": "match_started",
-                    "match_id": match_id,
-                    "match_status": match.match_status
-                }, match_id)
-            )
+            manager.queue_match_message({
+                "type": "match_started",
+                "match_id": match_id,
+                "match_status": match.match_status
+            }, match_id)
         except Exception as e:
             print(f"WebSocket broadcast error: {e}")
         
@@ -112,14 +116,14 @@ def start_match_endpoint(
         )
 
 @router.post("/{match_id}/score", status_code=status.HTTP_200_OK)
-def update_score_endpoint(
+async def update_score_endpoint(
     match_id: int,
     score_data: UpdateScoreRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     
-    current_user = get_current_user(request, db)
+    current_user = await db.run_sync(lambda session: get_current_user(request, session))
     if current_user.role != UserRole.ORGANIZER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -127,7 +131,7 @@ def update_score_endpoint(
         )
     
     try:
-        ball_record = update_score(db, match_id, current_user.id, score_data)
+        ball_record = await update_score_async(db, match_id, current_user.id, score_data)
         return {
             "message": "Score updated successfully",
             "ball_id": ball_record.id,
@@ -150,16 +154,17 @@ def update_score_endpoint(
         )
 
 @router.get("/{match_id}/scoreboard", response_model=LiveScoreboardResponse)
-def get_scoreboard_endpoint(
+async def get_scoreboard_endpoint(
     match_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    include_balls: bool = Query(True, description="False leaves all_balls empty; use the commentary endpoint for ball history"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     #
-    current_user = get_current_user(request, db)
+    current_user = await db.run_sync(lambda session: get_current_user(request, session))
     
     try:
-        scoreboard = get_live_scoreboard(db, match_id)
+        scoreboard = await get_live_scoreboard_async(match_id, include_all_balls=include_balls)
         return scoreboard
     except ValueError as e:
         raise HTTPException(
@@ -211,20 +216,18 @@ def end_innings_endpoint(
         
        
         try:
-            import asyncio
             from app.services.organizer.match_score_service import get_live_scoreboard
             
             
             updated_scoreboard = get_live_scoreboard(db, match_id)
             
-            asyncio.create_task(
-                manager.broadcast_to_match({
-                    "type": "innings_ended",
-                    "match_id": match_id,
-                    "match_status": match.match_status,
-                    "scoreboard": updated_scoreboard.dict()
-                }, match_id)
-            )
+            manager.queue_match_message({
+                "type": "innings_ended",
+                "match_id": match_id,
+                "match_status": match.match_status,
+                "seq": updated_scoreboard.seq,
+                "scoreboard": updated_scoreboard.model_dump(mode="json")
+            }, match_id)
         except Exception as e:
             print(f"WebSocket broadcast error: {e}")
         
@@ -453,20 +456,18 @@ def complete_match_endpoint(
         
         
         try:
-            import asyncio
             from app.services.organizer.match_score_service import get_live_scoreboard
             
             
             final_scoreboard = get_live_scoreboard(db, match_id)
             
-            asyncio.create_task(
-                manager.broadcast_to_match({
-                    "type": "match_completed",
-                    "match_id": match_id,
-                    "result": result,
-                    "scoreboard": final_scoreboard.dict()
-                }, match_id)
-            )
+            manager.queue_match_message({
+                "type": "match_completed",
+                "match_id": match_id,
+                "result": result,
+                "seq": final_scoreboard.seq,
+                "scoreboard": final_scoreboard.model_dump(mode="json")
+            }, match_id)
         except Exception as e:
             print(f"WebSocket broadcast error: {e}")
         
@@ -479,16 +480,49 @@ def complete_match_endpoint(
 
 @router.websocket("/{match_id}/ws")
 async def websocket_endpoint(websocket: WebSocket, match_id: int):
-   
-    await manager.connect(websocket, match_id)
+    
+    protocol = websocket.query_params.get("protocol", SCORE_PROTOCOL_DELTA)
+    if protocol not in SCORE_PROTOCOLS:
+        protocol = SCORE_PROTOCOL_DELTA
+    
+    # ?encoding=compact|msgpack shrinks frames: short keys, no nulls, optionally binary
+    encoding = requested_encoding(websocket)
+    
+    # ?topics=score,ticker also subscribes this socket to the live ticker
+    names = requested_topics(websocket, (TOPIC_SCORE, TOPIC_TICKER), TOPIC_SCORE)
+    topics = {TOPIC_SCORE: score_topic(match_id), TOPIC_TICKER: TOPIC_TICKER}
+    
+    if not await manager.connect(websocket, [topics[name] for name in names], protocol, encoding=encoding):
+        return
     try:
+        if TOPIC_SCORE in names and protocol == SCORE_PROTOCOL_DELTA:
+            # ?since=<event_seq> resumes a dropped connection with just the events it missed
+            since = score_feed.parse_since(websocket.query_params.get("since"))
+            await score_feed.send_catch_up(websocket, match_id, since)
+        
+        if TOPIC_TICKER in names:
+            await live_ticker.send_snapshot(websocket)
+        
         while True:
             
-            data = await websocket.receive_text()
+            data = await manager.receive_text(websocket)
+            
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+            
+            # Delta clients that notice a gap in seq ask for a fresh snapshot, or the events after "since"
+            if isinstance(message, dict) and message.get("type") == "resync":
+                await score_feed.send_catch_up(websocket, match_id, score_feed.parse_since(message.get("since")))
+                continue
             
             await manager.send_personal_message({"type": "echo", "message": data}, websocket)
     except WebSocketDisconnect:
-        manager.disconnect(websocket, match_id)
+        manager.disconnect(websocket)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        manager.disconnect(websocket)
 
 
 
@@ -3,121 +3,90 @@ from sqlalchemy.orm import Session
 from typing import List
 from app.db.session import get_db
 from app.utils.jwt import get_current_user
-from app.models.user import User
-from app.services.organizer import point_table_service
+from app.utils.http_cache import cached_json_response
+from app.services.organizer import point_table_service, standings_cache
+from app.models.organizer.fixture import Match
 from app.models.organizer.tournament import Tournament
 
 router = APIRouter()
 
+
+def _get_owned_tournament(request: Request, db: Session, tournament_id: int) -> Tournament:
+    current_user = get_current_user(request, db)
+    tournament = db.query(Tournament).filter(
+        Tournament.id == tournament_id,
+        Tournament.organizer_id == current_user.id
+    ).first()
+    
+    if not tournament:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tournament not found or access denied"
+        )
+    return tournament
+
 @router.get("/tournament/{tournament_id}")
 def get_point_table(
     tournament_id: int,
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     
+    get_current_user(request, db)
     try:
-        
-        tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-        if not tournament:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Tournament not found"
-            )
-        
-        point_table = point_table_service.get_point_table_by_tournament(db, tournament_id)
-        return point_table
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching point table: {str(e)}"
-        )
+        snapshot = standings_cache.get_standings_snapshot(db, tournament_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return cached_json_response(request, snapshot.body, snapshot.etag)
 
 @router.post("/tournament/{tournament_id}/initialize")
 def initialize_point_table(
     tournament_id: int,
     team_ids: List[int],
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     
-    try:
-        
-        tournament = db.query(Tournament).filter(
-            Tournament.id == tournament_id,
-            Tournament.organizer_id == current_user.id
-        ).first()
-        
-        if not tournament:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Tournament not found or access denied"
-            )
-        
-        point_entries = point_table_service.initialize_point_table_for_tournament(
-            db, tournament_id, team_ids
-        )
-        
-        return {
-            "message": "Point table initialized successfully",
-            "tournament_id": tournament_id,
-            "teams_count": len(point_entries)
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error initializing point table: {str(e)}"
-        )
+    _get_owned_tournament(request, db, tournament_id)
+    point_entries = point_table_service.initialize_point_table_for_tournament(
+        db, tournament_id, team_ids
+    )
+    
+    return {
+        "message": "Point table initialized successfully",
+        "tournament_id": tournament_id,
+        "teams_count": len(point_entries)
+    }
 
 @router.delete("/tournament/{tournament_id}/reset")
 def reset_point_table(
     tournament_id: int,
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
    
-    try:
-        
-        tournament = db.query(Tournament).filter(
-            Tournament.id == tournament_id,
-            Tournament.organizer_id == current_user.id
-        ).first()
-        
-        if not tournament:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Tournament not found or access denied"
-            )
-        
-        result = point_table_service.reset_point_table_for_tournament(db, tournament_id)
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error resetting point table: {str(e)}"
-        )
+    _get_owned_tournament(request, db, tournament_id)
+    return point_table_service.reset_point_table_for_tournament(db, tournament_id)
 
 @router.post("/match/{match_id}/update")
 def update_point_table_for_match(
     match_id: int,
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     
+    match = db.query(Match).filter(Match.id == match_id).first()
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Match not found"
+        )
+    _get_owned_tournament(request, db, match.tournament_id)
     try:
         result = point_table_service.update_point_table_after_match(db, match_id)
-        return result
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error updating point table: {str(e)}"
-        )
+    return {"message": result["message"], "match_id": match_id}
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.services.organizer import standings_cache
 
 router = APIRouter()
 
 @router.get("/tournament/{tournament_id}/test")
-def test_point_table(tournament_id: int):
-   
-    return {"message": f"Point table test for tournament {tournament_id}", "tournament_id": tournament_id}
+def test_point_table(tournament_id: int, db: Session = Depends(get_db)):
+    # Which standings version readers are being served, without the rows
+    try:
+        snapshot = standings_cache.get_standings_snapshot(db, tournament_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {"tournament_id": tournament_id, "version": snapshot.version, "etag": snapshot.etag}
@@ -4,7 +4,8 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import UserRole
 from app.schemas.player import (
-    PlayerCreate, PlayerUpdate, PlayerRead, PlayerProfileResponse, PlayerDashboardResponse
+    PlayerCreate, PlayerUpdate, PlayerRead, PlayerProfileResponse, PlayerDashboardResponse,
+    PlayerCareerStatsResponse
 )
 from app.schemas.user import ChangePasswordRequest
 from app.schemas.club_manager import (
@@ -14,6 +15,8 @@ from app.services.player.player_service import (
     get_player_profile, create_player_profile, update_player_profile, update_player_profile_photo,
     get_player_current_club, leave_club, get_player_dashboard_data
 )
+from app.services.player.career_stats_service import get_career_stats
+from app.models.player import PlayerProfile
 from app.services.clubmanager.invitation_service import (
     get_invitations_for_player, accept_club_invitation, reject_club_invitation
 )
@@ -315,4 +318,25 @@ def get_player_dashboard_endpoint(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch dashboard data: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/career-stats", response_model=PlayerCareerStatsResponse)
+def get_career_stats_endpoint(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    current_user = get_current_user(request, db)
+    if current_user.role != UserRole.PLAYER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only players can access career stats"
+        )
+    
+    player_profile = db.query(PlayerProfile).filter(PlayerProfile.user_id == current_user.id).first()
+    if not player_profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Player profile not found")
+    
+    try:
+        return get_career_stats(db, player_profile.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
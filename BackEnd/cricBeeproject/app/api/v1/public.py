@@ -1,14 +1,15 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.utils.http_cache import cached_json_response
 from app.services.fans.tournament_service import (
     get_all_tournaments_for_fans,
     get_tournament_details_for_fans
 )
 from app.services.fans.match_service import (
     get_live_matches_for_fans,
-    get_match_scoreboard_for_fans
+    get_match_scoreboard_for_fans_async
 )
 from typing import List, Optional
 
@@ -40,18 +41,20 @@ def get_tournament_details(
 
 
 @router.get("/matches/{match_id}/scoreboard", deprecated=True)
-def get_public_scoreboard(
+async def get_public_scoreboard(
     match_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    include_balls: bool = True
 ):
 
     try:
-        return get_match_scoreboard_for_fans(db, match_id)
+        snapshot = await get_match_scoreboard_for_fans_async(match_id, include_balls)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    return cached_json_response(request, snapshot.body, snapshot.etag)
 
 
 @router.get("/matches/live", response_model=List[dict], deprecated=True)
@@ -0,0 +1,171 @@
+"""
+Broadcast backends for the WebSocket ConnectionManager.
+
+Each uvicorn worker only holds its own sockets. The backend carries every
+topic event (score, chat, ...) to all workers, and each worker hands it to
+the sockets it holds that subscribe to the topic. BROADCAST_BACKEND picks
+the backend:
+
+- "redis" (default): Redis pub/sub, one channel per topic
+- "memory": delivers straight back to this process, for a single worker or tests
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.redis_config import RedisClient
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "cricbee:topic:"
+
+# Called with (topic, event) for every event published by any worker
+EventHandler = Callable[[str, dict], Awaitable[None]]
+
+
+def topic_channel(topic: str) -> str:
+    return f"{CHANNEL_PREFIX}{topic}"
+
+
+class BroadcastBackend:
+    async def start(self, handler: EventHandler):
+        raise NotImplementedError
+
+    async def stop(self):
+        raise NotImplementedError
+
+    async def publish(self, topic: str, event: dict):
+        raise NotImplementedError
+
+    async def publish_many(self, events: List[Tuple[str, dict]]):
+        for topic, event in events:
+            await self.publish(topic, event)
+
+
+class MemoryBroadcastBackend(BroadcastBackend):
+    def __init__(self):
+        self.handler: Optional[EventHandler] = None
+
+    async def start(self, handler: EventHandler):
+        self.handler = handler
+
+    async def stop(self):
+        self.handler = None
+
+    async def publish(self, topic: str, event: dict):
+        if self.handler:
+            await self.handler(topic, event)
+
+
+class RedisBroadcastBackend(BroadcastBackend):
+    RECONNECT_DELAY_SECONDS = 1.0
+    MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+    def __init__(self, client=None):
+        # client is a redis.asyncio.Redis (tests.fake_redis.FakeRedis in tests); defaults to the shared async client
+        self.client = client
+        self.handler: Optional[EventHandler] = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, handler: EventHandler):
+        if self.client is None:
+            self.client = RedisClient.get_async_client()
+        self.handler = handler
+        try:
+            await self._subscribe()
+        except (RedisError, OSError) as e:
+            # Don't block startup on Redis; the listener keeps retrying
+            logger.error(f"Broadcast subscription failed: {e}")
+            await self._close_pubsub()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._close_pubsub()
+        self.handler = None
+
+    async def publish(self, topic: str, event: dict):
+        try:
+            await self.client.publish(topic_channel(topic), json.dumps(event))
+        except RedisError as e:
+            # Redis is down: at least reach the sockets on this worker
+            logger.error(f"Broadcast publish failed for {topic}: {e}")
+            if self.handler:
+                await self.handler(topic, event)
+
+    async def publish_many(self, events: List[Tuple[str, dict]]):
+        # One round trip for the whole batch
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for topic, event in events:
+                    pipe.publish(topic_channel(topic), json.dumps(event))
+                await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Broadcast publish failed for {len(events)} events: {e}")
+            if self.handler:
+                for topic, event in events:
+                    await self.handler(topic, event)
+
+    async def _subscribe(self):
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+
+    async def _close_pubsub(self):
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except RedisError:
+                pass
+            self._pubsub = None
+
+    async def _listen(self):
+        delay = self.RECONNECT_DELAY_SECONDS
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe()
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                delay = self.RECONNECT_DELAY_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as e:
+                logger.error(f"Broadcast subscription lost, retrying in {delay:.0f}s: {e}")
+                await self._close_pubsub()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY_SECONDS)
+                continue
+
+            if not message or message.get("type") not in ("message", "pmessage"):
+                continue
+
+            try:
+                topic = message["channel"][len(CHANNEL_PREFIX):]
+                event = json.loads(message["data"])
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Ignoring malformed broadcast on {message.get('channel')}: {e}")
+                continue
+
+            try:
+                await self.handler(topic, event)
+            except Exception as e:
+                logger.error(f"Broadcast delivery failed for {topic}: {e}")
+
+
+def create_broadcast_backend() -> BroadcastBackend:
+    name = os.getenv("BROADCAST_BACKEND", "redis").lower()
+    if name == "memory":
+        return MemoryBroadcastBackend()
+    if name == "redis":
+        return RedisBroadcastBackend()
+    raise ValueError(f"Unknown BROADCAST_BACKEND '{name}' (expected 'redis' or 'memory')")
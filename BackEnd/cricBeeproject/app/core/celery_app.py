@@ -13,7 +13,7 @@ celery_app = Celery(
     result_backend_transport_options={
         'socket_keepalive': True,
     },
-    include=["app.tasks.notification_tasks"]
+    include=["app.tasks.notification_tasks", "app.tasks.career_stats_tasks"]
 )
 
 celery_app.conf.update(
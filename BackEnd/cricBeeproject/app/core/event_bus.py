@@ -0,0 +1,118 @@
+"""
+Thread-safe hand-off of topic events from sync code to the event loop.
+
+Scoring and match routes run in threadpool threads (or inside
+AsyncSession.run_sync) where asyncio.create_task has no loop to schedule on.
+They publish onto the EventBus instead; publish never blocks and never
+raises. One dispatcher task on the event loop, started and stopped with the
+app lifespan, drains the queue in order and hands each batch to the
+ConnectionManager. When the queue is full the oldest event is dropped:
+clients notice the seq gap and resync.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TopicEvent = Tuple[str, dict]
+BatchHandler = Callable[[List[TopicEvent]], Awaitable[None]]
+
+
+class EventBus:
+    MAX_QUEUE_SIZE = 10000
+    BATCH_SIZE = 100
+
+    def __init__(self, max_queue_size: int = MAX_QUEUE_SIZE, batch_size: int = BATCH_SIZE):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self._queue: Deque[TopicEvent] = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._handler: Optional[BatchHandler] = None
+        self._stopping = False
+        self.counters = {
+            "published": 0,
+            "delivered": 0,
+            "dropped": 0,
+            "failed": 0,
+            "batches": 0,
+        }
+
+    def publish(self, topic: str, event: dict):
+        """Queue an event from any thread."""
+        with self._lock:
+            if len(self._queue) >= self.max_queue_size:
+                self._queue.popleft()
+                self.counters["dropped"] += 1
+                if self.counters["dropped"] % 100 == 1:
+                    logger.warning(f"Event bus full, dropped {self.counters['dropped']} events so far")
+            self._queue.append((topic, event))
+            self.counters["published"] += 1
+            loop = self._loop
+
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # Loop closed during shutdown; the event stays queued
+                pass
+
+    async def start(self, handler: BatchHandler):
+        if self._dispatcher is not None:
+            return
+        self._handler = handler
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            pending = bool(self._queue)
+        if pending:
+            self._wakeup.set()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        if self._dispatcher is None:
+            return
+        with self._lock:
+            self._loop = None
+        # Not cancelled: a batch in flight would be lost. The dispatcher delivers
+        # what was queued before shutdown, then returns.
+        self._stopping = True
+        self._wakeup.set()
+        await self._dispatcher
+        self._dispatcher = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "queue_depth": len(self._queue)}
+
+    def _take_batch(self) -> List[TopicEvent]:
+        with self._lock:
+            count = min(self.batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    async def _drain(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            try:
+                await self._handler(batch)
+                self.counters["delivered"] += len(batch)
+            except Exception as e:
+                self.counters["failed"] += len(batch)
+                logger.error(f"Event bus delivery failed for {len(batch)} events: {e}")
+            self.counters["batches"] += 1
+
+    async def _dispatch(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self._drain()
+            if self._stopping:
+                return
@@ -1,5 +1,6 @@
 
 import redis
+import redis.asyncio
 from typing import Optional
 import os
 from dotenv import load_dotenv
@@ -8,6 +9,7 @@ load_dotenv()
 
 class RedisClient:
     _instance: Optional[redis.Redis] = None
+    _async_instance: Optional[redis.asyncio.Redis] = None
     
     @classmethod
     def get_client(cls) -> redis.Redis:
@@ -21,11 +23,30 @@ class RedisClient:
             )
         return cls._instance
     
+    @classmethod
+    def get_async_client(cls) -> redis.asyncio.Redis:
+        # Same server as get_client, for code running on the event loop (pub/sub)
+        if cls._async_instance is None:
+            cls._async_instance = redis.asyncio.Redis(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", 6379)),
+                db=int(os.getenv("REDIS_DB", 0)),
+                
+                decode_responses=True  
+            )
+        return cls._async_instance
+    
     @classmethod
     def close(cls):
         if cls._instance:
             cls._instance.close()
             cls._instance = None
+    
+    @classmethod
+    async def close_async(cls):
+        if cls._async_instance:
+            await cls._async_instance.aclose()
+            cls._async_instance = None
 
 def get_redis() -> redis.Redis:
     return RedisClient.get_client()
\ No newline at end of file
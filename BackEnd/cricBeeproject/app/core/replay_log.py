@@ -0,0 +1,104 @@
+"""
+Bounded replay log of live events, per topic, shared by every worker through Redis.
+
+Each event gets the next `event_seq` of its topic when it is published and
+is kept, already encoded, in a sorted set holding the last REPLAY_SIZE
+events. A client that reconnects with the last event_seq it saw gets just
+the events it missed, or None when the gap is older than the log and it
+needs a fresh snapshot instead.
+"""
+import logging
+from typing import List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.redis_config import RedisClient
+
+logger = logging.getLogger(__name__)
+
+REPLAY_SIZE = 200
+REPLAY_TTL_SECONDS = 6 * 60 * 60
+# Outlives the log so a topic's event_seq never restarts mid-match
+SEQ_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# KEYS: seq counter, log zset. ARGV: size, log ttl, seq ttl, encoded event (a JSON object).
+# Returns the event's seq; the stored copy has "event_seq" as its first field.
+_APPEND = """
+local seq = redis.call('INCR', KEYS[1])
+local body = '{"event_seq":' .. seq
+if string.len(ARGV[4]) > 2 then
+    body = body .. ',' .. string.sub(ARGV[4], 2)
+else
+    body = body .. '}'
+end
+redis.call('ZADD', KEYS[2], seq, body)
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[1]) - 1)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return seq
+"""
+
+# KEYS: seq counter, log zset. ARGV: since.
+# Returns {current} plus the events after since, or false if the log no longer reaches back to since.
+_READ_SINCE = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local since = tonumber(ARGV[1])
+if since > current then
+    return false
+end
+if since == current then
+    return {current}
+end
+local oldest = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+if #oldest == 0 or tonumber(oldest[2]) > since + 1 then
+    return false
+end
+local events = redis.call('ZRANGEBYSCORE', KEYS[2], '(' .. since, '+inf')
+table.insert(events, 1, current)
+return events
+"""
+
+
+def _seq_key(topic: str) -> str:
+    return f"replay:{topic}:seq"
+
+
+def _log_key(topic: str) -> str:
+    return f"replay:{topic}:log"
+
+
+async def append_events(events: List[Tuple[str, str]]) -> List[Optional[int]]:
+    """Log (topic, encoded event) pairs in one round trip; returns each event's seq, or all None if Redis is down."""
+    if not events:
+        return []
+    try:
+        async with RedisClient.get_async_client().pipeline(transaction=False) as pipe:
+            for topic, encoded in events:
+                pipe.eval(
+                    _APPEND, 2, _seq_key(topic), _log_key(topic),
+                    REPLAY_SIZE, REPLAY_TTL_SECONDS, SEQ_TTL_SECONDS, encoded
+                )
+            return [int(seq) for seq in await pipe.execute()]
+    except RedisError as e:
+        logger.error(f"Replay log append failed for {len(events)} events: {e}")
+        return [None] * len(events)
+
+
+async def current_seq(topic: str) -> Optional[int]:
+    try:
+        return int(await RedisClient.get_async_client().get(_seq_key(topic)) or 0)
+    except RedisError as e:
+        logger.error(f"Replay seq read failed for {topic}: {e}")
+        return None
+
+
+async def read_since(topic: str, since: int) -> Optional[Tuple[int, List[str]]]:
+    """(current seq, encoded events after since, oldest first), or None if they aren't all still logged."""
+    try:
+        result = await RedisClient.get_async_client().eval(_READ_SINCE, 2, _seq_key(topic), _log_key(topic), since)
+    except RedisError as e:
+        logger.error(f"Replay log read failed for {topic}: {e}")
+        return None
+    if not result:
+        return None
+    return int(result[0]), list(result[1:])
@@ -0,0 +1,99 @@
+"""
+Server-Sent Events transport for read-only live feeds.
+
+An SseConnection stands in for a WebSocket in ConnectionManager, so SSE
+viewers share the same topics, catch-up, slow-consumer eviction and
+shutdown drain as WebSocket subscribers, and are fed by the same
+broadcasts. Each message becomes one `data:` event. Events from the
+replay log also carry their event_seq as the event `id`, which the
+browser's EventSource sends back as Last-Event-ID when it reconnects.
+Heartbeat pings become SSE comments, keeping proxies from timing the
+stream out; a viewer that has gone away fails the next write.
+"""
+import asyncio
+import re
+from typing import AsyncIterator, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.core.websocket_manager import PING_TYPE, encode_message, manager
+
+# How long EventSource waits before reconnecting, in milliseconds
+RETRY_MS = 3000
+
+# Encoded JSON escapes quotes inside strings, so this only matches the event_seq key itself
+_EVENT_SEQ = re.compile(r'"event_seq":(\d+)')
+_PING_PREFIX = encode_message({"type": PING_TYPE})[:-1]
+
+STREAM_HEADERS = {
+    # no-transform stops compressing proxies from buffering the stream; X-Accel-Buffering does the same for nginx
+    "Cache-Control": "no-cache, no-transform",
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_event(text: str) -> str:
+    if text.startswith(_PING_PREFIX):
+        return ": ping\n\n"
+    seq = _EVENT_SEQ.search(text)
+    if seq:
+        return f"id: {seq.group(1)}\ndata: {text}\n\n"
+    return f"data: {text}\n\n"
+
+
+def last_event_id(request: Request) -> Optional[str]:
+    # EventSource resends the last id as a header; ?since= lets a page resume from state it already has
+    return request.headers.get("last-event-id") or request.query_params.get("since")
+
+
+class SseConnection:
+    """The WebSocket methods ConnectionManager uses, writing SSE frames to a streaming response."""
+
+    def __init__(self):
+        self._frames: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.closed:
+            raise RuntimeError("SSE stream closed")
+        await self._frames.put(format_event(text))
+        # Returns once the response has written the frame, so a stalled viewer hits the send timeout
+        await self._frames.join()
+
+    async def send_json(self, message: dict):
+        await self.send_text(encode_message(message))
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        if not self.closed:
+            self.closed = True
+            self._frames.put_nowait(None)
+
+    async def frames(self) -> AsyncIterator[str]:
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            frame = await self._frames.get()
+            try:
+                if frame is None:
+                    return
+                yield frame
+            finally:
+                self._frames.task_done()
+
+
+class EventStreamResponse(StreamingResponse):
+    """Streams an SseConnection's events until the viewer leaves or the manager closes it."""
+
+    def __init__(self, connection: SseConnection):
+        super().__init__(connection.frames(), media_type="text/event-stream", headers=STREAM_HEADERS)
+        self.connection = connection
+
+    async def __call__(self, scope, receive, send):
+        # A viewer leaving surfaces here as an error or a cancellation, never inside the frames generator
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            manager.disconnect(self.connection)
@@ -1,37 +1,478 @@
-from typing import Dict, Set
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import WebSocket
+from starlette.concurrency import run_in_threadpool
+
+from app.core import replay_log
+from app.core.broadcast import BroadcastBackend, EventHandler, create_broadcast_backend
+from app.core.event_bus import EventBus
+from app.core.wire_encoding import (
+    ENCODING_JSON, ENCODINGS, EncodedMessage, Payload, encode_for, encode_message, keys_frame
+)
+
+logger = logging.getLogger(__name__)
+
+# Live score protocols a socket can negotiate with ?protocol=
+SCORE_PROTOCOL_DELTA = "delta"  # snapshot on connect, then one small patch per ball
+SCORE_PROTOCOL_FULL = "full"    # legacy: the whole scoreboard with every ball
+SCORE_PROTOCOLS = (SCORE_PROTOCOL_DELTA, SCORE_PROTOCOL_FULL)
+
+# Topics a socket can subscribe to; every broadcast goes to exactly one topic
+TOPIC_SCORE = "score"                  # score_topic(match_id): ball patches and match events
+TOPIC_CHAT = "chat"                    # chat_topic(match_id): chat messages
+TOPIC_TICKER = "ticker"                # live ticker across all matches
+TOPIC_NOTIFICATIONS = "notifications"  # notifications_topic(user_id): one user's notifications
+
+# Events published through the broadcast backend
+EVENT_MESSAGE = "message"  # sent as-is to every socket subscribed to the topic
+EVENT_SCORE = "score"      # per-ball patch, plus the full scoreboard when the publisher built it
+
+# Topics whose events get an event_seq and go into the replay log
+REPLAYED_TOPIC_PREFIXES = (f"{TOPIC_SCORE}:",)
+
+# Close codes (RFC 6455)
+SLOW_CONSUMER_CLOSE_CODE = 1013  # "try again later": can't keep up, or the worker is full
+IDLE_CLOSE_CODE = 1001           # "going away": no frame, not even a pong, for IDLE_TIMEOUT_SECONDS
+SERVER_RESTART_CLOSE_CODE = 1012 # "service restart": worker shutting down, reconnect to another
+
+# Heartbeat frames; clients answer a ping with a pong, and any frame they send counts as alive
+PING_TYPE = "ping"
+PONG_TYPE = "pong"
+
+
+def score_topic(match_id: int) -> str:
+    return f"{TOPIC_SCORE}:{match_id}"
+
+
+def chat_topic(match_id: int) -> str:
+    return f"{TOPIC_CHAT}:{match_id}"
+
+
+def notifications_topic(user_id: int) -> str:
+    return f"{TOPIC_NOTIFICATIONS}:{user_id}"
+
+
+def requested_topics(websocket: WebSocket, allowed: Iterable[str], default: str) -> Set[str]:
+    """Topic names from ?topics=a,b that the endpoint allows; just the default if none are."""
+    names = websocket.query_params.get("topics", default).split(",")
+    return {name.strip() for name in names if name.strip() in allowed} or {default}
+
+
+def requested_encoding(websocket: WebSocket) -> str:
+    """The ?encoding= the socket asked for, if this server speaks it; JSON otherwise."""
+    encoding = websocket.query_params.get("encoding", ENCODING_JSON)
+    return encoding if encoding in ENCODINGS else ENCODING_JSON
+
+
+def client_message(event: dict) -> dict:
+    # What delta/plain sockets receive for a published event
+    return event["patch"] if event.get("event") == EVENT_SCORE else event["message"]
+
+
+class ClientConnection:
+    """One socket with its outgoing queue; a writer task drains the queue so slow sockets only delay themselves."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        protocol: str,
+        queue_size: int,
+        reap_idle: bool = True,
+        encoding: str = ENCODING_JSON
+    ):
+        self.websocket = websocket
+        self.topics: Set[str] = set()
+        self.protocol = protocol
+        self.encoding = encoding
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.last_seen = time.monotonic()
+        # One-way streams (SSE) can't answer pings; a failed write ends them instead
+        self.reap_idle = reap_idle
+        # While catching up (replay or snapshot), live events wait here as (event_seq, payload)
+        self.held: Optional[List[Tuple[Optional[int], Payload]]] = None
+
+    def describe(self) -> str:
+        return ", ".join(sorted(self.topics)) or "no topics"
+
 
 class ConnectionManager:
-    def __init__(self):
-       
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, match_id: int):
+    SEND_TIMEOUT_SECONDS = 5.0
+    CLIENT_QUEUE_SIZE = 64
+    HEARTBEAT_INTERVAL_SECONDS = 25.0
+    IDLE_TIMEOUT_SECONDS = 75.0
+    DRAIN_TIMEOUT_SECONDS = 5.0
+    DEFAULT_MAX_CONNECTIONS = 10000
+
+    def __init__(self, backend: Optional[BroadcastBackend] = None):
+        # topic -> sockets subscribed to it
+        self.subscriptions: Dict[str, Set[WebSocket]] = {}
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.backend = backend
+        # Events queued by sync code (scoring, match routes) until the loop publishes them
+        self.events = EventBus()
+        self._started = False
+        self._draining = False
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.max_connections = self.DEFAULT_MAX_CONNECTIONS
+        # Called with every event this worker receives, whether or not a socket here wants it
+        self.listeners: List[EventHandler] = []
+        # Score topic -> task rebuilding the full scoreboard for this worker's legacy sockets,
+        # and the newest event_seq still waiting for one
+        self._full_builds: Dict[str, asyncio.Task] = {}
+        self._full_pending: Dict[str, Optional[int]] = {}
+        self.counters = {
+            "messages_sent": 0,
+            "send_timeouts": 0,
+            "send_errors": 0,
+            "slow_consumers_evicted": 0,
+            "idle_reaped": 0,
+            "rejected": 0,
+        }
+
+    async def start(self):
+        if self._started:
+            return
+        if self.backend is None:
+            self.backend = create_broadcast_backend()
+        # Per worker: sockets beyond this are refused so they reconnect to a less loaded one
+        self.max_connections = int(os.getenv("WS_MAX_CONNECTIONS", self.DEFAULT_MAX_CONNECTIONS))
+        await self.backend.start(self._deliver)
+        self._started = True
+        self._draining = False
+        await self.events.start(self._publish_batch)
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+
+    async def stop(self):
+        if self._started:
+            # Refuse new sockets, deliver what's queued, then send everyone elsewhere
+            self._draining = True
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+            await self.events.stop()
+            for task in list(self._full_builds.values()):
+                task.cancel()
+            await self._drain_clients()
+            await self.backend.stop()
+            self._started = False
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        topics: Iterable[str],
+        protocol: str = SCORE_PROTOCOL_DELTA,
+        reap_idle: bool = True,
+        encoding: str = ENCODING_JSON
+    ) -> bool:
+        """Accept and subscribe the socket; False (socket closed) when this worker is full or shutting down."""
         await websocket.accept()
-        if match_id not in self.active_connections:
-            self.active_connections[match_id] = set()
-        self.active_connections[match_id].add(websocket)
-    
-    def disconnect(self, websocket: WebSocket, match_id: int):
-        if match_id in self.active_connections:
-            self.active_connections[match_id].discard(websocket)
-            if not self.active_connections[match_id]:
-                del self.active_connections[match_id]
-    
+        if self._draining or len(self.clients) >= self.max_connections:
+            self.counters["rejected"] += 1
+            if self._draining:
+                await self._close(websocket, "Server restarting", SERVER_RESTART_CLOSE_CODE)
+            else:
+                logger.warning(f"Refusing WebSocket: {len(self.clients)} connections on this worker")
+                await self._close(websocket, "Server busy")
+            return False
+        client = ClientConnection(websocket, protocol, self.CLIENT_QUEUE_SIZE, reap_idle, encoding)
+        client.writer = asyncio.create_task(self._write(client))
+        self.clients[websocket] = client
+        keys = keys_frame(encoding)
+        if keys is not None:
+            self._enqueue(client, keys)
+        for topic in topics:
+            self.subscribe(websocket, topic)
+        return True
+
+    def hold(self, websocket: WebSocket):
+        """Buffer the socket's live events until release(), so a catch-up sent meanwhile stays in order."""
+        client = self.clients.get(websocket)
+        if client is not None and client.held is None:
+            client.held = []
+
+    def release(self, websocket: WebSocket, through_seq: Optional[int] = None):
+        """Send the held events, skipping those the catch-up already covered (event_seq up to through_seq)."""
+        client = self.clients.get(websocket)
+        if client is None or client.held is None:
+            return
+        held, client.held = client.held, None
+        for seq, payload in held:
+            if seq is not None and through_seq is not None and seq <= through_seq:
+                continue
+            self._enqueue(client, payload)
+
+    async def receive_text(self, websocket: WebSocket) -> str:
+        """The socket's next frame, skipping pongs; every frame received marks the socket alive."""
+        while True:
+            text = await websocket.receive_text()
+            client = self.clients.get(websocket)
+            if client is not None:
+                client.last_seen = time.monotonic()
+            if PONG_TYPE in text and len(text) < 64:
+                try:
+                    if json.loads(text).get("type") == PONG_TYPE:
+                        continue
+                except (ValueError, AttributeError):
+                    pass
+            return text
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        client.topics.add(topic)
+        self.subscriptions.setdefault(topic, set()).add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.topics.discard(topic)
+        if topic in self.subscriptions:
+            self.subscriptions[topic].discard(websocket)
+            if not self.subscriptions[topic]:
+                del self.subscriptions[topic]
+
+    def disconnect(self, websocket: WebSocket):
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        for topic in list(client.topics):
+            self.unsubscribe(websocket, topic)
+        del self.clients[websocket]
+        if client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+    def has_subscribers(self, topic: str, protocol: Optional[str] = None) -> bool:
+        return any(
+            protocol is None or self.clients[connection].protocol == protocol
+            for connection in self.subscriptions.get(topic, ())
+            if connection in self.clients
+        )
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "connections": len(self.clients),
+            "topics": len(self.subscriptions),
+            "subscriptions": sum(len(sockets) for sockets in self.subscriptions.values()),
+            "queued_messages": sum(client.queue.qsize() for client in self.clients.values()),
+            "max_connections": self.max_connections,
+            "event_bus": self.events.stats(),
+        }
+
     async def send_personal_message(self, message: dict, websocket: WebSocket):
-        await websocket.send_json(message)
-    
-    async def broadcast_to_match(self, message: dict, match_id: int):
-        if match_id in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[match_id]:
+        # Queued behind any broadcasts already waiting, so the socket sees messages in order
+        client = self.clients.get(websocket)
+        if client is None:
+            await websocket.send_json(message)
+            return
+        self._enqueue(client, encode_for(message, client.encoding))
+
+    async def send_personal_text(self, text: str, websocket: WebSocket):
+        # For messages that are already JSON-encoded, e.g. the chat history buffer or the replay log
+        client = self.clients.get(websocket)
+        if client is None:
+            await websocket.send_text(text)
+            return
+        self._enqueue(client, EncodedMessage(text=text).payload(client.encoding))
+
+    def add_listener(self, listener: EventHandler):
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def deliver_local(self, topic: str, message: dict):
+        # Only this worker's sockets: for state every worker derives itself from the events it receives
+        self._send_to_topic(message, topic)
+
+    async def broadcast(self, topic: str, message: dict):
+        # Goes through the backend so subscribed sockets on every worker get it
+        await self._publish(topic, {"event": EVENT_MESSAGE, "message": message})
+
+    async def broadcast_score_event(self, match_id: int, patch: dict):
+        await self._publish(score_topic(match_id), {"event": EVENT_SCORE, "patch": patch})
+
+    def queue_match_message(self, message: dict, match_id: int):
+        # For sync code in any thread; goes to the match's score topic once the event loop picks it up
+        self.events.publish(score_topic(match_id), {"event": EVENT_MESSAGE, "message": message})
+
+    def queue_score_event(self, match_id: int, patch: dict):
+        self.events.publish(score_topic(match_id), {"event": EVENT_SCORE, "patch": patch})
+
+    async def _publish_batch(self, events: List[Tuple[str, dict]]):
+        await self._stamp(events)
+        await self.backend.publish_many(events)
+
+    async def _publish(self, topic: str, event: dict):
+        if not self._started:
+            await self.start()
+        await self._stamp([(topic, event)])
+        await self.backend.publish(topic, event)
+
+    async def _stamp(self, events: List[Tuple[str, dict]]):
+        # Replayed topics: number each event and log it before any socket can see it
+        logged = [(topic, event) for topic, event in events if topic.startswith(REPLAYED_TOPIC_PREFIXES)]
+        if not logged:
+            return
+        seqs = await replay_log.append_events(
+            [(topic, encode_message(client_message(event))) for topic, event in logged]
+        )
+        for (topic, event), seq in zip(logged, seqs):
+            if seq is None:
+                continue
+            event["event_seq"] = seq
+            client_message(event)["event_seq"] = seq
+
+    async def _deliver(self, topic: str, event: dict):
+        for listener in self.listeners:
+            try:
+                await listener(topic, event)
+            except Exception as e:
+                logger.error(f"Event listener failed on {topic}: {e}")
+        if topic not in self.subscriptions:
+            return
+        if event.get("event") == EVENT_SCORE:
+            await self._send_score_event(topic, event["patch"], event.get("event_seq"))
+        else:
+            self._send_to_topic(event["message"], topic, event.get("event_seq"))
+
+    def _send_to_topic(self, message: dict, topic: str, seq: Optional[int] = None):
+        encoded = EncodedMessage(message)
+        for connection in list(self.subscriptions.get(topic, ())):
+            client = self.clients.get(connection)
+            if client:
+                self._enqueue_event(client, encoded.payload(client.encoding), seq)
+
+    async def _send_score_event(self, topic: str, patch: dict, seq: Optional[int] = None):
+        # Legacy sockets get the full scoreboard from a background rebuild on the loop,
+        # so delivery never waits on the database
+        if self.has_subscribers(topic, SCORE_PROTOCOL_FULL):
+            self._schedule_full_update(topic, seq)
+
+        # Delta sockets get the patch, encoded once per encoding
+        encoded_patch = EncodedMessage(patch)
+        for connection in list(self.subscriptions.get(topic, ())):
+            client = self.clients.get(connection)
+            if client is not None and client.protocol != SCORE_PROTOCOL_FULL:
+                self._enqueue_event(client, encoded_patch.payload(client.encoding), seq)
+
+    def _schedule_full_update(self, topic: str, seq: Optional[int]):
+        self._full_pending[topic] = seq
+        if topic not in self._full_builds:
+            self._full_builds[topic] = asyncio.create_task(self._send_full_updates(topic))
+
+    async def _send_full_updates(self, topic: str):
+        from app.services.organizer.score_feed import load_full_update
+        match_id = int(topic.split(":", 1)[1])
+        try:
+            # Events that arrive during a build are all covered by the next one
+            while topic in self._full_pending:
+                seq = self._full_pending.pop(topic)
+                if not self.has_subscribers(topic, SCORE_PROTOCOL_FULL):
+                    continue
                 try:
-                    await connection.send_json(message)
-                except:
-                    disconnected.add(connection)
-            
-            # Clean up disconnected connections
-            for conn in disconnected:
-                self.disconnect(conn, match_id)
-
-manager = ConnectionManager()
\ No newline at end of file
+                    full_message = await run_in_threadpool(load_full_update, match_id)
+                except Exception as e:
+                    logger.error(f"Full scoreboard rebuild failed for {topic}: {e}")
+                    continue
+                full_message["event_seq"] = seq
+                encoded = EncodedMessage(full_message)
+                for connection in list(self.subscriptions.get(topic, ())):
+                    client = self.clients.get(connection)
+                    if client is not None and client.protocol == SCORE_PROTOCOL_FULL:
+                        self._enqueue_event(client, encoded.payload(client.encoding), seq)
+        finally:
+            self._full_builds.pop(topic, None)
+
+    def _enqueue_event(self, client: ClientConnection, payload: Payload, seq: Optional[int]):
+        if client.held is not None and len(client.held) < self.CLIENT_QUEUE_SIZE:
+            client.held.append((seq, payload))
+            return
+        if client.held is not None:
+            # Catch-up is taking too long; release what's held and let the queue limit decide
+            self.release(client.websocket)
+        self._enqueue(client, payload)
+
+    def _enqueue(self, client: ClientConnection, payload: Payload):
+        try:
+            client.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.counters["slow_consumers_evicted"] += 1
+            logger.warning(
+                f"Dropping slow WebSocket client on {client.describe()}: "
+                f"{client.queue.qsize()} messages behind"
+            )
+            self.disconnect(client.websocket)
+            asyncio.create_task(self._close(client.websocket, "Client too slow"))
+
+    async def _run_heartbeat(self):
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL_SECONDS)
+            now = time.monotonic()
+            ping = EncodedMessage({"type": PING_TYPE, "ts": int(time.time())})
+            for client in list(self.clients.values()):
+                if client.reap_idle and now - client.last_seen > self.IDLE_TIMEOUT_SECONDS:
+                    # Half-open or abandoned: stop paying a send per broadcast for it
+                    self.counters["idle_reaped"] += 1
+                    self.disconnect(client.websocket)
+                    asyncio.create_task(self._close(client.websocket, "Idle timeout", IDLE_CLOSE_CODE))
+                else:
+                    self._enqueue(client, ping.payload(client.encoding))
+
+    async def _drain_clients(self):
+        clients = list(self.clients.values())
+        if not clients:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(client.queue.join() for client in clients)),
+                self.DRAIN_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Closing {len(clients)} WebSockets with messages still queued")
+        for client in clients:
+            self.disconnect(client.websocket)
+        await asyncio.gather(*(
+            self._close(client.websocket, "Server restarting", SERVER_RESTART_CLOSE_CODE)
+            for client in clients
+        ))
+
+    async def _write(self, client: ClientConnection):
+        while True:
+            payload = await client.queue.get()
+            send = client.websocket.send_bytes if isinstance(payload, bytes) else client.websocket.send_text
+            try:
+                await asyncio.wait_for(send(payload), self.SEND_TIMEOUT_SECONDS)
+                client.queue.task_done()
+            except asyncio.TimeoutError:
+                self.counters["send_timeouts"] += 1
+                logger.warning(
+                    f"WebSocket send timed out after {self.SEND_TIMEOUT_SECONDS}s on {client.describe()}"
+                )
+                self.disconnect(client.websocket)
+                await self._close(client.websocket, "Send timed out")
+                return
+            except Exception as e:
+                self.counters["send_errors"] += 1
+                logger.info(f"WebSocket send failed on {client.describe()}: {e!r}")
+                self.disconnect(client.websocket)
+                return
+            self.counters["messages_sent"] += 1
+
+    async def _close(self, websocket: WebSocket, reason: str, code: int = SLOW_CONSUMER_CLOSE_CODE):
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=code, reason=reason),
+                self.SEND_TIMEOUT_SECONDS
+            )
+        except Exception:
+            pass
+
+manager = ConnectionManager()
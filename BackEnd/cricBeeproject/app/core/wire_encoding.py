@@ -0,0 +1,112 @@
+"""
+Wire encodings a live socket can negotiate with ?encoding=.
+
+    json     JSON text frames (the default)
+    compact  JSON text with the keys of score messages replaced by short codes
+             and null fields left out
+    msgpack  the compact form as MessagePack binary frames
+
+The code table is built from the score message schemas and sent to compact
+and msgpack sockets as their first frame, {"type": "keys", "keys": {code: key}},
+so clients never hard-code it. Keys outside the table are sent unchanged;
+codes are upper case, so they can't clash with a real key. Whatever the
+encoding, clients still send their own messages as JSON text.
+"""
+import json
+from functools import lru_cache
+from itertools import product
+from string import ascii_uppercase
+from typing import Dict, Iterator, Optional, Type, Union, get_args
+
+import msgpack
+from pydantic import BaseModel
+
+ENCODING_JSON = "json"
+ENCODING_COMPACT = "compact"
+ENCODING_MSGPACK = "msgpack"
+ENCODINGS = (ENCODING_JSON, ENCODING_COMPACT, ENCODING_MSGPACK)
+
+KEYS_TYPE = "keys"
+
+# Keys of the messages wrapped around the schemas (snapshots, full updates, match events)
+ENVELOPE_KEYS = ("type", "match_id", "seq", "event_seq", "scoreboard", "last_ball", "result", "message")
+
+Payload = Union[str, bytes]
+
+
+def encode_message(message: dict) -> str:
+    # Same encoding as WebSocket.send_json, done once per broadcast instead of once per socket
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def _model_keys(model: Type[BaseModel], seen: set) -> Iterator[str]:
+    if model in seen:
+        return
+    seen.add(model)
+    for name, field in model.model_fields.items():
+        yield name
+        for candidate in (field.annotation, *get_args(field.annotation)):
+            for nested in (candidate, *get_args(candidate)):
+                if isinstance(nested, type) and issubclass(nested, BaseModel):
+                    yield from _model_keys(nested, seen)
+
+
+def _codes() -> Iterator[str]:
+    yield from ascii_uppercase
+    for first, second in product(ascii_uppercase, repeat=2):
+        yield first + second
+
+
+@lru_cache(maxsize=1)
+def key_codes() -> Dict[str, str]:
+    """key -> short code for every key of the live score messages."""
+    from app.schemas.organizer.match_score import LiveScoreboardResponse, ScorePatch
+
+    seen = set()
+    keys = set(ENVELOPE_KEYS)
+    for model in (LiveScoreboardResponse, ScorePatch):
+        keys.update(_model_keys(model, seen))
+    return dict(zip(sorted(keys), _codes()))
+
+
+def _compact(value):
+    if isinstance(value, dict):
+        codes = key_codes()
+        return {codes.get(key, key): _compact(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_compact(item) for item in value]
+    return value
+
+
+def encode_for(message: dict, encoding: str) -> Payload:
+    if encoding == ENCODING_COMPACT:
+        return encode_message(_compact(message))
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(_compact(message), use_bin_type=True)
+    return encode_message(message)
+
+
+def keys_frame(encoding: str) -> Optional[Payload]:
+    """The code table, for sockets whose encoding uses it; not itself compacted."""
+    if encoding == ENCODING_JSON:
+        return None
+    message = {"type": KEYS_TYPE, "keys": {code: key for key, code in key_codes().items()}}
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(message, use_bin_type=True)
+    return encode_message(message)
+
+
+class EncodedMessage:
+    """A message encoded at most once per encoding, however many sockets it goes to."""
+
+    def __init__(self, message: Optional[dict] = None, text: Optional[str] = None):
+        # Either the message, or its JSON text (decoded only if another encoding is asked for)
+        self._message = message
+        self._payloads: Dict[str, Payload] = {ENCODING_JSON: text} if text is not None else {}
+
+    def payload(self, encoding: str) -> Payload:
+        if encoding not in self._payloads:
+            if self._message is None:
+                self._message = json.loads(self._payloads[ENCODING_JSON])
+            self._payloads[encoding] = encode_for(self._message, encoding)
+        return self._payloads[encoding]
@@ -3,11 +3,12 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import async_engine, engine
 from app.core.celery_app import celery_app
 import logging
+from contextlib import asynccontextmanager
 
-from app.models.player import PlayerProfile  
+from app.models.player import PlayerProfile, PlayerCareerStats
 from app.models.club import Club  
 from app.models.club_player import ClubPlayer  
 from app.models.club_player_invitation import ClubPlayerInvitation
@@ -17,7 +18,7 @@ from app.models.admin.plan_pricing import TournamentPricingPlan
 from app.models.organizer.fixture_mode import FixtureMode
 from app.models.notification import Notification
 from app.models.organizer.tournament import Tournament, TournamentDetails, TournamentPayment, TournamentEnrollment
-from app.models.organizer.match_score import MatchScore, BallByBall, PlayerMatchStats
+from app.models.organizer.match_score import MatchScore, BallByBall, InningsOver, PlayerMatchStats
 from app.models.organizer.fixture import FixtureRound, Match, PlayingXI
 from app.models.organizer.point_table import PointTable
 from app.models.admin.transaction import AdminWallet, Transaction
@@ -33,11 +34,30 @@ from app.api.v1.fans import router as fans_router
 from app.api.v1.public import router as public_router  # Backward compatibility (deprecated)
 from app.api.v1.notifications import router as notification_router
 from app.api.v1.chat import router as chat_router
+from app.core.websocket_manager import manager
+from app.core.redis_config import RedisClient
+from app.services.chat_writer import chat_writer
+from app.services.fans.live_ticker import live_ticker
 
 Base.metadata.create_all(bind=engine)
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Starts this worker's subscription to live score/chat events and the
+    # dispatcher that publishes events queued by sync code
+    manager.add_listener(live_ticker.handle_event)
+    await manager.start()
+    # Flushes queued chat messages to Postgres in batches
+    await chat_writer.start()
+    yield
+    await chat_writer.stop()
+    await manager.stop()
+    await RedisClient.close_async()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 from dotenv import load_dotenv
 import os
 
@@ -87,4 +107,16 @@ app.include_router(notification_router, prefix="/api/v1")
 def health():
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
+
+
+@app.get("/health/websockets")
+def websocket_health():
+    # Fan-out counters for this worker
+    return manager.stats()
+
+
+@app.get("/health/chat-writer")
+async def chat_writer_health():
+    # Write-behind counters for this worker, plus the stream backlog shared by all
+    return await chat_writer.stats()
\ No newline at end of file
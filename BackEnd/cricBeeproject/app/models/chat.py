@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from sqlalchemy import func
@@ -14,4 +14,12 @@ class ChatMessage(Base):
     
     # Relationships
     user = relationship("User", backref="chat_messages")
-    match = relationship("Match", backref="chat_messages")
\ No newline at end of file
+    match = relationship("Match", backref="chat_messages")
+
+    # Fetch created_at with the INSERT so a new message can be sent without a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        # Latest messages of a match and keyset pages before a message
+        Index('ix_chat_messages_match_created', 'match_id', 'created_at', 'id'),
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Time, Boolean, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Time, Boolean, false, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -36,6 +36,12 @@ class Match(Base):
     winner_id = Column(Integer, ForeignKey("clubs.id", ondelete="SET NULL"), nullable=True, index=True)
     match_status = Column(String, nullable=True, default='upcoming')  # upcoming, live, completed, cancelled
     streaming_url = Column(String, nullable=True)  # YouTube or other streaming platform URL
+    # Set in the same transaction that adds the completed match to the point table
+    standings_applied = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Set in the same transaction that adds the match to its players' career stats
+    career_stats_applied = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Bumped in the same transaction as every innings or player change made outside update_score
+    state_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Numeric, Boolean, func, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Numeric, Boolean, func, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from decimal import Decimal
@@ -37,6 +37,7 @@ class BallByBall(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     match_id = Column(Integer, ForeignKey("matches.id", ondelete="CASCADE"), nullable=False, index=True)
+    innings_no = Column(Integer, nullable=False, default=1, server_default="1")  # 1 or 2; second innings overs are still stored after max_overs
     over_number = Column(Integer, nullable=False)
     ball_number = Column(Integer, nullable=False)  # 1-6 for valid balls, can be >6 for extras
     batsman_id = Column(Integer, ForeignKey("player_profiles.id", ondelete="SET NULL"), nullable=True)
@@ -60,6 +61,43 @@ class BallByBall(Base):
     dismissed_batsman = relationship("PlayerProfile", foreign_keys=[dismissed_batsman_id])
     
     __table_args__ = (
+        # Last ball of an innings, an over's deliveries, commentary pages
+        Index('ix_ball_by_ball_innings_position', 'match_id', 'innings_no', 'over_number', 'ball_number', 'id'),
+        # Legal deliveries per over (over complete / current ball)
+        Index(
+            'ix_ball_by_ball_legal_balls', 'match_id', 'innings_no', 'over_number',
+            postgresql_where=text('is_wide = false AND is_no_ball = false'),
+            sqlite_where=text('is_wide = 0 AND is_no_ball = 0')
+        ),
+        {'extend_existing': True},
+    )
+    # Fetch created_at with the INSERT so a scored ball can be returned without a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+class InningsOver(Base):
+    #Per-over totals of an innings, kept up to date as each ball is scored
+    __tablename__ = "innings_overs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    match_id = Column(Integer, ForeignKey("matches.id", ondelete="CASCADE"), nullable=False)
+    innings_no = Column(Integer, nullable=False)
+    over_number = Column(Integer, nullable=False)  # 1-based within the innings, unlike ball_by_ball.over_number
+    bowler_id = Column(Integer, ForeignKey("player_profiles.id", ondelete="SET NULL"), nullable=True)  # bowler of the first delivery
+    deliveries = Column(Integer, nullable=False, default=0)  # including wides and no balls
+    legal_balls = Column(Integer, nullable=False, default=0)
+    runs = Column(Integer, nullable=False, default=0)
+    bowler_runs = Column(Integer, nullable=False, default=0)  # runs minus byes and leg byes
+    wickets = Column(Integer, nullable=False, default=0)
+    extras = Column(Integer, nullable=False, default=0)
+    total_runs = Column(Integer, nullable=False, default=0)  # innings score at the end of the over
+    total_wickets = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    match = relationship("Match")
+    bowler = relationship("PlayerProfile")
+    
+    __table_args__ = (
+        UniqueConstraint('match_id', 'innings_no', 'over_number', name='uq_innings_over'),
         {'extend_existing': True},
     )
 
@@ -24,10 +24,13 @@ class PointTable(Base):
     # Points (Win = 2, Loss = 0, Tie = 1, No Result = 1)
     points = Column(Integer, nullable=False, default=0)          # Pts - Total points
     
-    # Net Run Rate calculation
+    # Net Run Rate calculation; NRR is computed from the integer ball counts,
+    # overs_faced/overs_bowled mirror them in overs notation (14 balls -> 2.2)
     runs_scored = Column(Integer, nullable=False, default=0)     # Total runs scored
+    balls_faced = Column(Integer, nullable=False, default=0, server_default="0")   # Legal balls faced
     overs_faced = Column(Numeric(10, 1), nullable=False, default=Decimal('0.0'))  # Total overs faced
     runs_conceded = Column(Integer, nullable=False, default=0)   # Total runs conceded
+    balls_bowled = Column(Integer, nullable=False, default=0, server_default="0")  # Legal balls bowled
     overs_bowled = Column(Numeric(10, 1), nullable=False, default=Decimal('0.0'))  # Total overs bowled
     net_run_rate = Column(Numeric(6, 3), nullable=False, default=Decimal('0.000'))  # NRR - Net Run Rate
     
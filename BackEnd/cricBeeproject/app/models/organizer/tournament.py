@@ -36,6 +36,8 @@ class Tournament(Base):
     fixture_mode_id = Column(Integer, ForeignKey("fixture_modes.id"), nullable=True)
     status = Column(String, nullable=False, default=TournamentStatus.PENDING_PAYMENT.value)
     winner_team_id = Column(Integer, ForeignKey("clubs.id"), nullable=True)
+    # Bumped in the same transaction as every change to the tournament's standings
+    standings_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
@@ -1,5 +1,5 @@
 # app/models/player.py
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime, func
+from sqlalchemy import Boolean, Column, Integer, String, Date, ForeignKey, DateTime, false, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -16,4 +16,39 @@ class PlayerProfile(Base):
     
     clubs = relationship("ClubPlayer", back_populates="player", cascade="all, delete-orphan")
     club_invitations = relationship("ClubPlayerInvitation", back_populates="player", cascade="all, delete-orphan")
-    user = relationship("User", back_populates="player_profile")
\ No newline at end of file
+    user = relationship("User", back_populates="player_profile")
+
+
+class PlayerCareerStats(Base):
+    # Career totals, kept up to date as each match completes (career_stats_service)
+    __tablename__ = "player_career_stats"
+
+    player_id = Column(Integer, ForeignKey("player_profiles.id", ondelete="CASCADE"), primary_key=True)
+    matches = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Batting
+    batting_innings = Column(Integer, nullable=False, default=0, server_default="0")
+    not_outs = Column(Integer, nullable=False, default=0, server_default="0")
+    runs = Column(Integer, nullable=False, default=0, server_default="0")
+    balls_faced = Column(Integer, nullable=False, default=0, server_default="0")
+    fours = Column(Integer, nullable=False, default=0, server_default="0")
+    sixes = Column(Integer, nullable=False, default=0, server_default="0")
+    fifties = Column(Integer, nullable=False, default=0, server_default="0")
+    hundreds = Column(Integer, nullable=False, default=0, server_default="0")
+    ducks = Column(Integer, nullable=False, default=0, server_default="0")
+    highest_score = Column(Integer, nullable=True)
+    highest_score_not_out = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    # Bowling; legal balls rather than overs notation, so totals add up
+    bowling_innings = Column(Integer, nullable=False, default=0, server_default="0")
+    balls_bowled = Column(Integer, nullable=False, default=0, server_default="0")
+    maidens = Column(Integer, nullable=False, default=0, server_default="0")
+    runs_conceded = Column(Integer, nullable=False, default=0, server_default="0")
+    wickets = Column(Integer, nullable=False, default=0, server_default="0")
+    five_wicket_hauls = Column(Integer, nullable=False, default=0, server_default="0")
+    best_bowling_wickets = Column(Integer, nullable=True)
+    best_bowling_runs = Column(Integer, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    player = relationship("PlayerProfile")
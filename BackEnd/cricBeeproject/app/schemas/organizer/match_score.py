@@ -112,6 +112,17 @@ class PlayerMatchStatsResponse(BaseModel):
         from_attributes = True
 
 # Live Scoreboard Response
+class WinProbabilityResponse(BaseModel):
+    # Simulated from the current score; the three chances add up to 1
+    batting_team_win: float
+    bowling_team_win: float
+    tie: float
+    # Median simulated total, with the 10th to 90th percentile range
+    projected_score: int
+    projected_score_low: int
+    projected_score_high: int
+    simulations: int
+
 class LiveScoreboardResponse(BaseModel):
     match_id: int
     match_status: str
@@ -141,6 +152,87 @@ class LiveScoreboardResponse(BaseModel):
     target: Optional[int] = None  
     total_overs: Optional[Decimal] = None  
     streaming_url: Optional[str] = None  
+    seq: Optional[int] = None  # Balls recorded so far, matches the seq of live score patches
+    win_probability: Optional[WinProbabilityResponse] = None
+
+class CommentaryPageResponse(BaseModel):
+    match_id: int
+    innings_number: int
+    balls: List[BallByBallResponse] = []
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page; None on the last page
+
+# Over-by-over charts, read from innings_overs
+class WormPoint(BaseModel):
+    over_number: int
+    total_runs: int
+    total_wickets: int
+    run_rate: Optional[Decimal] = None
+
+class WormInnings(BaseModel):
+    innings_number: int
+    team_id: Optional[int] = None
+    overs: List[WormPoint] = []
+
+class WormResponse(BaseModel):
+    match_id: int
+    innings: List[WormInnings] = []
+
+class ManhattanBar(BaseModel):
+    over_number: int
+    runs: int
+    wickets: int
+    extras: int
+    bowler_id: Optional[int] = None
+    is_maiden: bool
+
+class ManhattanInnings(BaseModel):
+    innings_number: int
+    team_id: Optional[int] = None
+    maidens: int
+    overs: List[ManhattanBar] = []
+
+class ManhattanResponse(BaseModel):
+    match_id: int
+    innings: List[ManhattanInnings] = []
+
+# Live score delta protocol - one patch per ball instead of the whole scoreboard
+class PlayerStatsPatch(BaseModel):
+    player_id: int
+    team_id: int
+    runs: int
+    balls_faced: int
+    fours: int
+    sixes: int
+    strike_rate: Optional[Decimal] = None
+    is_out: bool
+    dismissal_type: Optional[str] = None
+    dismissed_by_player_id: Optional[int] = None
+    overs_bowled: Decimal
+    maidens: int
+    runs_conceded: int
+    wickets_taken: int
+    economy: Optional[Decimal] = None
+    is_batting: bool
+    is_bowling: bool
+
+class ScorePatch(BaseModel):
+    type: str = "score_patch"
+    match_id: int
+    seq: int
+    innings_number: int
+    batting_score: MatchScoreResponse
+    ball: BallByBallResponse
+    player_stats: List[PlayerStatsPatch] = []
+    current_batsman_id: Optional[int] = None
+    current_batsman_name: Optional[str] = None
+    current_non_striker_id: Optional[int] = None
+    current_non_striker_name: Optional[str] = None
+    current_bowler_id: Optional[int] = None
+    current_bowler_name: Optional[str] = None
+    current_over: int
+    current_ball: int
+    needs_bowler_selection: bool
+    win_probability: Optional[WinProbabilityResponse] = None
 
 # Update Score Request
 class UpdateScoreRequest(BaseModel):
@@ -32,6 +32,8 @@ class PointTableResponse(BaseModel):
     runs_conceded: Optional[int] = 0
     overs_faced: Optional[float] = 0.0
     overs_bowled: Optional[float] = 0.0
+    balls_faced: Optional[int] = 0
+    balls_bowled: Optional[int] = 0
     
     class Config:
         from_attributes = True
@@ -2,6 +2,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, date, time
+from decimal import Decimal
 from app.schemas.user import UserRead 
 
 class PlayerCreate(BaseModel):
@@ -67,10 +68,43 @@ class PlayerDashboardMatch(BaseModel):
     class Config:
         from_attributes = True
 
+class PlayerCareerStatsResponse(BaseModel):
+    player_id: int
+    matches: int = 0
+
+    # Batting
+    batting_innings: int = 0
+    not_outs: int = 0
+    runs: int = 0
+    balls_faced: int = 0
+    fours: int = 0
+    sixes: int = 0
+    fifties: int = 0
+    hundreds: int = 0
+    ducks: int = 0
+    highest_score: Optional[int] = None
+    highest_score_not_out: bool = False
+    batting_average: Optional[Decimal] = None
+    strike_rate: Optional[Decimal] = None
+
+    # Bowling
+    bowling_innings: int = 0
+    balls_bowled: int = 0
+    overs_bowled: Decimal = Decimal('0.0')
+    maidens: int = 0
+    runs_conceded: int = 0
+    wickets: int = 0
+    five_wicket_hauls: int = 0
+    economy: Optional[Decimal] = None
+    bowling_average: Optional[Decimal] = None
+    bowling_strike_rate: Optional[Decimal] = None
+    best_bowling: Optional[str] = None  # e.g. "3/12"
+
 class PlayerDashboardResponse(BaseModel):
     club: Optional[PlayerDashboardClub] = None
     tournaments: List[PlayerDashboardTournament] = []
     matches: List[PlayerDashboardMatch] = []
+    career: Optional[PlayerCareerStatsResponse] = None
     stats: dict = {
         "total_tournaments": 0,
         "upcoming_matches": 0,
@@ -0,0 +1,147 @@
+"""
+Recent chat history per match, kept serialized in Redis.
+
+Every sent message is appended to its match's buffer (a sorted set of ids
+scored by send time, plus a hash of the encoded messages) and the oldest
+are trimmed past BUFFER_SIZE. The first reader of a match warms the buffer
+from Postgres once; after that, sockets joining and the latest-page REST
+read never touch the database. Messages appended before the warm-up are
+merged in by id, so messages still waiting in the write-behind stream are
+not lost. Older pages come from get_messages_before (keyset on created_at, id).
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.redis_config import RedisClient
+from app.core.websocket_manager import encode_message
+from app.db.session import AsyncSessionLocal
+from app.models.chat import ChatMessage
+from app.services.chat_services import format_chat_message_for_response, get_chat_messages_async
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 100
+BUFFER_TTL_SECONDS = 6 * 60 * 60
+
+# KEYS: ids zset, messages hash. ARGV: size, ttl, warm flag, then (id, score, body) triples.
+# Adds the messages (first copy of an id wins), drops the oldest past size.
+_ADD_MESSAGES = """
+local size = tonumber(ARGV[1])
+for i = 4, #ARGV, 3 do
+    if redis.call('HSETNX', KEYS[2], ARGV[i], ARGV[i + 2]) == 1 then
+        redis.call('ZADD', KEYS[1], ARGV[i + 1], ARGV[i])
+    end
+end
+local excess = redis.call('ZCARD', KEYS[1]) - size
+if excess > 0 then
+    local old = redis.call('ZRANGE', KEYS[1], 0, excess - 1)
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, excess - 1)
+    redis.call('HDEL', KEYS[2], unpack(old))
+end
+if ARGV[3] == '1' then
+    redis.call('HSET', KEYS[2], 'warm', '1')
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 1
+"""
+
+# KEYS: ids zset, messages hash. ARGV: count. Returns nil until the buffer is warm.
+_READ_MESSAGES = """
+if redis.call('HEXISTS', KEYS[2], 'warm') == 0 then
+    return false
+end
+local ids = redis.call('ZRANGE', KEYS[1], -tonumber(ARGV[1]), -1)
+if #ids == 0 then
+    return {}
+end
+return redis.call('HMGET', KEYS[2], unpack(ids))
+"""
+
+
+def _ids_key(match_id: int) -> str:
+    return f"chat:recent:{match_id}:ids"
+
+
+def _messages_key(match_id: int) -> str:
+    return f"chat:recent:{match_id}:messages"
+
+
+def _score(message_data: dict) -> int:
+    # Microseconds since the epoch fit exactly in a double
+    return int(datetime.fromisoformat(message_data["created_at"]).timestamp() * 1_000_000)
+
+
+async def _add_messages(match_id: int, messages: List[dict], warm: bool):
+    args = []
+    for message_data in messages:
+        args += [message_data["id"], _score(message_data), encode_message(message_data)]
+    await RedisClient.get_async_client().eval(
+        _ADD_MESSAGES, 2, _ids_key(match_id), _messages_key(match_id),
+        BUFFER_SIZE, BUFFER_TTL_SECONDS, 1 if warm else 0, *args
+    )
+
+
+async def remember_message(match_id: int, message_data: dict):
+    """Append a just-sent message to its match's buffer."""
+    try:
+        await _add_messages(match_id, [message_data], warm=False)
+    except RedisError as e:
+        logger.error(f"Chat buffer append failed for match {match_id}: {e}")
+
+
+async def _load_from_db(match_id: int) -> List[dict]:
+    async with AsyncSessionLocal() as db:
+        messages = await get_chat_messages_async(db, match_id, limit=BUFFER_SIZE)
+        return [format_chat_message_for_response(msg) for msg in reversed(messages)]
+
+
+async def get_recent_messages(match_id: int, limit: int = BUFFER_SIZE) -> List[str]:
+    """The match's latest messages, oldest first, already encoded."""
+    limit = min(limit, BUFFER_SIZE)
+    redis_client = RedisClient.get_async_client()
+    keys = (_ids_key(match_id), _messages_key(match_id))
+    try:
+        encoded = await redis_client.eval(_READ_MESSAGES, 2, *keys, limit)
+        if encoded is not None:
+            return [body for body in encoded if body is not None]
+        await _add_messages(match_id, await _load_from_db(match_id), warm=True)
+        encoded = await redis_client.eval(_READ_MESSAGES, 2, *keys, limit)
+        return [body for body in encoded or [] if body is not None]
+    except RedisError as e:
+        logger.error(f"Chat buffer read failed for match {match_id}: {e}")
+        messages = await _load_from_db(match_id)
+        return [encode_message(message_data) for message_data in messages[-limit:]]
+
+
+async def get_messages_before(
+    db: AsyncSession,
+    match_id: int,
+    before: int,
+    limit: int = BUFFER_SIZE
+) -> Optional[List[dict]]:
+    """The page of messages sent before message `before`, oldest first; None if that message isn't in the match."""
+    cursor = (await db.execute(
+        select(ChatMessage.created_at, ChatMessage.id)
+        .where(ChatMessage.id == before, ChatMessage.match_id == match_id)
+    )).first()
+    if cursor is None:
+        return None
+
+    result = await db.execute(
+        select(ChatMessage)
+        .options(joinedload(ChatMessage.user))
+        .where(
+            ChatMessage.match_id == match_id,
+            tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(cursor.created_at, cursor.id)
+        )
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(limit)
+    )
+    return [format_chat_message_for_response(msg) for msg in reversed(result.scalars().all())]
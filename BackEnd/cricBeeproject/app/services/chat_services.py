@@ -1,4 +1,6 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from app.models.chat import ChatMessage
 from typing import List
 
@@ -20,11 +22,22 @@ def create_chat_message(
 
 def get_chat_messages(db: Session, match_id: int, limit: int = 100) -> List[ChatMessage]:
     return db.query(ChatMessage)\
+        .options(joinedload(ChatMessage.user))\
         .filter(ChatMessage.match_id == match_id)\
-        .order_by(ChatMessage.created_at.desc())\
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())\
         .limit(limit)\
         .all()
 
+async def get_chat_messages_async(db: AsyncSession, match_id: int, limit: int = 100) -> List[ChatMessage]:
+    result = await db.execute(
+        select(ChatMessage)
+        .options(joinedload(ChatMessage.user))
+        .where(ChatMessage.match_id == match_id)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
 def format_chat_message_for_response(chat_message: ChatMessage) -> dict:
     return {
         "id": chat_message.id,
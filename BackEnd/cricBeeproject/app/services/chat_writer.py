@@ -0,0 +1,271 @@
+"""
+Write-behind persistence for chat messages.
+
+A message gets its id and timestamp up front, is appended to a Redis Stream
+and broadcast straight away; the sender never waits on a Postgres commit.
+ChatWriter, started with the app lifespan, reads the stream as a consumer
+group and bulk-inserts what it read once BATCH_SIZE messages are waiting or
+FLUSH_INTERVAL_SECONDS after the first one, then acknowledges the batch.
+
+Restarts lose nothing: a worker re-reads its own unacknowledged entries on
+start, and entries stranded by a worker that died are claimed by another
+after CLAIM_IDLE_MS. Ids come from the chat_messages sequence, so a batch
+written twice (inserted, then the worker died before XACK) is skipped by
+ON CONFLICT (id) DO NOTHING.
+
+A batch the database rejects for its data (a foreign key or value error)
+is split in halves until the rows at fault are found; those go to
+DEAD_LETTER_KEY with the error and are acknowledged, so one bad message
+can't hold up everyone else's. Any other failure leaves the batch
+unacknowledged and is retried.
+"""
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+
+from app.core.redis_config import RedisClient
+from app.db.session import AsyncSessionLocal
+from app.models.chat import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "chat:write-behind"
+GROUP_NAME = "chat-writers"
+DEAD_LETTER_KEY = "chat:write-behind:dead"
+DEAD_LETTER_MAX_LENGTH = 10000
+
+# Raised for the rows themselves; writing the same rows again can't succeed
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+class ChatIdAllocator:
+    """Hands out chat_messages ids, reserving them from the table's sequence a block at a time."""
+
+    BLOCK_SIZE = 100
+
+    def __init__(self, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self._ids: List[int] = []
+        self._lock = asyncio.Lock()
+
+    async def next_id(self) -> int:
+        async with self._lock:
+            if not self._ids:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        text("SELECT nextval(pg_get_serial_sequence('chat_messages', 'id')) FROM generate_series(1, :count)"),
+                        {"count": self.block_size}
+                    )
+                    self._ids = sorted(row[0] for row in result)
+            return self._ids.pop(0)
+
+
+def _stream_fields(message_data: dict, match_id: int) -> Dict[str, str]:
+    return {
+        "id": str(message_data["id"]),
+        "match_id": str(match_id),
+        "user_id": str(message_data["user_id"]),
+        "message": message_data["message"],
+        "created_at": message_data["created_at"],
+    }
+
+
+def _row_from_fields(fields: Dict[str, str]) -> dict:
+    return {
+        "id": int(fields["id"]),
+        "match_id": int(fields["match_id"]),
+        "user_id": int(fields["user_id"]),
+        "message": fields["message"],
+        "created_at": datetime.fromisoformat(fields["created_at"]),
+    }
+
+
+async def insert_chat_rows(rows: List[dict]):
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(ChatMessage).values(rows).on_conflict_do_nothing(index_elements=["id"]))
+        await db.commit()
+
+
+class ChatWriter:
+    BATCH_SIZE = 500
+    FLUSH_INTERVAL_SECONDS = 0.25
+    READ_BLOCK_MS = 1000
+    CLAIM_IDLE_MS = 60000
+    RETRY_DELAY_SECONDS = 1.0
+    MAX_RETRY_DELAY_SECONDS = 30.0
+
+    def __init__(self, client=None):
+        # client is a redis.asyncio.Redis; defaults to the shared async client
+        self.client = client
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.ids = ChatIdAllocator()
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {
+            "queued": 0,
+            "written": 0,
+            "batches": 0,
+            "write_failures": 0,
+            "direct_writes": 0,
+            "dead_lettered": 0,
+        }
+
+    async def start(self):
+        if self._task is not None:
+            return
+        if self.client is None:
+            self.client = RedisClient.get_async_client()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Whatever is still unacknowledged stays in the stream for the next start
+        try:
+            await self._flush(await self._read("0", self.BATCH_SIZE, None))
+        except (RedisError, SQLAlchemyError, OSError) as e:
+            logger.error(f"Final chat flush failed, left in {STREAM_KEY}: {e}")
+
+    async def enqueue(self, user_id: int, user_name: str, match_id: int, message: str) -> dict:
+        """Assign an id, queue the message for writing and return it ready to broadcast."""
+        message_data = {
+            "id": await self.ids.next_id(),
+            "user_id": user_id,
+            "user_name": user_name,
+            "message": message,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        fields = _stream_fields(message_data, match_id)
+        try:
+            await self.client.xadd(STREAM_KEY, fields)
+            self.counters["queued"] += 1
+        except (RedisError, OSError) as e:
+            # Nowhere durable to queue it; write it now instead of losing it
+            logger.error(f"Chat stream unavailable, writing message directly: {e}")
+            await insert_chat_rows([_row_from_fields(fields)])
+            self.counters["direct_writes"] += 1
+        return message_data
+
+    async def stats(self) -> dict:
+        try:
+            backlog = await self.client.xlen(STREAM_KEY) if self.client is not None else 0
+        except (RedisError, OSError):
+            backlog = None
+        return {**self.counters, "backlog": backlog}
+
+    async def _ensure_group(self):
+        try:
+            await self.client.xgroup_create(STREAM_KEY, GROUP_NAME, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _read(self, stream_id: str, count: int, block: Optional[int]) -> List[Tuple[str, dict]]:
+        response = await self.client.xreadgroup(
+            GROUP_NAME, self.consumer, {STREAM_KEY: stream_id}, count=count, block=block
+        )
+        return response[0][1] if response else []
+
+    async def _claim_stranded(self) -> List[Tuple[str, dict]]:
+        _, entries, _ = await self.client.xautoclaim(
+            STREAM_KEY, GROUP_NAME, self.consumer,
+            min_idle_time=self.CLAIM_IDLE_MS, start_id="0-0", count=self.BATCH_SIZE
+        )
+        return entries
+
+    async def _next_batch(self) -> List[Tuple[str, dict]]:
+        entries = await self._claim_stranded()
+        if entries:
+            return entries
+        entries = await self._read(">", self.BATCH_SIZE, self.READ_BLOCK_MS)
+        if not entries:
+            # Don't spin if the server answers without blocking
+            await asyncio.sleep(self.FLUSH_INTERVAL_SECONDS)
+        elif len(entries) < self.BATCH_SIZE:
+            # Give a busy chat a moment to fill the batch
+            await asyncio.sleep(self.FLUSH_INTERVAL_SECONDS)
+            entries += await self._read(">", self.BATCH_SIZE - len(entries), None)
+        return entries
+
+    async def _write(self, rows: List[Tuple[str, dict, dict]]) -> List[Tuple[str, dict, str]]:
+        """Insert (entry_id, fields, row)s; returns those the database refuses, with why."""
+        try:
+            await insert_chat_rows([row for _, _, row in rows])
+            return []
+        except ROW_ERRORS as e:
+            if len(rows) == 1:
+                entry_id, fields, _ = rows[0]
+                return [(entry_id, fields, str(getattr(e, "orig", e)))]
+        middle = len(rows) // 2
+        return await self._write(rows[:middle]) + await self._write(rows[middle:])
+
+    async def _flush(self, entries: List[Tuple[str, dict]]):
+        entries = [(entry_id, fields) for entry_id, fields in entries if fields]
+        if not entries:
+            return
+
+        rows = []
+        rejected = []
+        for entry_id, fields in entries:
+            try:
+                rows.append((entry_id, fields, _row_from_fields(fields)))
+            except (KeyError, ValueError) as e:
+                rejected.append((entry_id, fields, f"Malformed entry: {e!r}"))
+        if rows:
+            rejected += await self._write(rows)
+
+        entry_ids = [entry_id for entry_id, _ in entries]
+        async with self.client.pipeline(transaction=True) as pipe:
+            for entry_id, fields, error in rejected:
+                logger.error(f"Chat message {fields.get('id')} can't be written, moved to {DEAD_LETTER_KEY}: {error}")
+                pipe.xadd(
+                    DEAD_LETTER_KEY, {**fields, "stream_id": entry_id, "error": error[:500]},
+                    maxlen=DEAD_LETTER_MAX_LENGTH, approximate=True
+                )
+            pipe.xack(STREAM_KEY, GROUP_NAME, *entry_ids)
+            pipe.xdel(STREAM_KEY, *entry_ids)
+            await pipe.execute()
+        self.counters["written"] += len(entries) - len(rejected)
+        self.counters["dead_lettered"] += len(rejected)
+        self.counters["batches"] += 1
+
+    async def _run(self):
+        delay = self.RETRY_DELAY_SECONDS
+        # "0" re-reads this worker's own unacknowledged entries before taking new ones
+        next_id = "0"
+        while True:
+            try:
+                await self._ensure_group()
+                if next_id == "0":
+                    entries = await self._read("0", self.BATCH_SIZE, None)
+                    if not entries:
+                        next_id = ">"
+                        continue
+                else:
+                    entries = await self._next_batch()
+                await self._flush(entries)
+                delay = self.RETRY_DELAY_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, SQLAlchemyError, OSError) as e:
+                self.counters["write_failures"] += 1
+                logger.error(f"Chat flush failed, retrying in {delay:.0f}s: {e}")
+                next_id = "0"
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY_SECONDS)
+
+
+chat_writer = ChatWriter()
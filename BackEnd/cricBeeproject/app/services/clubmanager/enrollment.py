@@ -8,6 +8,7 @@ from app.models.user import User, UserRole
 from app.models.admin.transaction import Transaction, TransactionType, TransactionStatus, TransactionDirection
 from app.services.admin.transaction_service import generate_transaction_id, create_transaction
 from app.services.organizer.payment_service import create_razorpay_order, verify_payment_signature
+from app.services.organizer.point_table_service import bump_standings_version
 from app.schemas.organizer.tournament import TournamentResponse
 from app.schemas.clubmanager.enrollment import TournamentEnrollmentResponse, MyEnrollmentResponse
 from app.core.config import settings
@@ -273,6 +274,8 @@ def verify_and_complete_enrollment(
 
     enrollment.payment_status = PaymentStatus.SUCCESS.value
     enrollment.updated_at = datetime.now()
+    # The club now has a place in the standings
+    bump_standings_version(db, tournament_id)
     
     db.flush()
     db.refresh(enrollment)
@@ -414,6 +417,7 @@ def remove_club_from_tournament_with_refund(
 
     enrollment.payment_status = PaymentStatus.REFUNDED.value
     enrollment.updated_at = datetime.now()
+    bump_standings_version(db, tournament_id)
     
     # Save club manager ID before deleting enrollment (for future notifications)
 
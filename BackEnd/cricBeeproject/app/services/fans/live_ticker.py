@@ -0,0 +1,187 @@
+"""
+Live ticker: a compact summary of every live match, kept in memory on each worker.
+
+The summaries are loaded with one query (live matches, their batting score
+and ball count), then kept current from the score events every worker
+already receives through the broadcast backend: each ball patch updates
+its match in place and is pushed to this worker's ticker subscribers.
+Match start, innings end and completion reload the summaries. GET /live
+reads the same summaries, so neither polling nor pushing costs a query per
+match. A reload also happens when the summaries are older than
+RELOAD_INTERVAL_SECONDS, in case a match changed status outside those events.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from fastapi import WebSocket
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+
+from app.core.websocket_manager import EVENT_SCORE, TOPIC_SCORE, TOPIC_TICKER, manager
+from app.db.session import SessionLocal
+from app.models.organizer.fixture import Match
+from app.models.organizer.match_score import BallByBall, MatchScore
+
+logger = logging.getLogger(__name__)
+
+# Match events that change which matches are live or who is batting
+RELOAD_EVENT_TYPES = ("match_started", "innings_ended", "match_completed")
+
+
+class TickerEntry:
+    def __init__(self, summary: dict, seq: int, sort_key: tuple):
+        self.summary = summary
+        # Balls recorded when the summary was built; older patches are ignored
+        self.seq = seq
+        self.sort_key = sort_key
+
+
+def _summary(match: Match, batting_score: Optional[MatchScore]) -> dict:
+    # Same shape GET /live has always returned
+    return {
+        "id": match.id,
+        "team_a_name": match.team_a.club_name if match.team_a else None,
+        "team_b_name": match.team_b.club_name if match.team_b else None,
+        "batting_team_name": match.batting_team.club_name if match.batting_team else None,
+        "score": f"{batting_score.runs}/{batting_score.wickets}" if batting_score else "0/0",
+        "overs": float(batting_score.overs) if batting_score and batting_score.overs else 0.0,
+        "tournament_name": match.tournament.tournament_name if match.tournament else None,
+        "venue": match.venue or "",
+        "match_date": match.match_date.isoformat() if match.match_date else None,
+        "match_time": match.match_time.strftime("%H:%M") if match.match_time else None
+    }
+
+
+def load_ticker_entries(db: Session) -> Dict[int, TickerEntry]:
+    live_match_ids = select(Match.id).where(Match.match_status == "live")
+    # Only live matches' deliveries are counted, not every ball ever recorded
+    ball_counts = db.query(
+        BallByBall.match_id,
+        func.count(BallByBall.id).label("balls")
+    ).filter(
+        BallByBall.match_id.in_(live_match_ids)
+    ).group_by(BallByBall.match_id).subquery()
+
+    rows = db.query(Match, MatchScore, ball_counts.c.balls).options(
+        joinedload(Match.team_a),
+        joinedload(Match.team_b),
+        joinedload(Match.tournament),
+        joinedload(Match.batting_team)
+    ).outerjoin(
+        MatchScore,
+        and_(MatchScore.match_id == Match.id, MatchScore.team_id == Match.batting_team_id)
+    ).outerjoin(
+        ball_counts, ball_counts.c.match_id == Match.id
+    ).filter(
+        Match.match_status == "live"
+    ).all()
+
+    entries = {}
+    for match, batting_score, balls in rows:
+        if match.id in entries:
+            continue
+        sort_key = (match.match_date.toordinal() if match.match_date else 0,
+                    match.match_time.isoformat() if match.match_time else "")
+        entries[match.id] = TickerEntry(_summary(match, batting_score), balls or 0, sort_key)
+    return entries
+
+
+class LiveTicker:
+    RELOAD_INTERVAL_SECONDS = 60.0
+
+    def __init__(self):
+        # Read from threadpool threads (GET /live), written on the event loop
+        self._lock = threading.Lock()
+        self._entries: Dict[int, TickerEntry] = {}
+        self._loaded_at: Optional[float] = None
+        self._reloads: Set[asyncio.Task] = set()
+
+    def reload(self, db: Session):
+        entries = load_ticker_entries(db)
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+
+    def _reload_with_new_session(self):
+        db = SessionLocal()
+        try:
+            self.reload(db)
+        finally:
+            db.close()
+
+    def _is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.RELOAD_INTERVAL_SECONDS
+
+    def get_live_matches(self, db: Session) -> List[dict]:
+        """Live match summaries, most recent first."""
+        if self._is_stale():
+            self.reload(db)
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry.sort_key, reverse=True)
+            return [dict(entry.summary) for entry in entries]
+
+    def snapshot_message(self, db: Session) -> dict:
+        return {"type": "ticker_snapshot", "matches": self.get_live_matches(db)}
+
+    def apply_patch(self, match_id: int, patch: dict) -> Optional[dict]:
+        """Update a match's summary from a ball patch; the new summary, or None if it changed nothing."""
+        batting_score = patch.get("batting_score") or {}
+        with self._lock:
+            entry = self._entries.get(match_id)
+            if entry is None or patch.get("seq", 0) <= entry.seq:
+                return None
+            entry.seq = patch["seq"]
+            entry.summary["score"] = f"{batting_score.get('runs', 0)}/{batting_score.get('wickets', 0)}"
+            entry.summary["overs"] = float(batting_score.get("overs") or 0)
+            if batting_score.get("team_name"):
+                entry.summary["batting_team_name"] = batting_score["team_name"]
+            return dict(entry.summary)
+
+    async def handle_event(self, topic: str, event: dict):
+        """Manager listener: keeps the summaries current and pushes changes to local ticker sockets."""
+        if not topic.startswith(f"{TOPIC_SCORE}:") or self._loaded_at is None:
+            # Nothing loaded on this worker yet; the first reader loads current data
+            return
+        match_id = int(topic.split(":", 1)[1])
+
+        if event.get("event") == EVENT_SCORE:
+            summary = self.apply_patch(match_id, event["patch"])
+            if summary is not None:
+                manager.deliver_local(TOPIC_TICKER, {"type": "ticker_update", "match": summary})
+            return
+
+        if event["message"].get("type") in RELOAD_EVENT_TYPES:
+            # In the background, so the backend's listener isn't held up by a query
+            task = asyncio.create_task(self._reload_and_push(match_id))
+            self._reloads.add(task)
+            task.add_done_callback(self._reloads.discard)
+
+    async def _reload_and_push(self, match_id: int):
+        try:
+            await run_in_threadpool(self._reload_with_new_session)
+        except Exception as e:
+            logger.error(f"Live ticker reload failed: {e}")
+            return
+        with self._lock:
+            entry = self._entries.get(match_id)
+            summary = dict(entry.summary) if entry else None
+        if summary is not None:
+            manager.deliver_local(TOPIC_TICKER, {"type": "ticker_update", "match": summary})
+        else:
+            manager.deliver_local(TOPIC_TICKER, {"type": "ticker_remove", "match_id": match_id})
+
+    async def send_snapshot(self, websocket: WebSocket):
+        def build():
+            db = SessionLocal()
+            try:
+                return self.snapshot_message(db)
+            finally:
+                db.close()
+        await manager.send_personal_message(await run_in_threadpool(build), websocket)
+
+
+live_ticker = LiveTicker()
@@ -1,22 +1,36 @@
 
 
 from . import fixture_service
+from . import innings_state
 from . import match_score_service
 from . import organization_service
+from . import over_summary
 from . import payment_service
 from . import point_table_service
+from . import qualification_scenarios
 from . import round_completion_service
 from . import round_progression_service
+from . import score_feed
+from . import scoreboard_cache
+from . import standings_cache
 from . import tournament_service
+from . import win_probability
 
 __all__ = [
     "fixture_service",
+    "innings_state",
     "match_score_service",
     "organization_service",
+    "over_summary",
     "payment_service",
     "point_table_service",
+    "qualification_scenarios",
     "round_completion_service",
     "round_progression_service",
+    "score_feed",
+    "scoreboard_cache",
+    "standings_cache",
     "tournament_service",
+    "win_probability",
 ]
 
@@ -9,6 +9,7 @@ from app.schemas.organizer.fixture import FixtureRoundCreate, MatchCreate, Match
 from typing import List, Dict, Optional
 from decimal import Decimal
 from app.services.organizer import point_table_service
+from app.services.organizer import scoreboard_cache
 
 
 
@@ -496,6 +497,9 @@ def update_match_details(
     db.commit()
     db.refresh(match)
     
+    # streaming_url is part of the scoreboard; the next read rebuilds it
+    scoreboard_cache.invalidate_scoreboard_snapshot(match.id)
+    
     return match
 
 def initialize_league_fixture_structure(
@@ -714,96 +718,41 @@ def calculate_league_standings(
     if not round:
         raise ValueError("Invalid round. Standings can only be calculated for Round 1 (League round)")
  
-    matches = db.query(Match).options(
-        joinedload(Match.team_a),
-        joinedload(Match.team_b)
+    # The point table covers the whole tournament, playoffs included, so the league
+    # standings are tallied from this round's matches alone, the same way
+    _, totals_by_team = point_table_service.completed_match_totals(db, tournament_id, round_id)
+    enrolled_teams = db.query(Club.id, Club.club_name).join(
+        TournamentEnrollment, TournamentEnrollment.club_id == Club.id
     ).filter(
-        Match.round_id == round_id,
-        Match.tournament_id == tournament_id,
-        Match.match_status == 'completed'
-    ).all()
-    
-    #
-    enrollments = db.query(TournamentEnrollment).join(Club).filter(
         TournamentEnrollment.tournament_id == tournament_id,
         TournamentEnrollment.payment_status == PaymentStatus.SUCCESS.value
     ).all()
     
-    # Initialize standings dictionary
-    standings = {}
-    for enrollment in enrollments:
-        standings[enrollment.club_id] = {
-            "team_id": enrollment.club_id,
-            "team_name": enrollment.club.club_name,
-            "matches_played": 0,
-            "wins": 0,
-            "losses": 0,
-            "points": 0,
-            "runs_scored": 0,
-            "runs_conceded": 0,
-            "overs_batted": Decimal('0.0'),
-            "overs_bowled": Decimal('0.0'),
-            "net_run_rate": Decimal('0.0')
-        }
-    
-    
-    for match in matches:
-        
-        team_a_score = db.query(MatchScore).filter(
-            MatchScore.match_id == match.id,
-            MatchScore.team_id == match.team_a_id
-        ).first()
-        
-        team_b_score = db.query(MatchScore).filter(
-            MatchScore.match_id == match.id,
-            MatchScore.team_id == match.team_b_id
-        ).first()
-        
-        if not team_a_score or not team_b_score:
-            continue  
-        
-        
-        standings[match.team_a_id]["matches_played"] += 1
-        standings[match.team_b_id]["matches_played"] += 1
-        
-        
-        team_a_runs = team_a_score.runs
-        team_b_runs = team_b_score.runs
-        
-        if team_a_runs > team_b_runs:
-            standings[match.team_a_id]["wins"] += 1
-            standings[match.team_a_id]["points"] += 2
-            standings[match.team_b_id]["losses"] += 1
-        elif team_b_runs > team_a_runs:
-            standings[match.team_b_id]["wins"] += 1
-            standings[match.team_b_id]["points"] += 2
-            standings[match.team_a_id]["losses"] += 1
-        
-        # Update runs and overs for NRR calculation
-        standings[match.team_a_id]["runs_scored"] += team_a_runs
-        standings[match.team_a_id]["runs_conceded"] += team_b_runs
-        standings[match.team_a_id]["overs_batted"] += team_a_score.overs
-        
-        standings[match.team_b_id]["runs_scored"] += team_b_runs
-        standings[match.team_b_id]["runs_conceded"] += team_a_runs
-        standings[match.team_b_id]["overs_batted"] += team_b_score.overs
-    
-
-    for team_id, stats in standings.items():
-        if stats["overs_batted"] > 0:
-            run_rate_for = Decimal(str(stats["runs_scored"])) / stats["overs_batted"]
-            #
-            run_rate_against = Decimal(str(stats["runs_conceded"])) / stats["overs_batted"] if stats["overs_batted"] > 0 else Decimal('0')
-            stats["net_run_rate"] = run_rate_for - run_rate_against
-    
-    # Sort by points (desc)
-    sorted_standings = sorted(
-        standings.values(),
-        key=lambda x: (x["points"], x["net_run_rate"]),
-        reverse=True
-    )
-    
-    return sorted_standings
+    standings = []
+    for team_id, team_name in enrolled_teams:
+        columns = point_table_service.point_columns(
+            totals_by_team.get(team_id, dict.fromkeys(point_table_service.TALLY_FIELDS, 0))
+        )
+        standings.append({
+            "team_id": team_id,
+            "team_name": team_name,
+            "matches_played": columns["matches_played"],
+            "wins": columns["matches_won"],
+            "losses": columns["matches_lost"],
+            "ties": columns["matches_tied"],
+            "points": columns["points"],
+            "runs_scored": columns["runs_scored"],
+            "runs_conceded": columns["runs_conceded"],
+            "balls_batted": columns["balls_faced"],
+            "balls_bowled": columns["balls_bowled"],
+            "overs_batted": columns["overs_faced"],
+            "overs_bowled": columns["overs_bowled"],
+            "net_run_rate": columns["net_run_rate"]
+        })
+    
+    # Same order as the point table: points, net run rate, wins, then name and id
+    standings.sort(key=lambda team: (-team["points"], -team["net_run_rate"], -team["wins"], team["team_name"], team["team_id"]))
+    return standings
 
 def get_qualified_teams_for_playoff(
     db: Session,
@@ -0,0 +1,639 @@
+"""
+In-memory innings state for live scoring.
+
+An InningsState is loaded from the database once per live match (normally when
+the match starts) and then advanced ball by ball, so update_score can validate
+and apply a delivery without re-reading the match, tournament, scores, last
+ball and player stats on every request.
+
+Each worker keeps its own cache, so a cached state can be behind the
+database. update_score checks the state against the match row (status,
+batting team and matches.state_version, which every innings or player
+change outside update_score bumps) and the batting score before writing a
+ball, and reloads the state when either has moved on.
+"""
+import asyncio
+import copy
+import threading
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.organizer.fixture import Match, PlayingXI
+from app.models.organizer.match_score import MatchScore, BallByBall, InningsOver, PlayerMatchStats
+from app.models.organizer.tournament import Tournament
+from app.models.player import PlayerProfile
+from app.models.user import User
+from app.schemas.organizer.match_score import UpdateScoreRequest
+
+
+def overs_from_balls(balls: int) -> Decimal:
+    # 14 legal balls -> 2.2 overs, the notation used across match_scores/player_match_stats
+    overs = Decimal(str(balls // 6)) + Decimal(str(balls % 6)) / Decimal('10')
+    return overs.quantize(Decimal('0.1'))
+
+
+def balls_from_overs(overs) -> int:
+    # 2.2 overs -> 14 legal balls; the digit after the point counts balls, not tenths
+    overs = Decimal(str(overs or 0))
+    whole = int(overs)
+    return whole * 6 + int((overs - whole) * 10)
+
+
+def rate_per_over(runs: int, balls: int) -> Optional[Decimal]:
+    if balls <= 0:
+        return None
+    return as_rate(Decimal(str(runs)) / (Decimal(str(balls)) / Decimal('6')))
+
+
+def as_rate(value: Decimal) -> Decimal:
+    # Same rounding the Numeric(5, 2) rate columns apply on write
+    return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+class PlayerTally:
+    """Running totals for one player_match_stats row."""
+
+    FIELDS = (
+        "runs", "balls_faced", "fours", "sixes", "is_out", "dismissal_type",
+        "dismissed_by_player_id", "balls_bowled", "maidens", "runs_conceded",
+        "wickets_taken", "is_batting", "is_bowling", "is_striker",
+    )
+
+    def __init__(self, player_id: int, team_id: int, stat_id: Optional[int] = None):
+        self.stat_id = stat_id
+        self.player_id = player_id
+        self.team_id = team_id
+        self.runs = 0
+        self.balls_faced = 0
+        self.fours = 0
+        self.sixes = 0
+        self.is_out = False
+        self.dismissal_type = None
+        self.dismissed_by_player_id = None
+        self.balls_bowled = 0
+        self.maidens = 0
+        self.runs_conceded = 0
+        self.wickets_taken = 0
+        self.is_batting = False
+        self.is_bowling = False
+        self.is_striker = False
+
+    @classmethod
+    def from_stat(cls, stat: PlayerMatchStats, balls_bowled: int = 0) -> "PlayerTally":
+        tally = cls(stat.player_id, stat.team_id, stat.id)
+        for field in cls.FIELDS:
+            if field != "balls_bowled":
+                setattr(tally, field, getattr(stat, field))
+        tally.balls_bowled = balls_bowled
+        return tally
+
+    def as_columns(self) -> dict:
+        columns = {
+            "player_id": self.player_id,
+            "team_id": self.team_id,
+            "runs": self.runs,
+            "balls_faced": self.balls_faced,
+            "fours": self.fours,
+            "sixes": self.sixes,
+            "is_out": self.is_out,
+            "dismissal_type": self.dismissal_type,
+            "dismissed_by_player_id": self.dismissed_by_player_id,
+            "overs_bowled": overs_from_balls(self.balls_bowled),
+            "maidens": self.maidens,
+            "runs_conceded": self.runs_conceded,
+            "wickets_taken": self.wickets_taken,
+            "is_batting": self.is_batting,
+            "is_bowling": self.is_bowling,
+            "is_striker": self.is_striker,
+        }
+        if self.balls_faced > 0:
+            columns["strike_rate"] = as_rate(
+                (Decimal(str(self.runs)) / Decimal(str(self.balls_faced))) * Decimal('100')
+            )
+        if self.balls_bowled > 0:
+            columns["economy"] = rate_per_over(self.runs_conceded, self.balls_bowled)
+        return columns
+
+
+class InningsState:
+    """Score, position and per-player totals of the innings in progress."""
+
+    def __init__(self, match_id: int):
+        self.match_id = match_id
+        self.tournament_id = None
+        self.organizer_id = None
+        self.match_status = None
+        self.team_a_id = None
+        self.team_b_id = None
+        self.batting_team_id = None
+        self.bowling_team_id = None
+        self.team_names: Dict[int, str] = {}
+        self.max_overs = 20
+        self.innings_number = 1
+        # first innings runs + 1, in the second innings
+        self.target = None
+
+        # batting team's match_scores row
+        self.score_id = None
+        self.runs = 0
+        self.wickets = 0
+        self.balls = 0
+        self.extras = 0
+        self.fours = 0
+        self.sixes = 0
+
+        # stored over_number of the last ball bowled (0 before the first ball)
+        self.over_number = 0
+        self.legal_balls_in_over = 0
+
+        # totals of the latest over, mirrored in its innings_overs row
+        self.over_bowler_id = None
+        self.over_deliveries = 0
+        self.over_runs = 0
+        self.over_bowler_runs = 0
+        self.over_wickets = 0
+        self.over_extras = 0
+
+        self.striker_id = None
+        self.non_striker_id = None
+        self.bowler_id = None
+
+        self.players: Dict[int, PlayerTally] = {}
+        self.playing_xi: Dict[int, int] = {}
+        self.player_names: Dict[int, str] = {}
+
+        # balls recorded in the whole match, used as the live score sequence number
+        self.ball_count = 0
+        # matches.state_version this state reflects
+        self.state_version = 0
+        self._dirty = set()
+
+    @property
+    def over_offset(self) -> int:
+        # Second innings overs are stored after the first innings' max_overs
+        return self.max_overs if self.innings_number == 2 else 0
+
+    @property
+    def max_balls(self) -> int:
+        return self.max_overs * 6
+
+    @property
+    def display_over(self) -> int:
+        over_number, _ = self.next_ball_position()
+        return over_number - self.over_offset
+
+    def copy(self) -> "InningsState":
+        return copy.deepcopy(self)
+
+    def player_name(self, player_id: Optional[int]) -> str:
+        return self.player_names.get(player_id, "Unknown")
+
+    def is_maiden_over(self) -> bool:
+        # Six legal balls, nothing charged to the bowler and no wides or no balls
+        return (self.legal_balls_in_over == 6 and self.over_bowler_runs == 0
+                and self.over_deliveries == self.legal_balls_in_over)
+
+    def next_ball_position(self) -> tuple[int, int]:
+        if self.over_number == 0:
+            return self.over_offset + 1, 1
+        if self.legal_balls_in_over >= 6:
+            return self.over_number + 1, 1
+        return self.over_number, self.legal_balls_in_over + 1
+
+    def score_snapshot(self) -> dict:
+        return {
+            "runs": self.runs,
+            "wickets": self.wickets,
+            "balls": self.balls,
+            "extras": self.extras,
+        }
+
+    def score_columns(self) -> dict:
+        columns = {
+            "runs": self.runs,
+            "wickets": self.wickets,
+            "balls": self.balls,
+            "overs": overs_from_balls(self.balls),
+            "extras": self.extras,
+            "fours": self.fours,
+            "sixes": self.sixes,
+        }
+        if self.balls > 0:
+            columns["run_rate"] = rate_per_over(self.runs, self.balls)
+        return columns
+
+    def over_columns(self) -> dict:
+        return {
+            "match_id": self.match_id,
+            "innings_no": self.innings_number,
+            "over_number": self.over_number - self.over_offset,
+            "bowler_id": self.over_bowler_id,
+            "deliveries": self.over_deliveries,
+            "legal_balls": self.legal_balls_in_over,
+            "runs": self.over_runs,
+            "bowler_runs": self.over_bowler_runs,
+            "wickets": self.over_wickets,
+            "extras": self.over_extras,
+            "total_runs": self.runs,
+            "total_wickets": self.wickets,
+        }
+
+    def dirty_players(self) -> list[PlayerTally]:
+        return [self.players[player_id] for player_id in self._dirty]
+
+    def sync_player(self, stat: PlayerMatchStats):
+        """Refresh flags and ids of a player whose stats row was changed outside update_score."""
+        tally = self.players.get(stat.player_id)
+        if not tally:
+            tally = PlayerTally.from_stat(stat)
+            self.players[stat.player_id] = tally
+        tally.stat_id = stat.id
+        tally.is_batting = stat.is_batting
+        tally.is_bowling = stat.is_bowling
+        tally.is_striker = stat.is_striker
+
+    def set_batsmen(self, striker_id: int, non_striker_id: int):
+        for tally in self.players.values():
+            if tally.team_id == self.batting_team_id:
+                tally.is_batting = False
+                tally.is_striker = False
+        for player_id, is_striker in ((striker_id, True), (non_striker_id, False)):
+            tally = self.players.get(player_id)
+            if tally:
+                tally.is_batting = True
+                tally.is_striker = is_striker
+        self.striker_id = striker_id
+        self.non_striker_id = non_striker_id
+
+    def set_bowler(self, bowler_id: int):
+        for tally in self.players.values():
+            if tally.team_id == self.bowling_team_id:
+                tally.is_bowling = False
+        tally = self.players.get(bowler_id)
+        if tally:
+            tally.is_bowling = True
+        self.bowler_id = bowler_id
+
+    def _tally_for(self, player_id: int, team_id: int, role: str, team_label: str) -> PlayerTally:
+        tally = self.players.get(player_id)
+        if tally and tally.team_id == team_id:
+            return tally
+        if tally or self.playing_xi.get(player_id) != team_id:
+            raise ValueError(f"{role} (ID: {player_id}) is not in the {team_label} team's Playing XI")
+        tally = PlayerTally(player_id, team_id)
+        self.players[player_id] = tally
+        return tally
+
+    def validate_ball(self, score_data: UpdateScoreRequest):
+        if self.match_status != 'live':
+            raise ValueError(f"Match is not live. Current status: {self.match_status}")
+
+        if not self.score_id:
+            raise ValueError("Match score not initialized. Please start the match first.")
+
+        if self.wickets >= 10:
+            raise ValueError("Innings is complete - all wickets have fallen")
+
+        if self.balls >= self.max_balls:
+            raise ValueError(f"Innings is complete - {self.max_overs} overs completed")
+
+        if not (score_data.is_wide or score_data.is_no_ball) and score_data.runs > 6:
+            raise ValueError("Runs must be between 0 and 6 for normal deliveries")
+
+        if score_data.is_wicket:
+            if not score_data.dismissed_batsman_id:
+                raise ValueError("Dismissed batsman ID is required when wicket falls")
+            if not score_data.wicket_type:
+                raise ValueError("Wicket type is required when wicket falls")
+
+    def apply_ball(self, score_data: UpdateScoreRequest) -> dict:
+        """Advance the innings by one delivery and return the ball_by_ball column values."""
+        self.validate_ball(score_data)
+        self._dirty = set()
+
+        over_number, ball_number = self.next_ball_position()
+        if over_number != self.over_number:
+            self.legal_balls_in_over = 0
+            self.over_bowler_id = score_data.bowler_id
+            self.over_deliveries = 0
+            self.over_runs = 0
+            self.over_bowler_runs = 0
+            self.over_wickets = 0
+            self.over_extras = 0
+
+        batsman = self._tally_for(score_data.batsman_id, self.batting_team_id, "Batsman", "batting")
+        bowler = self._tally_for(score_data.bowler_id, self.bowling_team_id, "Bowler", "bowling")
+        self._dirty.update((batsman.player_id, bowler.player_id))
+
+        runs = score_data.runs
+        is_extra = score_data.is_wide or score_data.is_no_ball
+        is_bye = score_data.is_bye or score_data.is_leg_bye
+
+        self.over_deliveries += 1
+        self.over_runs += runs
+        if is_extra or is_bye:
+            self.over_extras += runs
+        if not is_bye:
+            self.over_bowler_runs += runs
+
+        if is_extra or is_bye:
+            self.runs += runs
+            self.extras += runs
+        else:
+            self.runs += runs
+            batsman.runs += runs
+            batsman.balls_faced += 1
+            bowler.runs_conceded += runs
+
+        is_four = score_data.is_four or runs == 4
+        is_six = score_data.is_six or runs == 6
+        if is_four:
+            self.fours += 1
+            if not is_bye:
+                batsman.fours += 1
+        if is_six:
+            self.sixes += 1
+            if not is_bye:
+                batsman.sixes += 1
+
+        if not is_extra:
+            self.balls += 1
+            self.legal_balls_in_over += 1
+            bowler.balls_bowled += 1
+            if self.is_maiden_over():
+                bowler.maidens += 1
+
+        dismissed = None
+        if score_data.is_wicket:
+            dismissed = self.players.get(score_data.dismissed_batsman_id)
+            if not dismissed:
+                raise ValueError(f"Dismissed batsman (ID: {score_data.dismissed_batsman_id}) stats not found")
+            self.wickets += 1
+            self.over_wickets += 1
+            dismissed.is_out = True
+            dismissed.dismissal_type = score_data.wicket_type
+            dismissed.dismissed_by_player_id = score_data.bowler_id
+            bowler.wickets_taken += 1
+            self._dirty.add(dismissed.player_id)
+
+        batsman.is_batting = True
+        bowler.is_bowling = True
+        self.bowler_id = bowler.player_id
+        self.over_number = over_number
+
+        self._rotate_strike(score_data, batsman, dismissed)
+        self.ball_count += 1
+
+        return {
+            "match_id": self.match_id,
+            "innings_no": self.innings_number,
+            "over_number": over_number,
+            "ball_number": ball_number,
+            "batsman_id": score_data.batsman_id,
+            "bowler_id": score_data.bowler_id,
+            "runs": runs,
+            "is_wicket": score_data.is_wicket,
+            "wicket_type": score_data.wicket_type,
+            "dismissed_batsman_id": score_data.dismissed_batsman_id,
+            "is_wide": score_data.is_wide,
+            "is_no_ball": score_data.is_no_ball,
+            "is_bye": score_data.is_bye,
+            "is_leg_bye": score_data.is_leg_bye,
+            "is_four": is_four,
+            "is_six": is_six,
+            "commentary": score_data.commentary,
+        }
+
+    def _rotate_strike(self, score_data: UpdateScoreRequest, batsman: PlayerTally, dismissed: Optional[PlayerTally]):
+        if not self.striker_id:
+            self.striker_id = batsman.player_id
+        if not self.non_striker_id:
+            for tally in self.players.values():
+                if (tally.team_id == self.batting_team_id and tally.is_batting and not tally.is_out
+                        and tally.player_id != self.striker_id):
+                    self.non_striker_id = tally.player_id
+                    break
+
+        if dismissed:
+            dismissed.is_batting = False
+            dismissed.is_striker = False
+            if dismissed.player_id == self.striker_id:
+                self.striker_id, self.non_striker_id = self.non_striker_id, None
+            elif dismissed.player_id == self.non_striker_id:
+                self.non_striker_id = None
+            self._flag_batsmen()
+            return
+
+        if not self.non_striker_id:
+            self._flag_batsmen()
+            return
+
+        if self.legal_balls_in_over >= 6:
+            should_swap = True
+        elif score_data.is_wide:
+            should_swap = False
+        elif score_data.is_no_ball:
+            runs_from_bat = score_data.runs - 1 if score_data.runs > 1 else 0
+            if runs_from_bat > 0 and not score_data.is_bye and not score_data.is_leg_bye:
+                should_swap = runs_from_bat % 2 == 1
+            else:
+                should_swap = False
+        else:
+            should_swap = score_data.runs % 2 == 1
+
+        if should_swap:
+            self.striker_id, self.non_striker_id = self.non_striker_id, self.striker_id
+        self._flag_batsmen()
+
+    def _flag_batsmen(self):
+        for player_id, is_striker in ((self.striker_id, True), (self.non_striker_id, False)):
+            tally = self.players.get(player_id)
+            if tally and (tally.is_striker != is_striker or not tally.is_batting):
+                tally.is_striker = is_striker
+                tally.is_batting = True
+                self._dirty.add(player_id)
+
+
+def load_innings_state(db: Session, match_id: int) -> InningsState:
+    match = db.query(Match).options(
+        joinedload(Match.team_a),
+        joinedload(Match.team_b),
+        joinedload(Match.tournament).joinedload(Tournament.details)
+    ).filter(Match.id == match_id).first()
+
+    if not match:
+        raise ValueError(f"Match with ID {match_id} not found")
+
+    state = InningsState(match_id)
+    state.tournament_id = match.tournament_id
+    state.organizer_id = match.tournament.organizer_id if match.tournament else None
+    state.match_status = match.match_status
+    state.team_a_id = match.team_a_id
+    state.team_b_id = match.team_b_id
+    state.batting_team_id = match.batting_team_id
+    state.bowling_team_id = match.bowling_team_id
+    state.state_version = match.state_version
+    for team in (match.team_a, match.team_b):
+        if team:
+            state.team_names[team.id] = team.club_name
+    if match.tournament and match.tournament.details:
+        state.max_overs = match.tournament.details.overs
+
+    scores = {
+        score.team_id: score
+        for score in db.query(MatchScore).filter(MatchScore.match_id == match_id).all()
+    }
+    other_team_id = match.team_a_id if match.batting_team_id == match.team_b_id else match.team_b_id
+    other_team_score = scores.get(other_team_id)
+    if other_team_score and other_team_score.balls > 0:
+        state.innings_number = 2
+        state.target = other_team_score.runs + 1
+
+    batting_score = scores.get(match.batting_team_id)
+    if batting_score:
+        state.score_id = batting_score.id
+        state.runs = batting_score.runs
+        state.wickets = batting_score.wickets
+        state.balls = batting_score.balls
+        state.extras = batting_score.extras
+        state.fours = batting_score.fours
+        state.sixes = batting_score.sixes
+
+    playing_xi = db.query(PlayingXI.player_id, PlayingXI.club_id, User.full_name).outerjoin(
+        PlayerProfile, PlayerProfile.id == PlayingXI.player_id
+    ).outerjoin(
+        User, User.id == PlayerProfile.user_id
+    ).filter(PlayingXI.match_id == match_id).all()
+    for player_id, club_id, full_name in playing_xi:
+        state.playing_xi[player_id] = club_id
+        if full_name:
+            state.player_names[player_id] = full_name
+
+    balls_bowled = {}
+    for bowler_id, total, legal in db.query(
+        BallByBall.bowler_id,
+        func.count(BallByBall.id),
+        func.count(BallByBall.id).filter(BallByBall.is_wide == False, BallByBall.is_no_ball == False)
+    ).filter(
+        BallByBall.match_id == match_id
+    ).group_by(BallByBall.bowler_id).all():
+        balls_bowled[bowler_id] = legal
+        state.ball_count += total
+
+    for stat in db.query(PlayerMatchStats).filter(PlayerMatchStats.match_id == match_id).all():
+        state.players[stat.player_id] = PlayerTally.from_stat(stat, balls_bowled.get(stat.player_id, 0))
+
+    for tally in state.players.values():
+        if tally.team_id == state.batting_team_id and tally.is_batting and not tally.is_out:
+            if tally.is_striker and not state.striker_id:
+                state.striker_id = tally.player_id
+            elif not tally.is_striker and not state.non_striker_id:
+                state.non_striker_id = tally.player_id
+        elif tally.team_id == state.bowling_team_id and tally.is_bowling and not state.bowler_id:
+            state.bowler_id = tally.player_id
+
+    last_over = db.query(func.max(BallByBall.over_number)).filter(
+        BallByBall.match_id == match_id,
+        BallByBall.innings_no == state.innings_number
+    ).scalar()
+    if last_over:
+        state.over_number = last_over
+        over = db.query(InningsOver).filter(
+            InningsOver.match_id == match_id,
+            InningsOver.innings_no == state.innings_number,
+            InningsOver.over_number == last_over - state.over_offset
+        ).first()
+        if over:
+            state.over_bowler_id = over.bowler_id
+            state.over_deliveries = over.deliveries
+            state.legal_balls_in_over = over.legal_balls
+            state.over_runs = over.runs
+            state.over_bowler_runs = over.bowler_runs
+            state.over_wickets = over.wickets
+            state.over_extras = over.extras
+
+    return state
+
+
+_states: Dict[int, InningsState] = {}
+_locks: Dict[int, threading.Lock] = {}
+_registry_lock = threading.Lock()
+_async_locks: Dict[int, asyncio.Lock] = {}
+
+
+def match_lock(match_id: int) -> threading.Lock:
+    """Serializes scoring transitions of one match within this process."""
+    with _registry_lock:
+        lock = _locks.get(match_id)
+        if lock is None:
+            lock = _locks[match_id] = threading.Lock()
+        return lock
+
+
+def async_match_lock(match_id: int) -> asyncio.Lock:
+    """Queues same-match scoring coroutines before they take match_lock.
+
+    Scoring run through AsyncSession.run_sync holds match_lock on the event
+    loop thread while it awaits the database; a second request for the same
+    match blocking on it there would stall the whole loop.
+    """
+    lock = _async_locks.get(match_id)
+    if lock is None:
+        lock = _async_locks[match_id] = asyncio.Lock()
+    return lock
+
+
+def get_innings_state(db: Session, match_id: int) -> InningsState:
+    state = _states.get(match_id)
+    if state is None:
+        state = load_innings_state(db, match_id)
+        _states[match_id] = state
+    return state
+
+
+def store_innings_state(state: InningsState):
+    _states[state.match_id] = state
+
+
+def invalidate_innings_state(match_id: int):
+    _states.pop(match_id, None)
+
+
+def forget_match(match_id: int):
+    """Drop the state and locks kept for a match that has finished."""
+    with match_lock(match_id):
+        _states.pop(match_id, None)
+    with _registry_lock:
+        _locks.pop(match_id, None)
+    _async_locks.pop(match_id, None)
+
+
+def bump_state_version(db: Session, match_id: int) -> int:
+    """Mark the match's innings state changed; returns the new version, which takes effect when the caller commits."""
+    db.query(Match).filter(
+        Match.id == match_id
+    ).update(
+        {Match.state_version: Match.state_version + 1},
+        synchronize_session=False
+    )
+    return db.query(Match.state_version).filter(Match.id == match_id).scalar()
+
+
+def apply_committed_change(match_id: int, version: int, change: Callable[[InningsState], None]):
+    """
+    Bring this worker's cached state up to a change committed at `version`.
+    A cache that was not current just before the change is dropped instead,
+    and the next ball reloads it.
+    """
+    with match_lock(match_id):
+        state = _states.get(match_id)
+        if state is None:
+            return
+        if state.state_version == version - 1:
+            change(state)
+            state.state_version = version
+        else:
+            _states.pop(match_id, None)
@@ -1,9 +1,12 @@
 ﻿from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from decimal import Decimal
 from typing import Optional, List, Tuple
+from app.db.session import SessionLocal
 from app.models.organizer.fixture import Match
-from app.models.organizer.match_score import MatchScore, BallByBall, PlayerMatchStats
+from app.models.organizer.match_score import MatchScore, BallByBall, InningsOver, PlayerMatchStats
 from app.models.organizer.tournament import Tournament
 from app.models.club import Club
 from app.models.player import PlayerProfile
@@ -11,15 +14,20 @@ from app.schemas.organizer.match_score import (
     TossUpdate,
     UpdateScoreRequest,
     LiveScoreboardResponse,
+    CommentaryPageResponse,
     MatchScoreResponse,
     BallByBallResponse,
     PlayerMatchStatsResponse,
-    TossResponse
+    TossResponse,
+    WinProbabilityResponse
 )
 from app.models.organizer.fixture import PlayingXI
 from app.services.organizer import point_table_service
+from app.services.organizer import innings_state
+from app.services.organizer import over_summary
+from app.services.organizer import scoreboard_cache
+from app.services.organizer.win_probability import win_probability_model
 import math
-import asyncio
 import logging
 import traceback
  
@@ -71,6 +79,7 @@ def update_toss(
     if toss_data.toss_decision not in ['bat', 'bowl']:
         raise ValueError("Toss decision must be 'bat' or 'bowl'")
     
+    innings_state.bump_state_version(db, match_id)
     
     match.toss_winner_id = toss_data.toss_winner_id
     match.toss_decision = toss_data.toss_decision
@@ -87,563 +96,133 @@ def update_toss(
     
     db.commit()
     db.refresh(match)
+    scoreboard_cache.refresh_scoreboard_snapshot(db, match_id)
 
-def update_score(
+
+class StaleInningsStateError(Exception):
+    """The batting score changed underneath the cached innings state."""
+
+
+def _lock_match_state(db: Session, state: innings_state.InningsState) -> bool:
+    # Locks the match row for the delivery's transaction, so an innings or player
+    # change on any worker either committed before this check or waits for the ball
+    match_row = db.query(
+        Match.match_status, Match.batting_team_id, Match.state_version
+    ).filter(Match.id == state.match_id).with_for_update().one()
+    return tuple(match_row) == (state.match_status, state.batting_team_id, state.state_version)
+
+
+def _persist_ball(
+    db: Session,
+    previous: innings_state.InningsState,
+    state: innings_state.InningsState,
+    ball_values: dict
+) -> BallByBall:
+    # One transaction per delivery (begun by _lock_match_state): insert the ball,
+    # compare-and-set the batting score against the values the state was derived
+    # from, then bulk-update the player rows the delivery touched and write the
+    # over's innings_overs row.
+    ball_record = BallByBall(**ball_values)
+    db.add(ball_record)
+
+    new_stats = []
+    for tally in state.dirty_players():
+        if tally.stat_id is None:
+            stat = PlayerMatchStats(match_id=state.match_id, **tally.as_columns())
+            db.add(stat)
+            new_stats.append((tally, stat))
+    db.flush()
+    for tally, stat in new_stats:
+        tally.stat_id = stat.id
+
+    result = db.execute(
+        update(MatchScore).where(
+            MatchScore.id == state.score_id,
+            *[getattr(MatchScore, column) == value for column, value in previous.score_snapshot().items()]
+        ).values(**state.score_columns()).execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise StaleInningsStateError()
+
+    stat_rows = [
+        {"id": tally.stat_id, **tally.as_columns()}
+        for tally in state.dirty_players()
+        if all(tally is not new_tally for new_tally, _ in new_stats)
+    ]
+    if stat_rows:
+        db.execute(update(PlayerMatchStats), stat_rows)
+
+    over_values = state.over_columns()
+    result = db.execute(
+        update(InningsOver).where(
+            InningsOver.match_id == state.match_id,
+            InningsOver.innings_no == over_values["innings_no"],
+            InningsOver.over_number == over_values["over_number"]
+        ).values(**over_values).execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.add(InningsOver(**over_values))
+
+    db.expunge(ball_record)
+    db.commit()
+    return ball_record
+
+
+def _record_ball(
     db: Session,
     match_id: int,
     organizer_id: int,
     score_data: UpdateScoreRequest
-) -> BallByBall:
+) -> Tuple[BallByBall, innings_state.InningsState]:
    
     logger.info(f"Starting score update for match_id: {match_id}, organizer_id: {organizer_id}")
     logger.debug(f"Score data: {score_data}")
     
+    if not score_data:
+        raise ValueError("Score data is required")
+    
+    if score_data.runs is None or score_data.runs < 0:
+        raise ValueError("Runs must be a non-negative number")
+    
+    if score_data.batsman_id is None:
+        raise ValueError("Batsman ID is required")
+    
+    if score_data.bowler_id is None:
+        raise ValueError("Bowler ID is required")
+    
     try:
-        # Validate input parameters
-        if not score_data:
-            raise ValueError("Score data is required")
-        
-        if score_data.runs is None or score_data.runs < 0:
-            raise ValueError("Runs must be a non-negative number")
-        
-        if score_data.batsman_id is None:
-            raise ValueError("Batsman ID is required")
-        
-        if score_data.bowler_id is None:
-            raise ValueError("Bowler ID is required")
-        
-        logger.info(f"Validated input parameters - batsman: {score_data.batsman_id}, bowler: {score_data.bowler_id}, runs: {score_data.runs}")
-        
-        # Fetch and validate match
-        try:
-            match = db.query(Match).options(
-                joinedload(Match.batting_team),
-                joinedload(Match.bowling_team)
-            ).filter(Match.id == match_id).first()
-            
-            if not match:
-                raise ValueError(f"Match with ID {match_id} not found")
-            
-            logger.info(f"Found match: {match.id}, status: {match.match_status}")
-            
-        except Exception as e:
-            logger.error(f"Database error fetching match {match_id}: {str(e)}")
-            raise ValueError(f"Failed to fetch match: {str(e)}")
-        
-        # Validate tournament and organizer access
-        try:
-            tournament = db.query(Tournament).filter(
-                Tournament.id == match.tournament_id,
-                Tournament.organizer_id == organizer_id
-            ).first()
-            
-            if not tournament:
-                raise ValueError(f"Tournament not found or access denied for organizer {organizer_id}")
-            
-            logger.info(f"Validated tournament access: {tournament.id}")
-            
-        except Exception as e:
-            logger.error(f"Database error validating tournament access: {str(e)}")
-            raise ValueError(f"Failed to validate tournament access: {str(e)}")
-        
-        # Validate match status
-        if match.match_status != 'live':
-            logger.warning(f"Attempt to update score for non-live match. Status: {match.match_status}")
-            raise ValueError(f"Match is not live. Current status: {match.match_status}")
-        
-        # Fetch batting score with error handling
-        try:
-            batting_score = db.query(MatchScore).filter(
-                MatchScore.match_id == match_id,
-                MatchScore.team_id == match.batting_team_id
-            ).first()
-            
-            if not batting_score:
-                logger.error(f"Batting score not initialized for match {match_id}, team {match.batting_team_id}")
-                raise ValueError("Match score not initialized. Please start the match first.")
-            
-            logger.info(f"Found batting score: runs={batting_score.runs}, wickets={batting_score.wickets}, balls={batting_score.balls}")
-            
-        except Exception as e:
-            logger.error(f"Database error fetching batting score: {str(e)}")
-            raise ValueError(f"Failed to fetch batting score: {str(e)}")
-        
-        # Get tournament details and validate innings completion
-        try:
-            tournament_details = tournament.details
-            max_overs = tournament_details.overs if tournament_details else 20
-            max_balls = max_overs * 6
-            
-            logger.info(f"Tournament overs: {max_overs}, max balls: {max_balls}")
-            
-            # Check if innings is complete
-            if batting_score.wickets >= 10:
-                logger.warning(f"Innings complete - all wickets fallen ({batting_score.wickets})")
-                raise ValueError("Innings is complete - all wickets have fallen")
-            
-            if batting_score.balls >= max_balls:
-                logger.warning(f"Innings complete - overs completed ({batting_score.balls}/{max_balls})")
-                raise ValueError(f"Innings is complete - {max_overs} overs completed")
+        with innings_state.match_lock(match_id):
+            # A second attempt reloads the state if another worker scored in between
+            for attempt in range(2):
+                state = innings_state.get_innings_state(db, match_id)
                 
-        except Exception as e:
-            if "Innings is complete" in str(e):
-                raise
-            logger.error(f"Error validating tournament details: {str(e)}")
-            raise ValueError(f"Failed to validate tournament details: {str(e)}")
-        
-        # Validate score data constraints
-        try:
-            if score_data.is_wide or score_data.is_no_ball:
-                if score_data.runs < 0:
-                    raise ValueError("Runs cannot be negative for wide/no-ball")
-            else:
-                if score_data.runs < 0 or score_data.runs > 6:
-                    raise ValueError("Runs must be between 0 and 6 for normal deliveries")
-            
-            # Validate wicket data
-            if score_data.is_wicket:
-                if not score_data.dismissed_batsman_id:
-                    raise ValueError("Dismissed batsman ID is required when wicket falls")
-                if not score_data.wicket_type:
-                    raise ValueError("Wicket type is required when wicket falls")
-            
-            logger.info(f"Score data validation passed")
-            
-        except ValueError as e:
-            logger.warning(f"Score data validation failed: {str(e)}")
-            raise
-        except Exception as e:
-            logger.error(f"Unexpected error during score validation: {str(e)}")
-            raise ValueError(f"Score validation failed: {str(e)}")
-        
-        # Determine over and ball numbers with error handling
-        try:
-            other_team_id = match.team_a_id if match.batting_team_id == match.team_b_id else match.team_b_id
-            other_team_score = db.query(MatchScore).filter(
-                MatchScore.match_id == match_id,
-                MatchScore.team_id == other_team_id
-            ).first()
-            
-            is_second_innings = other_team_score and other_team_score.balls > 0
-            logger.info(f"Innings type: {'second' if is_second_innings else 'first'}")
-            
-            # Calculate current over and ball
-            if is_second_innings:
-                last_ball = db.query(BallByBall).filter(
-                    BallByBall.match_id == match_id,
-                    BallByBall.over_number > max_overs
-                ).order_by(
-                    BallByBall.over_number.desc(),
-                    BallByBall.ball_number.desc()
-                ).first()
-                
-                if not last_ball:
-                    current_over = 1
-                    current_ball = 1
-                    actual_over_number = max_overs + 1
-                else:
-                    display_over = last_ball.over_number - max_overs
-                    balls_in_last_over = db.query(BallByBall).filter(
-                        BallByBall.match_id == match_id,
-                        BallByBall.over_number == last_ball.over_number,
-                        BallByBall.is_wide == False,
-                        BallByBall.is_no_ball == False
-                    ).count()
-                    
-                    if balls_in_last_over >= 6:
-                        display_over = display_over + 1
-                        current_ball = 1
-                    else:
-                        current_ball = balls_in_last_over + 1
-                    
-                    current_over = display_over
-                    actual_over_number = max_overs + display_over
-            else:
-                last_ball = db.query(BallByBall).filter(
-                    BallByBall.match_id == match_id,
-                    BallByBall.over_number <= max_overs
-                ).order_by(
-                    BallByBall.over_number.desc(),
-                    BallByBall.ball_number.desc()
-                ).first()
-                
-                if last_ball:
-                    actual_over_number = last_ball.over_number
-                    current_over = last_ball.over_number
-                    balls_in_last_over = db.query(BallByBall).filter(
-                        BallByBall.match_id == match_id,
-                        BallByBall.over_number == current_over,
-                        BallByBall.is_wide == False,
-                        BallByBall.is_no_ball == False
-                    ).count()
-                    
-                    if balls_in_last_over >= 6:
-                        actual_over_number = current_over + 1
-                        current_over = current_over + 1
-                        current_ball = 1
-                    else:
-                        current_ball = balls_in_last_over + 1
-                else:
-                    actual_over_number = 1
-                    current_over = 1
-                    current_ball = 1
-            
-            logger.info(f"Calculated over/ball: over={actual_over_number}, ball={current_ball}, display_over={current_over}")
-            
-        except Exception as e:
-            logger.error(f"Error calculating over/ball numbers: {str(e)}")
-            raise ValueError(f"Failed to calculate over/ball numbers: {str(e)}")
-        
-        # Get or create batsman stats with error handling
-        try:
-            batsman_stat = db.query(PlayerMatchStats).filter(
-                PlayerMatchStats.match_id == match_id,
-                PlayerMatchStats.player_id == score_data.batsman_id
-            ).first()
-            
-            if not batsman_stat:
-                logger.info(f"Creating new batsman stats for player {score_data.batsman_id}")
-                
-                batsman_playing_xi = db.query(PlayingXI).filter(
-                    PlayingXI.match_id == match_id,
-                    PlayingXI.player_id == score_data.batsman_id,
-                    PlayingXI.club_id == match.batting_team_id
-                ).first()
-                
-                if not batsman_playing_xi:
-                    logger.error(f"Batsman {score_data.batsman_id} not in batting team's Playing XI")
-                    raise ValueError(f"Batsman (ID: {score_data.batsman_id}) is not in the batting team's Playing XI")
-                
-                batsman_stat = PlayerMatchStats(
-                    match_id=match_id,
-                    player_id=score_data.batsman_id,
-                    team_id=match.batting_team_id,
-                    runs=0,
-                    balls_faced=0,
-                    fours=0,
-                    sixes=0,
-                    is_out=False,
-                    overs_bowled=Decimal('0.0'),
-                    maidens=0,
-                    runs_conceded=0,
-                    wickets_taken=0,
-                    is_batting=False,
-                    is_bowling=False,
-                    is_striker=False
-                )
-                db.add(batsman_stat)
-                logger.info(f"Created batsman stats for player {score_data.batsman_id}")
-            
-        except ValueError as e:
-            raise
-        except Exception as e:
-            logger.error(f"Error handling batsman stats: {str(e)}")
-            raise ValueError(f"Failed to handle batsman stats: {str(e)}")
-        
-        # Get or create bowler stats with error handling
-        try:
-            bowler_stat = db.query(PlayerMatchStats).filter(
-                PlayerMatchStats.match_id == match_id,
-                PlayerMatchStats.player_id == score_data.bowler_id
-            ).first()
-            
-            if not bowler_stat:
-                logger.info(f"Creating new bowler stats for player {score_data.bowler_id}")
+                if state.organizer_id != organizer_id:
+                    raise ValueError(f"Tournament not found or access denied for organizer {organizer_id}")
                 
-                bowler_playing_xi = db.query(PlayingXI).filter(
-                    PlayingXI.match_id == match_id,
-                    PlayingXI.player_id == score_data.bowler_id,
-                    PlayingXI.club_id == match.bowling_team_id
-                ).first()
+                # Checked before the ball is validated against the state, which may be behind
+                if not _lock_match_state(db, state):
+                    logger.warning(f"Innings state for match {match_id} is behind the match, reloading")
+                    db.rollback()
+                    innings_state.invalidate_innings_state(match_id)
+                    continue
                 
-                if not bowler_playing_xi:
-                    logger.error(f"Bowler {score_data.bowler_id} not in bowling team's Playing XI")
-                    raise ValueError(f"Bowler (ID: {score_data.bowler_id}) is not in the bowling team's Playing XI")
+                next_state = state.copy()
+                ball_values = next_state.apply_ball(score_data)
                 
-                bowler_stat = PlayerMatchStats(
-                    match_id=match_id,
-                    player_id=score_data.bowler_id,
-                    team_id=match.bowling_team_id,
-                    runs=0,
-                    balls_faced=0,
-                    fours=0,
-                    sixes=0,
-                    is_out=False,
-                    overs_bowled=Decimal('0.0'),
-                    maidens=0,
-                    runs_conceded=0,
-                    wickets_taken=0,
-                    is_batting=False,
-                    is_bowling=False,
-                    is_striker=False
-                )
-                db.add(bowler_stat)
-                logger.info(f"Created bowler stats for player {score_data.bowler_id}")
+                try:
+                    ball_record = _persist_ball(db, state, next_state, ball_values)
+                except StaleInningsStateError:
+                    logger.warning(f"Innings state for match {match_id} was stale, reloading")
+                    db.rollback()
+                    innings_state.invalidate_innings_state(match_id)
+                    continue
                 
-        except ValueError as e:
-            raise
-        except Exception as e:
-            logger.error(f"Error handling bowler stats: {str(e)}")
-            raise ValueError(f"Failed to handle bowler stats: {str(e)}")
-        
-        # Update scores and stats with comprehensive error handling
-        try:
-            actual_runs = score_data.runs
-            
-            # Update batting and bowling scores
-            if score_data.is_wide or score_data.is_no_ball:
-                batting_score.extras += actual_runs
-                batting_score.runs += actual_runs
-                logger.debug(f"Updated extras for wide/no-ball: +{actual_runs}")
-            elif score_data.is_bye or score_data.is_leg_bye:
-                batting_score.runs += actual_runs
-                batting_score.extras += actual_runs
-                logger.debug(f"Updated runs for bye/leg-bye: +{actual_runs}")
+                innings_state.store_innings_state(next_state)
+                break
             else:
-                batting_score.runs += actual_runs
-                batsman_stat.runs += actual_runs
-                batsman_stat.balls_faced += 1
-                bowler_stat.runs_conceded += actual_runs
-                logger.debug(f"Updated normal scoring: batsman +{actual_runs}, bowler +{actual_runs}")
-            
-            # Update boundaries
-            if score_data.is_four or actual_runs == 4:
-                batting_score.fours += 1
-                if not score_data.is_bye and not score_data.is_leg_bye:
-                    batsman_stat.fours += 1
-                logger.debug("Updated four count")
-            
-            if score_data.is_six or actual_runs == 6:
-                batting_score.sixes += 1
-                if not score_data.is_bye and not score_data.is_leg_bye:
-                    batsman_stat.sixes += 1
-                logger.debug("Updated six count")
-            
-            # Handle legal balls
-            legal_ball_bowled = False
-            if not score_data.is_wide and not score_data.is_no_ball:
-                batting_score.balls += 1
-                legal_ball_bowled = True
-                
-                existing_legal_balls = db.query(BallByBall).filter(
-                    BallByBall.match_id == match_id,
-                    BallByBall.bowler_id == score_data.bowler_id,
-                    BallByBall.is_wide == False,
-                    BallByBall.is_no_ball == False
-                ).count()
-                
-                total_legal_balls = existing_legal_balls + 1
-                bowler_stat.overs_bowled = Decimal(str(total_legal_balls // 6)) + Decimal(str(total_legal_balls % 6)) / Decimal('10')
-                logger.debug(f"Updated bowler overs: {bowler_stat.overs_bowled}")
-            
-            # Handle wickets
-            if score_data.is_wicket:
-                batting_score.wickets += 1
-                logger.info(f"Wicket fallen: {score_data.wicket_type}, batsman: {score_data.dismissed_batsman_id}")
-                
-                dismissed_stat = db.query(PlayerMatchStats).filter(
-                    PlayerMatchStats.match_id == match_id,
-                    PlayerMatchStats.player_id == score_data.dismissed_batsman_id
-                ).first()
-                
-                if dismissed_stat:
-                    dismissed_stat.is_out = True
-                    dismissed_stat.dismissal_type = score_data.wicket_type
-                    if score_data.bowler_id:
-                        dismissed_stat.dismissed_by_player_id = score_data.bowler_id
-                else:
-                    logger.error(f"Dismissed batsman stats not found: {score_data.dismissed_batsman_id}")
-                    raise ValueError(f"Dismissed batsman (ID: {score_data.dismissed_batsman_id}) stats not found")
-                
-                if score_data.dismissed_batsman_id == score_data.batsman_id:
-                    batsman_stat.is_out = True
-                    batsman_stat.dismissal_type = score_data.wicket_type
-                
-                bowler_stat.wickets_taken += 1
-                logger.debug(f"Updated wicket stats")
-            
-            # Calculate rates and economy
-            batting_score.overs = Decimal(str(batting_score.balls // 6)) + Decimal(str(batting_score.balls % 6)) / Decimal('10')
-            
-            if batting_score.balls > 0:
-                batting_score.run_rate = Decimal(str(batting_score.runs)) / (Decimal(str(batting_score.balls)) / Decimal('6'))
-            
-            if batsman_stat.balls_faced > 0:
-                batsman_stat.strike_rate = (Decimal(str(batsman_stat.runs)) / Decimal(str(batsman_stat.balls_faced))) * Decimal('100')
-            
-            if bowler_stat.overs_bowled > 0:
-                bowler_balls = int(bowler_stat.overs_bowled) * 6 + int((bowler_stat.overs_bowled % 1) * 10)
-                if bowler_balls > 0:
-                    bowler_stat.economy = Decimal(str(bowler_stat.runs_conceded)) / (Decimal(str(bowler_balls)) / Decimal('6'))
-            
-            # Update batting/bowling status
-            batsman_stat.is_batting = True
-            bowler_stat.is_bowling = True
-            
-            logger.info("Successfully updated all scores and stats")
-            
-        except Exception as e:
-            logger.error(f"Error updating scores and stats: {str(e)}")
-            logger.error(traceback.format_exc())
-            raise ValueError(f"Failed to update scores and stats: {str(e)}")
+                raise ValueError("Score was updated concurrently. Please retry.")
         
-        # Create ball record with error handling
-        try:
-            ball_record = BallByBall(
-                match_id=match_id,
-                over_number=actual_over_number,
-                ball_number=current_ball,
-                batsman_id=score_data.batsman_id,
-                bowler_id=score_data.bowler_id,
-                runs=actual_runs,
-                is_wicket=score_data.is_wicket,
-                wicket_type=score_data.wicket_type,
-                dismissed_batsman_id=score_data.dismissed_batsman_id,
-                is_wide=score_data.is_wide,
-                is_no_ball=score_data.is_no_ball,
-                is_bye=score_data.is_bye,
-                is_leg_bye=score_data.is_leg_bye,
-                is_four=score_data.is_four or actual_runs == 4,
-                is_six=score_data.is_six or actual_runs == 6,
-                commentary=score_data.commentary
-            )
-            
-            db.add(ball_record)
-            db.commit()
-            db.refresh(ball_record)
-            db.refresh(batting_score)
-            db.refresh(batsman_stat)
-            db.refresh(bowler_stat)
-            
-            logger.info(f"Created ball record: over={actual_over_number}, ball={current_ball}, runs={actual_runs}")
-            
-        except Exception as e:
-            logger.error(f"Error creating ball record: {str(e)}")
-            logger.error(traceback.format_exc())
-            db.rollback()
-            raise ValueError(f"Failed to create ball record: {str(e)}")
-        
-        # Handle striker rotation with error handling
-        try:
-            balls_in_over = db.query(BallByBall).filter(
-                BallByBall.match_id == match_id,
-                BallByBall.over_number == current_over,
-                BallByBall.is_wide == False,
-                BallByBall.is_no_ball == False
-            ).count()
-            
-            over_complete = balls_in_over >= 6
-            
-            current_batsmen = db.query(PlayerMatchStats).filter(
-                PlayerMatchStats.match_id == match_id,
-                PlayerMatchStats.team_id == match.batting_team_id,
-                PlayerMatchStats.is_batting == True,
-                PlayerMatchStats.is_out == False
-            ).all()
-            
-            striker_stat = None
-            non_striker_stat = None
-            
-            for stat in current_batsmen:
-                if stat.is_striker:
-                    striker_stat = stat
-                else:
-                    non_striker_stat = stat
-            
-            if not striker_stat:
-                striker_stat = batsman_stat
-                if batsman_stat not in current_batsmen:
-                    batsman_stat.is_batting = True
-                    batsman_stat.is_striker = True
-            
-            if not striker_stat:
-                striker_stat = batsman_stat
-                striker_stat.is_striker = True
-                striker_stat.is_batting = True
-            
-            if not non_striker_stat:
-                for stat in current_batsmen:
-                    if stat.player_id != striker_stat.player_id:
-                        non_striker_stat = stat
-                        break
-            
-            # Perform striker rotation if both players are available
-            if striker_stat and non_striker_stat:
-                should_swap = False
-                
-                if score_data.is_wicket:
-                    dismissed_stat = db.query(PlayerMatchStats).filter(
-                        PlayerMatchStats.match_id == match_id,
-                        PlayerMatchStats.player_id == score_data.dismissed_batsman_id
-                    ).first()
-                    
-                    if dismissed_stat:
-                        was_striker = dismissed_stat.is_striker
-                        dismissed_stat.is_striker = False
-                        dismissed_stat.is_batting = False
-                        should_swap = was_striker
-                elif over_complete:
-                    should_swap = True
-                elif score_data.is_wide:
-                    should_swap = False
-                elif score_data.is_no_ball:
-                    runs_from_bat = actual_runs - 1 if actual_runs > 1 else 0
-                    if runs_from_bat > 0 and not score_data.is_bye and not score_data.is_leg_bye:
-                        should_swap = (runs_from_bat % 2 == 1)
-                    else:
-                        should_swap = False
-                else:
-                    should_swap = (actual_runs % 2 == 1)
-                
-                if should_swap:
-                    striker_stat.is_striker = False
-                    non_striker_stat.is_striker = True
-                    db.commit()
-                    db.refresh(striker_stat)
-                    db.refresh(non_striker_stat)
-                    logger.debug("Performed striker rotation")
-            
-        except Exception as e:
-            logger.error(f"Error handling striker rotation: {str(e)}")
-            logger.error(traceback.format_exc())
-            # Don't raise error for striker rotation issues as they're not critical
-        
-        # WebSocket broadcast with enhanced error handling
-        try:
-            from app.core.websocket_manager import manager
-            
-            updated_scoreboard = get_live_scoreboard(db, match_id)
-            
-            asyncio.create_task(
-                manager.broadcast_to_match({
-                    "type": "score_update",
-                    "match_id": match_id,
-                    "scoreboard": updated_scoreboard.dict(),
-                    "last_ball": {
-                        "over_number": ball_record.over_number,
-                        "ball_number": ball_record.ball_number,
-                        "runs": ball_record.runs,
-                        "is_wicket": ball_record.is_wicket,
-                        "is_wide": ball_record.is_wide,
-                        "is_no_ball": ball_record.is_no_ball,
-                        "is_bye": ball_record.is_bye,
-                        "is_leg_bye": ball_record.is_leg_bye,
-                        "batsman_name": ball_record.batsman.user.full_name if ball_record.batsman and ball_record.batsman.user else "Unknown",
-                        "bowler_name": ball_record.bowler.user.full_name if ball_record.bowler and ball_record.bowler.user else "Unknown"
-                    }
-                }, match_id)
-            )
-            logger.info("WebSocket broadcast initiated successfully")
-            
-        except ImportError as e:
-            logger.warning(f"WebSocket manager not available: {str(e)}")
-        except Exception as e:
-            logger.error(f"WebSocket broadcast error: {str(e)}")
-            logger.error(traceback.format_exc())
-            # Don't raise error for WebSocket issues as they're not critical to score update
-        
-        logger.info(f"Score update completed successfully for match {match_id}")
-        return ball_record
+        logger.info(f"Created ball record: over={ball_record.over_number}, ball={ball_record.ball_number}, runs={ball_record.runs}")
         
     except ValueError as e:
         logger.error(f"Validation error in update_score: {str(e)}")
@@ -653,9 +232,68 @@ def update_score(
         logger.error(f"Unexpected error in update_score: {str(e)}")
         logger.error(traceback.format_exc())
         db.rollback()
+        innings_state.invalidate_innings_state(match_id)
         raise ValueError(f"Unexpected error updating score: {str(e)}")
     
-    return match
+    return ball_record, next_state
+
+
+def _queue_ball_event(
+    match_id: int,
+    next_state: innings_state.InningsState,
+    ball_record: BallByBall
+):
+    # WebSocket broadcast with enhanced error handling
+    try:
+        from app.core.websocket_manager import manager
+        from app.services.organizer.score_feed import build_ball_patch
+        
+        patch = build_ball_patch(next_state, ball_record)
+        
+        # This runs in a threadpool thread with no event loop; the bus hands it to the loop.
+        # Subscriber state belongs to the loop, which also rebuilds full scoreboards for legacy sockets
+        manager.queue_score_event(match_id, patch)
+        logger.info("WebSocket broadcast queued")
+        
+    except ImportError as e:
+        logger.warning(f"WebSocket manager not available: {str(e)}")
+    except Exception as e:
+        logger.error(f"WebSocket broadcast error: {str(e)}")
+        logger.error(traceback.format_exc())
+        # Don't raise error for WebSocket issues as they're not critical to score update
+
+
+def update_score(
+    db: Session,
+    match_id: int,
+    organizer_id: int,
+    score_data: UpdateScoreRequest
+) -> BallByBall:
+    ball_record, next_state = _record_ball(db, match_id, organizer_id, score_data)
+    scoreboard_cache.refresh_scoreboard_snapshot(db, match_id)
+    _queue_ball_event(match_id, next_state, ball_record)
+    
+    logger.info(f"Score update completed successfully for match {match_id}")
+    return ball_record
+
+async def update_score_async(
+    db: AsyncSession,
+    match_id: int,
+    organizer_id: int,
+    score_data: UpdateScoreRequest
+) -> BallByBall:
+    # The ball's queries await asyncpg on the event loop instead of holding a
+    # threadpool thread. The patch (with its win-probability simulation) and the
+    # snapshot rebuild are CPU work, so they go to threadpool threads. Only the
+    # patch stays under the match's lock, so its events are queued in ball order;
+    # snapshots order themselves by (seq, state_version) when they are stored.
+    async with innings_state.async_match_lock(match_id):
+        ball_record, next_state = await db.run_sync(_record_ball, match_id, organizer_id, score_data)
+        await run_in_threadpool(_queue_ball_event, match_id, next_state, ball_record)
+    await scoreboard_cache.refresh_scoreboard_snapshot_async(match_id)
+    
+    logger.info(f"Score update completed successfully for match {match_id}")
+    return ball_record
 
 def start_match(
     db: Session,
@@ -691,6 +329,8 @@ def start_match(
     if match.match_status == 'live':
         return match
 
+    innings_state.bump_state_version(db, match_id)
+
     batting_score = db.query(MatchScore).filter(
         MatchScore.match_id == match_id,
         MatchScore.team_id == match.batting_team_id
@@ -766,6 +406,13 @@ def start_match(
     db.commit()
     db.refresh(match)
     
+    # Load the innings state up front so the first delivery doesn't pay for it.
+    # Async scorers take match_lock on the event loop thread, so it is only held for the swap
+    state = innings_state.load_innings_state(db, match_id)
+    with innings_state.match_lock(match_id):
+        innings_state.store_innings_state(state)
+    scoreboard_cache.refresh_scoreboard_snapshot(db, match_id)
+    
     return match
 
 
@@ -779,17 +426,8 @@ def get_current_over(
     if not match:
         return 1, 1, False
     
-    # Get all balls for this match
-    all_balls = db.query(BallByBall).filter(
-        BallByBall.match_id == match_id
-    ).order_by(
-        BallByBall.over_number.asc(),
-        BallByBall.ball_number.asc()
-    ).all()
-    
-    current_over = None
-    current_ball = None
     needs_bowler_selection = False
+    max_overs_local = tournament.details.overs if tournament and tournament.details else 20
     
     # Determine if we're in second innings
     other_team_id = match.team_a_id if match.batting_team_id == match.team_b_id else match.team_b_id
@@ -800,54 +438,109 @@ def get_current_over(
     
     is_second_innings = other_team_score and other_team_score.balls > 0
     
-    if all_balls:
-        # Filter balls to current innings only
+    innings_no = 2 if is_second_innings else 1
+    last_ball = db.query(BallByBall).filter(
+        BallByBall.match_id == match_id,
+        BallByBall.innings_no == innings_no
+    ).order_by(
+        BallByBall.over_number.desc(),
+        BallByBall.ball_number.desc(),
+        BallByBall.id.desc()
+    ).first()
+    
+    if not last_ball:
+        return 1, 1, False
+    
+    # Count legal balls in last over
+    legal_balls_in_last_over = db.query(func.count(BallByBall.id)).filter(
+        BallByBall.match_id == match_id,
+        BallByBall.innings_no == innings_no,
+        BallByBall.over_number == last_ball.over_number,
+        BallByBall.is_wide == False,
+        BallByBall.is_no_ball == False
+    ).scalar()
+    
+    if legal_balls_in_last_over >= 6:
+        # Over complete, need new bowler
+        needs_bowler_selection = True
         if is_second_innings:
-            # Second innings - only consider balls with over_number > max_overs
-            max_overs_local = tournament.details.overs if tournament and tournament.details else 20
-            current_innings_balls = [b for b in all_balls if b.over_number > max_overs_local]
+            display_over = (last_ball.over_number - max_overs_local) + 1
         else:
-            # First innings - only consider balls with over_number <= max_overs
-            max_overs_local = tournament.details.overs if tournament and tournament.details else 20
-            current_innings_balls = [b for b in all_balls if b.over_number <= max_overs_local]
-        
-        if current_innings_balls:
-            last_ball = current_innings_balls[-1]
-            # Count legal balls in last over
-            legal_balls_in_last_over = len([b for b in current_innings_balls 
-                                           if b.over_number == last_ball.over_number 
-                                           and not b.is_wide and not b.is_no_ball])
-            
-            if legal_balls_in_last_over >= 6:
-                # Over complete, need new bowler
-                needs_bowler_selection = True
-                if is_second_innings:
-                    display_over = (last_ball.over_number - max_overs_local) + 1
-                else:
-                    display_over = last_ball.over_number + 1
-                current_over = display_over
-                current_ball = 1
-            else:
-                if is_second_innings:
-                    display_over = last_ball.over_number - max_overs_local
-                else:
-                    display_over = last_ball.over_number
-                current_over = display_over
-                # Set ball number based on legal balls count, not last ball number
-                current_ball = legal_balls_in_last_over + 1
-        else:
-            current_over = 1
-            current_ball = 1
-    else:
-        current_over = 1
+            display_over = last_ball.over_number + 1
+        current_over = display_over
         current_ball = 1
+    else:
+        if is_second_innings:
+            display_over = last_ball.over_number - max_overs_local
+        else:
+            display_over = last_ball.over_number
+        current_over = display_over
+        # Set ball number based on legal balls count, not last ball number
+        current_ball = legal_balls_in_last_over + 1
     
     return current_over, current_ball, needs_bowler_selection
 
+def build_ball_response(ball: BallByBall, max_overs: int) -> BallByBallResponse:
+    # Ball needs batsman/bowler/dismissed_batsman with their users loaded
+    if ball.over_number > max_overs:
+        # Second innings - display over number starting from 1
+        display_over_number = ball.over_number - max_overs
+    else:
+        # First innings - display actual over number
+        display_over_number = ball.over_number
+    
+    # Use ball_number directly - it's already stored correctly per over
+    display_ball_number = ball.ball_number
+        
+    return BallByBallResponse(
+        id=ball.id,
+        match_id=ball.match_id,
+        over_number=display_over_number,
+        ball_number=display_ball_number,
+        batsman_id=ball.batsman_id,
+        batsman_name=ball.batsman.user.full_name if ball.batsman and ball.batsman.user else None,
+        bowler_id=ball.bowler_id,
+        bowler_name=ball.bowler.user.full_name if ball.bowler and ball.bowler.user else None,
+        runs=ball.runs,
+        is_wicket=ball.is_wicket,
+        wicket_type=ball.wicket_type,
+        dismissed_batsman_id=ball.dismissed_batsman_id,
+        dismissed_batsman_name=ball.dismissed_batsman.user.full_name if ball.dismissed_batsman and ball.dismissed_batsman.user else None,
+        is_wide=ball.is_wide,
+        is_no_ball=ball.is_no_ball,
+        is_bye=ball.is_bye,
+        is_leg_bye=ball.is_leg_bye,
+        is_four=ball.is_four,
+        is_six=ball.is_six,
+        commentary=ball.commentary,
+        created_at=ball.created_at
+    )
+
+def live_win_probability(
+    match_id: int,
+    seq: int,
+    innings_number: int,
+    runs: int,
+    wickets: int,
+    balls: int,
+    max_overs: int,
+    target: Optional[int]
+) -> Optional[WinProbabilityResponse]:
+    # An estimate is extra; scoring and the scoreboard must not fail because of it
+    try:
+        return WinProbabilityResponse(**win_probability_model.estimate(
+            match_id, seq, innings_number, runs, wickets, balls, max_overs, target
+        ))
+    except Exception as e:
+        logger.error(f"Win probability estimate failed for match {match_id}: {str(e)}")
+        return None
+
 def get_live_scoreboard(
     db: Session,
-    match_id: int
+    match_id: int,
+    include_all_balls: bool = True
 ) -> LiveScoreboardResponse:
+    # include_all_balls=False leaves all_balls empty; the commentary endpoint pages through them instead
     
     
     match = db.query(Match).options(
@@ -880,19 +573,34 @@ def get_live_scoreboard(
         ).first()
     
     
-    all_balls = db.query(BallByBall).options(
+    balls_query = db.query(BallByBall).options(
         joinedload(BallByBall.batsman).joinedload(PlayerProfile.user),
         joinedload(BallByBall.bowler).joinedload(PlayerProfile.user),
         joinedload(BallByBall.dismissed_batsman).joinedload(PlayerProfile.user)
     ).filter(
         BallByBall.match_id == match_id
-    ).order_by(
-        BallByBall.over_number.asc(),
-        BallByBall.ball_number.asc()
-    ).all()
+    )
     
-    # Get last 6 balls for quick view
-    last_balls = all_balls[-6:] if len(all_balls) > 6 else all_balls
+    if include_all_balls:
+        all_balls = balls_query.order_by(
+            BallByBall.over_number.asc(),
+            BallByBall.ball_number.asc(),
+            BallByBall.id.asc()
+        ).all()
+        ball_count = len(all_balls)
+        # Get last 6 balls for quick view
+        last_balls = all_balls[-6:] if len(all_balls) > 6 else all_balls
+    else:
+        all_balls = []
+        ball_count = db.query(func.count(BallByBall.id)).filter(
+            BallByBall.match_id == match_id
+        ).scalar()
+        last_balls = balls_query.order_by(
+            BallByBall.over_number.desc(),
+            BallByBall.ball_number.desc(),
+            BallByBall.id.desc()
+        ).limit(6).all()
+        last_balls.reverse()
     
 
     current_batsmen = []
@@ -949,48 +657,6 @@ def get_live_scoreboard(
     else:
         display_current_over = current_over
     
-    if all_balls:
-        # Filter balls to current innings only
-        if is_second_innings:
-            # Second innings - only consider balls with over_number > max_overs
-            max_overs_local = tournament.details.overs if tournament and tournament.details else 20
-            current_innings_balls = [b for b in all_balls if b.over_number > max_overs_local]
-        else:
-            # First innings - only consider balls with over_number <= max_overs
-            max_overs_local = tournament.details.overs if tournament and tournament.details else 20
-            current_innings_balls = [b for b in all_balls if b.over_number <= max_overs_local]
-        
-        if current_innings_balls:
-            last_ball = current_innings_balls[-1]
-            # Count legal balls in last over
-            legal_balls_in_last_over = len([b for b in current_innings_balls 
-                                           if b.over_number == last_ball.over_number 
-                                           and not b.is_wide and not b.is_no_ball])
-            
-            if legal_balls_in_last_over >= 6:
-                # Over complete, need new bowler
-                needs_bowler_selection = True
-                if is_second_innings:
-                    display_over = (last_ball.over_number - max_overs_local) + 1
-                else:
-                    display_over = last_ball.over_number + 1
-                current_over = display_over
-                current_ball = 1
-            else:
-                if is_second_innings:
-                    display_over = last_ball.over_number - max_overs_local
-                else:
-                    display_over = last_ball.over_number
-                current_over = display_over
-                # Set ball number based on legal balls count, not last ball number
-                current_ball = legal_balls_in_last_over + 1
-        else:
-            current_over = 1
-            current_ball = 1
-    else:
-        current_over = 1
-        current_ball = 1
-    
     # Get current bowler - handle None bowling_team_id
     current_bowler_id = None
     current_bowler_name = None
@@ -1092,51 +758,14 @@ def get_live_scoreboard(
             run_rate=bowling_score.run_rate
         )
     
-    def build_ball_response(ball):
-        # Calculate display over number based on innings
-        max_overs_local = tournament.details.overs if tournament and tournament.details else 20
-        if ball.over_number > max_overs_local:
-            # Second innings - display over number starting from 1
-            display_over_number = ball.over_number - max_overs_local
-        else:
-            # First innings - display actual over number
-            display_over_number = ball.over_number
-        
-        # Use ball_number directly - it's already stored correctly per over
-        display_ball_number = ball.ball_number
-            
-        return BallByBallResponse(
-            id=ball.id,
-            match_id=ball.match_id,
-            over_number=display_over_number,
-            ball_number=display_ball_number,
-            batsman_id=ball.batsman_id,
-            batsman_name=ball.batsman.user.full_name if ball.batsman and ball.batsman.user else None,
-            bowler_id=ball.bowler_id,
-            bowler_name=ball.bowler.user.full_name if ball.bowler and ball.bowler.user else None,
-            runs=ball.runs,
-            is_wicket=ball.is_wicket,
-            wicket_type=ball.wicket_type,
-            dismissed_batsman_id=ball.dismissed_batsman_id,
-            dismissed_batsman_name=ball.dismissed_batsman.user.full_name if ball.dismissed_batsman and ball.dismissed_batsman.user else None,
-            is_wide=ball.is_wide,
-            is_no_ball=ball.is_no_ball,
-            is_bye=ball.is_bye,
-            is_leg_bye=ball.is_leg_bye,
-            is_four=ball.is_four,
-            is_six=ball.is_six,
-            commentary=ball.commentary,
-            created_at=ball.created_at
-        )
-    
-    last_6_balls_response = [build_ball_response(ball) for ball in last_balls]
-    all_balls_response = [build_ball_response(ball) for ball in all_balls]
-    
     # Get max overs from tournament
     max_overs = 20  # Default
     if tournament and tournament.details:
         max_overs = tournament.details.overs
     
+    last_6_balls_response = [build_ball_response(ball, max_overs) for ball in last_balls]
+    all_balls_response = [build_ball_response(ball, max_overs) for ball in all_balls]
+    
     # Calculate innings number and target score
     innings_number = 1
     target = None
@@ -1199,6 +828,13 @@ def get_live_scoreboard(
             bowling_team_name=match.bowling_team.club_name if match.bowling_team else None
         )
     
+    win_probability = None
+    if match.match_status == 'live' and batting_score:
+        win_probability = live_win_probability(
+            match.id, ball_count, innings_number, batting_score.runs,
+            batting_score.wickets, batting_score.balls, max_overs, target
+        )
+    
     return LiveScoreboardResponse(
         match_id=match.id,
         match_status=match.match_status or 'upcoming',
@@ -1227,7 +863,112 @@ def get_live_scoreboard(
         innings_number=innings_number,
         target=target,
         total_overs=total_overs,
-        streaming_url=match.streaming_url
+        streaming_url=match.streaming_url,
+        seq=ball_count,
+        win_probability=win_probability
+    )
+
+def _load_live_scoreboard(match_id: int, include_all_balls: bool) -> LiveScoreboardResponse:
+    db = SessionLocal()
+    try:
+        return get_live_scoreboard(db, match_id, include_all_balls)
+    finally:
+        db.close()
+
+async def get_live_scoreboard_async(
+    match_id: int,
+    include_all_balls: bool = True
+) -> LiveScoreboardResponse:
+    # The rebuild includes the win-probability simulation; it runs in a
+    # threadpool thread on its own session rather than on the event loop
+    return await run_in_threadpool(_load_live_scoreboard, match_id, include_all_balls)
+
+COMMENTARY_ORDERS = ("desc", "asc")
+
+
+def _parse_commentary_cursor(cursor: str) -> Tuple[int, int, int]:
+    try:
+        over_number, ball_number, ball_id = (int(part) for part in cursor.split(":"))
+    except ValueError:
+        raise ValueError("Invalid commentary cursor")
+    return over_number, ball_number, ball_id
+
+
+def get_commentary(
+    db: Session,
+    match_id: int,
+    innings_number: int = 1,
+    from_over: Optional[int] = None,
+    to_over: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 30,
+    order: str = "desc"
+) -> CommentaryPageResponse:
+    # Keyset pagination over (over_number, ball_number, id); id breaks ties
+    # because a wide shares its ball_number with the delivery that follows it
+    if innings_number not in (1, 2):
+        raise ValueError("innings must be 1 or 2")
+    if order not in COMMENTARY_ORDERS:
+        raise ValueError("order must be 'desc' or 'asc'")
+    
+    match = db.query(Match).options(
+        joinedload(Match.tournament).joinedload(Tournament.details)
+    ).filter(Match.id == match_id).first()
+    if not match:
+        raise ValueError("Match not found")
+    
+    tournament = match.tournament
+    max_overs = tournament.details.overs if tournament and tournament.details else 20
+    offset = max_overs if innings_number == 2 else 0
+    
+    # Display overs 1..max_overs are stored as offset+1 .. offset+max_overs
+    first_over = offset + max(from_over or 1, 1)
+    last_over = offset + min(to_over or max_overs, max_overs)
+    
+    query = db.query(BallByBall).options(
+        joinedload(BallByBall.batsman).joinedload(PlayerProfile.user),
+        joinedload(BallByBall.bowler).joinedload(PlayerProfile.user),
+        joinedload(BallByBall.dismissed_batsman).joinedload(PlayerProfile.user)
+    ).filter(
+        BallByBall.match_id == match_id,
+        BallByBall.innings_no == innings_number,
+        BallByBall.over_number >= first_over,
+        BallByBall.over_number <= last_over
+    )
+    
+    position = tuple_(BallByBall.over_number, BallByBall.ball_number, BallByBall.id)
+    if cursor:
+        cursor_position = tuple_(*_parse_commentary_cursor(cursor))
+        if order == "desc":
+            query = query.filter(position < cursor_position)
+        else:
+            query = query.filter(position > cursor_position)
+    
+    if order == "desc":
+        query = query.order_by(
+            BallByBall.over_number.desc(),
+            BallByBall.ball_number.desc(),
+            BallByBall.id.desc()
+        )
+    else:
+        query = query.order_by(
+            BallByBall.over_number.asc(),
+            BallByBall.ball_number.asc(),
+            BallByBall.id.asc()
+        )
+    
+    balls = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(balls) > limit:
+        balls = balls[:limit]
+        last = balls[-1]
+        next_cursor = f"{last.over_number}:{last.ball_number}:{last.id}"
+    
+    return CommentaryPageResponse(
+        match_id=match_id,
+        innings_number=innings_number,
+        balls=[build_ball_response(ball, max_overs) for ball in balls],
+        next_cursor=next_cursor
     )
 
 def end_innings(
@@ -1249,6 +990,7 @@ def end_innings(
     if not tournament:
         raise ValueError("Tournament not found or access denied")
     
+    innings_state.bump_state_version(db, match_id)
 
     bowling_team_score = db.query(MatchScore).filter(
         MatchScore.match_id == match_id,
@@ -1312,6 +1054,11 @@ def end_innings(
     db.commit()
     db.refresh(match)
     
+    # Teams and over numbering change with the innings, reload on the next ball
+    with innings_state.match_lock(match_id):
+        innings_state.invalidate_innings_state(match_id)
+    scoreboard_cache.refresh_scoreboard_snapshot(db, match_id)
+    
     return match
 
 def get_available_batsmen(
@@ -1449,6 +1196,8 @@ def set_opening_batsmen(
     if striker_id == non_striker_id:
         raise ValueError("Striker and non-striker cannot be the same player")
     
+    version = innings_state.bump_state_version(db, match_id)
+    
     # Clear all is_batting and is_striker flags for batting team
     db.query(PlayerMatchStats).filter(
         PlayerMatchStats.match_id == match_id,
@@ -1468,6 +1217,15 @@ def set_opening_batsmen(
     db.refresh(striker_stat)
     db.refresh(non_striker_stat)
     
+    def select_batsmen(state: innings_state.InningsState):
+        state.sync_player(striker_stat)
+        state.sync_player(non_striker_stat)
+        state.set_batsmen(striker_id, non_striker_id)
+    
+    innings_state.apply_committed_change(match_id, version, select_batsmen)
+    
+    scoreboard_cache.refresh_scoreboard_snapshot(db, match_id)
+    
     return {
         "message": "Opening batsmen set successfully",
         "striker_id": striker_id,
@@ -1495,89 +1253,11 @@ def get_available_bowlers(
         is_second_innings = bowling_team_score and bowling_team_score.balls > 0
     
     # Only exclude bowler if exclude_bowler_id is None (let caller specify if they want to exclude)
-    # But if exclude_bowler_id is None, we should find the last completed over's bowler from CURRENT innings
+    # But if exclude_bowler_id is None, we exclude the bowler of the last completed over of the CURRENT innings
     if exclude_bowler_id is None:
-        # Get tournament to know max overs for first innings
-        tournament = db.query(Tournament).filter(Tournament.id == match.tournament_id).first()
-        max_overs_first_innings = tournament.details.overs if tournament and tournament.details else 20
-        
-        if is_second_innings:
-           
-            current_innings_balls = db.query(BallByBall).filter(
-                BallByBall.match_id == match_id,
-                BallByBall.over_number > max_overs_first_innings
-            ).order_by(
-                BallByBall.over_number.desc(),
-                BallByBall.ball_number.desc()
-            ).all()
-            
-            if current_innings_balls:
-                # Find the last completed over in current innings
-                seen_overs = set()
-                for ball in current_innings_balls:
-                    over_number = ball.over_number
-                    if over_number in seen_overs:
-                        continue
-                    
-                    seen_overs.add(over_number)
-                    
-                    # Count legal balls in this over
-                    legal_balls = db.query(BallByBall).filter(
-                        BallByBall.match_id == match_id,
-                        BallByBall.over_number == over_number,
-                        BallByBall.is_wide == False,
-                        BallByBall.is_no_ball == False
-                    ).count()
-                    
-                    if legal_balls >= 6:
-                        # Get first ball of completed over to get bowler
-                        first_ball = db.query(BallByBall).filter(
-                            BallByBall.match_id == match_id,
-                            BallByBall.over_number == over_number
-                        ).order_by(BallByBall.ball_number.asc()).first()
-                        
-                        if first_ball:
-                            exclude_bowler_id = first_ball.bowler_id
-                        break
-            # If no balls in second innings yet, exclude_bowler_id remains None (don't exclude any)
-        else:
-            # We're in first innings - look at all balls (over_number <= max_overs_first_innings)
-            all_balls = db.query(BallByBall).filter(
-                BallByBall.match_id == match_id,
-                BallByBall.over_number <= max_overs_first_innings
-            ).order_by(
-                BallByBall.over_number.desc(),
-                BallByBall.ball_number.desc()
-            ).all()
-            
-            if all_balls:
-                # Find the last completed over
-                seen_overs = set()
-                for ball in all_balls:
-                    over_number = ball.over_number
-                    if over_number in seen_overs:
-                        continue
-                    
-                    seen_overs.add(over_number)
-                    
-                    # Count legal balls in this over
-                    legal_balls = db.query(BallByBall).filter(
-                        BallByBall.match_id == match_id,
-                        BallByBall.over_number == over_number,
-                        BallByBall.is_wide == False,
-                        BallByBall.is_no_ball == False
-                    ).count()
-                    
-                    if legal_balls >= 6:
-                        # Get first ball of completed over to get bowler
-                        first_ball = db.query(BallByBall).filter(
-                            BallByBall.match_id == match_id,
-                            BallByBall.over_number == over_number
-                        ).order_by(BallByBall.ball_number.asc()).first()
-                        
-                        if first_ball:
-                            exclude_bowler_id = first_ball.bowler_id
-                        break
+        exclude_bowler_id = over_summary.get_last_over_bowler_id(
+            db, match_id, innings_no=2 if is_second_innings else 1
+        )
     
     query = db.query(PlayerMatchStats).options(
         joinedload(PlayerMatchStats.player).joinedload(PlayerProfile.user)
@@ -1597,52 +1277,12 @@ def validate_bowler_selection(
     bowler_id: int
 ) -> dict:
   
-    all_balls = db.query(BallByBall).filter(
-        BallByBall.match_id == match_id
-    ).order_by(
-        BallByBall.over_number.desc(),
-        BallByBall.ball_number.desc()
-    ).all()
-    
-    if not all_balls:
-        return {"valid": True, "message": "Bowler can be selected"}
-    
-    # Find the last completed over (6 legal balls)
-    last_completed_over = None
-    seen_overs = set()
-    
-    for ball in all_balls:
-        over_number = ball.over_number
-        if over_number in seen_overs:
-            continue
-        
-        seen_overs.add(over_number)
-        
-        # Count legal balls in this over
-        legal_balls = db.query(BallByBall).filter(
-            BallByBall.match_id == match_id,
-            BallByBall.over_number == over_number,
-            BallByBall.is_wide == False,
-            BallByBall.is_no_ball == False
-        ).count()
-        
-        if legal_balls >= 6:
-            last_completed_over = over_number
-            break
-    
-  
-    if last_completed_over:
-        # Get the first ball of that over to get the bowler
-        first_ball_of_over = db.query(BallByBall).filter(
-            BallByBall.match_id == match_id,
-            BallByBall.over_number == last_completed_over
-        ).order_by(BallByBall.ball_number.asc()).first()
-        
-        if first_ball_of_over and first_ball_of_over.bowler_id == bowler_id:
-            return {
-                "valid": False, 
-                "message": "Cannot select same bowler in consecutive overs"
-            }
+    # Bowler of the last completed over (6 legal balls) can't bowl the next one
+    if over_summary.get_last_over_bowler_id(db, match_id) == bowler_id:
+        return {
+            "valid": False, 
+            "message": "Cannot select same bowler in consecutive overs"
+        }
     
     return {"valid": True, "message": "Bowler can be selected"}
 
@@ -1707,6 +1347,8 @@ def set_initial_bowler(
         )
         db.add(bowler_stat)
 
+    version = innings_state.bump_state_version(db, match_id)
+
     # Clear all other bowlers' is_bowling flags first
     db.query(PlayerMatchStats).filter(
         PlayerMatchStats.match_id == match_id,
@@ -1722,6 +1364,14 @@ def set_initial_bowler(
     db.commit()
     db.refresh(bowler_stat)
     
+    def select_bowler(state: innings_state.InningsState):
+        state.sync_player(bowler_stat)
+        state.set_bowler(bowler_id)
+    
+    innings_state.apply_committed_change(match_id, version, select_bowler)
+    
+    scoreboard_cache.refresh_scoreboard_snapshot(db, match_id)
+    
     return {
         "message": "Bowler set successfully",
         "bowler_id": bowler_id
@@ -1768,6 +1418,7 @@ def complete_match(
     if team_a_score.balls == 0 or team_b_score.balls == 0:
         raise ValueError("Both innings must be completed before completing the match.")
     
+    innings_state.bump_state_version(db, match_id)
     
     first_innings_team_id = match.bowling_team_id  
     second_innings_team_id = match.batting_team_id 
@@ -1815,9 +1466,16 @@ def complete_match(
         team_a_score.winning_status = None
         team_b_score.winning_status = None
     
+    # Career totals change in the same transaction as the result, so they never disagree
+    from app.services.player.career_stats_service import apply_completed_matches
+    apply_completed_matches(db, [match_id])
+    
     db.commit()
     db.refresh(match)
     
+    # No more balls can be scored, so nothing needs the match's state or locks
+    innings_state.forget_match(match_id)
+    
     # Automatically update point table after match completion
     try:
         point_table_service.update_point_table_after_match(db, match_id)
@@ -1825,6 +1483,8 @@ def complete_match(
         # Log the error but don't fail the match completion
         print(f"Error updating point table: {str(e)}")
     
+    scoreboard_cache.refresh_scoreboard_snapshot(db, match_id)
+    
     return {
         "message": "Match completed successfully",
         "match_id": match_id,
@@ -0,0 +1,133 @@
+"""
+Per-over summaries of an innings, read from innings_overs.
+
+update_score keeps one innings_overs row per over (bowler of the first
+delivery, legal balls, runs, runs charged to the bowler, wickets, extras and
+the innings score at the end of the over), so bowler checks, maidens and the
+worm/manhattan charts read a few indexed rows instead of replaying
+ball_by_ball. Only the over in progress can be short of six legal balls, so
+the last completed over is always the latest over or the one before it.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.organizer.fixture import Match
+from app.models.organizer.match_score import InningsOver, MatchScore
+from app.schemas.organizer.match_score import (
+    ManhattanBar,
+    ManhattanInnings,
+    ManhattanResponse,
+    WormInnings,
+    WormPoint,
+    WormResponse
+)
+from app.services.organizer.innings_state import rate_per_over
+
+
+def is_complete(over: InningsOver) -> bool:
+    return over.legal_balls >= 6
+
+
+def is_maiden(over: InningsOver) -> bool:
+    # Byes and leg byes aren't charged to the bowler; a wide or no ball always is
+    return is_complete(over) and over.bowler_runs == 0 and over.deliveries == over.legal_balls
+
+
+def get_innings_overs(db: Session, match_id: int, innings_no: Optional[int] = None) -> List[InningsOver]:
+    query = db.query(InningsOver).filter(InningsOver.match_id == match_id)
+    if innings_no is not None:
+        query = query.filter(InningsOver.innings_no == innings_no)
+    return query.order_by(InningsOver.innings_no.asc(), InningsOver.over_number.asc()).all()
+
+
+def get_current_innings_no(db: Session, match_id: int) -> Optional[int]:
+    """Innings of the latest over bowled, None before the first ball."""
+    latest = db.query(InningsOver.innings_no).filter(
+        InningsOver.match_id == match_id
+    ).order_by(InningsOver.innings_no.desc()).first()
+    return latest.innings_no if latest else None
+
+
+def get_last_completed_over(db: Session, match_id: int, innings_no: int) -> Optional[InningsOver]:
+    latest_overs = db.query(InningsOver).filter(
+        InningsOver.match_id == match_id,
+        InningsOver.innings_no == innings_no
+    ).order_by(InningsOver.over_number.desc()).limit(2).all()
+    for over in latest_overs:
+        if is_complete(over):
+            return over
+    return None
+
+
+def get_last_over_bowler_id(db: Session, match_id: int, innings_no: Optional[int] = None) -> Optional[int]:
+    """Bowler of the last completed over, who can't bowl the next one."""
+    if innings_no is None:
+        innings_no = get_current_innings_no(db, match_id)
+        if innings_no is None:
+            return None
+    last_over = get_last_completed_over(db, match_id, innings_no)
+    return last_over.bowler_id if last_over else None
+
+
+def _overs_by_innings(db: Session, match_id: int) -> Dict[int, List[InningsOver]]:
+    if not db.query(Match.id).filter(Match.id == match_id).first():
+        raise ValueError("Match not found")
+
+    innings: Dict[int, List[InningsOver]] = {}
+    for over in get_innings_overs(db, match_id):
+        innings.setdefault(over.innings_no, []).append(over)
+    return innings
+
+
+def _batting_teams(db: Session, match_id: int) -> Dict[int, int]:
+    return {
+        inning_no: team_id
+        for inning_no, team_id in db.query(MatchScore.inning_no, MatchScore.team_id).filter(
+            MatchScore.match_id == match_id
+        ).all()
+    }
+
+
+def get_worm(db: Session, match_id: int) -> WormResponse:
+    """Cumulative score after each over of both innings."""
+    teams = _batting_teams(db, match_id)
+    innings = []
+    for innings_no, overs in _overs_by_innings(db, match_id).items():
+        balls = 0
+        points = []
+        for over in overs:
+            balls += over.legal_balls
+            points.append(WormPoint(
+                over_number=over.over_number,
+                total_runs=over.total_runs,
+                total_wickets=over.total_wickets,
+                run_rate=rate_per_over(over.total_runs, balls)
+            ))
+        innings.append(WormInnings(innings_number=innings_no, team_id=teams.get(innings_no), overs=points))
+    return WormResponse(match_id=match_id, innings=innings)
+
+
+def get_manhattan(db: Session, match_id: int) -> ManhattanResponse:
+    """Runs and wickets in each over of both innings."""
+    teams = _batting_teams(db, match_id)
+    innings = []
+    for innings_no, overs in _overs_by_innings(db, match_id).items():
+        bars = [
+            ManhattanBar(
+                over_number=over.over_number,
+                runs=over.runs,
+                wickets=over.wickets,
+                extras=over.extras,
+                bowler_id=over.bowler_id,
+                is_maiden=is_maiden(over)
+            )
+            for over in overs
+        ]
+        innings.append(ManhattanInnings(
+            innings_number=innings_no,
+            team_id=teams.get(innings_no),
+            maidens=sum(1 for bar in bars if bar.is_maiden),
+            overs=bars
+        ))
+    return ManhattanResponse(match_id=match_id, innings=innings)
@@ -1,13 +1,16 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import false, func, select, union
 from app.models.organizer.point_table import PointTable
 from app.models.organizer.fixture import Match
 from app.models.organizer.match_score import MatchScore
-from app.models.organizer.tournament import Tournament
+from app.models.organizer.tournament import Tournament, TournamentDetails
 from app.models.club import Club
-from app.models.organizer.tournament import TournamentEnrollment
-from decimal import Decimal
-from typing import List, Optional
+from app.models.organizer.tournament import TournamentEnrollment, PaymentStatus
+from app.services.organizer import standings_cache
+from app.services.organizer.innings_state import balls_from_overs, overs_from_balls
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional, Tuple
 
 def initialize_point_table_for_tournament(
     db: Session,
@@ -43,6 +46,8 @@ def initialize_point_table_for_tournament(
                 points=0,
                 runs_scored=0,
                 runs_conceded=0,
+                balls_faced=0,
+                balls_bowled=0,
                 overs_faced=0.0,
                 overs_bowled=0.0,
                 net_run_rate=0.0
@@ -50,15 +55,167 @@ def initialize_point_table_for_tournament(
             db.add(point_entry)
             point_entries.append(point_entry)
     
+    if point_entries:
+        bump_standings_version(db, tournament_id)
     db.commit()
+    if point_entries:
+        standings_cache.refresh_standings(db, tournament_id)
     return point_entries
 
+
+def bump_standings_version(db: Session, tournament_id: int):
+    """Mark the tournament's standings changed; takes effect when the caller commits."""
+    db.query(Tournament).filter(
+        Tournament.id == tournament_id
+    ).update(
+        {Tournament.standings_version: Tournament.standings_version + 1},
+        synchronize_session=False
+    )
+
+WIN_POINTS = 2
+TIE_POINTS = 1
+# An all-out innings counts as the full quota of overs for NRR
+ALL_OUT_WICKETS = 10
+
+# Columns a completed match adds to; everything else on the row is derived from them
+TALLY_FIELDS = (
+    "matches_played",
+    "matches_won",
+    "matches_lost",
+    "matches_tied",
+    "matches_no_result",
+    "points",
+    "runs_scored",
+    "balls_faced",
+    "runs_conceded",
+    "balls_bowled",
+)
+
+
+def _new_point_entry(tournament_id: int, team_id: int) -> PointTable:
+    # Column defaults only apply on insert, so a new row would start with None counters
+    point_entry = PointTable(tournament_id=tournament_id, team_id=team_id)
+    for field in TALLY_FIELDS:
+        setattr(point_entry, field, 0)
+    point_entry.overs_faced = Decimal('0.0')
+    point_entry.overs_bowled = Decimal('0.0')
+    point_entry.net_run_rate = Decimal('0.000')
+    return point_entry
+
+
+def innings_balls(score: MatchScore, max_overs: Optional[int]) -> int:
+    balls = score.balls or balls_from_overs(score.overs)
+    if max_overs and score.wickets >= ALL_OUT_WICKETS:
+        return max_overs * 6
+    return balls
+
+
+def match_tallies(
+    match: Match,
+    team_a_score: MatchScore,
+    team_b_score: MatchScore,
+    max_overs: Optional[int]
+) -> Dict[int, Dict[str, int]]:
+    """What one completed match adds to each team's row; the incremental update and the rebuild both use it."""
+    team_a_balls = innings_balls(team_a_score, max_overs)
+    team_b_balls = innings_balls(team_b_score, max_overs)
+    tallies = {
+        match.team_a_id: dict.fromkeys(TALLY_FIELDS, 0),
+        match.team_b_id: dict.fromkeys(TALLY_FIELDS, 0),
+    }
+    for team_id, scored, faced, conceded, bowled in (
+        (match.team_a_id, team_a_score.runs, team_a_balls, team_b_score.runs, team_b_balls),
+        (match.team_b_id, team_b_score.runs, team_b_balls, team_a_score.runs, team_a_balls),
+    ):
+        tally = tallies[team_id]
+        tally["matches_played"] = 1
+        tally["runs_scored"] = scored
+        tally["balls_faced"] = faced
+        tally["runs_conceded"] = conceded
+        tally["balls_bowled"] = bowled
+    
+    if match.winner_id is None:
+        for tally in tallies.values():
+            tally["matches_tied"] = 1
+            tally["points"] = TIE_POINTS
+    else:
+        loser_id = match.team_b_id if match.winner_id == match.team_a_id else match.team_a_id
+        tallies[match.winner_id]["matches_won"] = 1
+        tallies[match.winner_id]["points"] = WIN_POINTS
+        tallies[loser_id]["matches_lost"] = 1
+    return tallies
+
+
+def tally_matches(
+    matches: Iterable[Match],
+    scores: Dict[Tuple[int, int], MatchScore],
+    max_overs: Optional[int]
+) -> Tuple[List[int], Dict[int, Dict[str, int]]]:
+    """
+    Sum match_tallies over completed matches, with scores keyed by (match_id, team_id).
+    Returns the ids counted (a match without both teams' scores is skipped) and each team's totals.
+    """
+    counted = []
+    totals_by_team = {}
+    for match in matches:
+        team_a_score = scores.get((match.id, match.team_a_id))
+        team_b_score = scores.get((match.id, match.team_b_id))
+        if not team_a_score or not team_b_score:
+            continue
+        counted.append(match.id)
+        for team_id, tally in match_tallies(match, team_a_score, team_b_score, max_overs).items():
+            totals = totals_by_team.setdefault(team_id, dict.fromkeys(TALLY_FIELDS, 0))
+            for field in TALLY_FIELDS:
+                totals[field] += tally[field]
+    return counted, totals_by_team
+
+
+def point_columns(totals: Dict[str, int]) -> dict:
+    """A point_table row's column values for the given totals, overs and NRR included."""
+    return {
+        **{field: totals[field] for field in TALLY_FIELDS},
+        "overs_faced": overs_from_balls(totals["balls_faced"]),
+        "overs_bowled": overs_from_balls(totals["balls_bowled"]),
+        "net_run_rate": calculate_nrr(
+            totals["runs_scored"],
+            totals["balls_faced"],
+            totals["runs_conceded"],
+            totals["balls_bowled"]
+        ),
+    }
+
+
+def _apply_totals(point_entry: PointTable, totals: Dict[str, int]):
+    for field, value in point_columns(totals).items():
+        setattr(point_entry, field, value)
+
+
+def _totals(point_entry: PointTable) -> Dict[str, int]:
+    return {field: getattr(point_entry, field) or 0 for field in TALLY_FIELDS}
+
+
+def _max_overs(db: Session, tournament_id: int) -> Optional[int]:
+    return db.query(TournamentDetails.overs).filter(
+        TournamentDetails.tournament_id == tournament_id
+    ).scalar()
+
+
+def _lock_point_entries(db: Session, tournament_id: int, team_ids: Optional[List[int]] = None) -> Dict[int, PointTable]:
+    # Always locked in team order, so concurrent completions and rebuilds can't deadlock
+    query = db.query(PointTable).filter(PointTable.tournament_id == tournament_id)
+    if team_ids is not None:
+        query = query.filter(PointTable.team_id.in_(team_ids))
+    return {
+        point_entry.team_id: point_entry
+        for point_entry in query.order_by(PointTable.team_id).with_for_update().all()
+    }
+
+
 def update_point_table_after_match(
     db: Session,
     match_id: int
 ) -> dict:
-   
-    
+    """Add a completed match to both teams' rows; a match already added is left alone."""
     match = db.query(Match).filter(Match.id == match_id).first()
     
     if not match:
@@ -67,94 +224,45 @@ def update_point_table_after_match(
     if match.match_status != 'completed':
         raise ValueError("Match is not completed yet")
     
-    
-    team_a_score = db.query(MatchScore).filter(
-        MatchScore.match_id == match_id,
-        MatchScore.team_id == match.team_a_id
-    ).first()
-    
-    team_b_score = db.query(MatchScore).filter(
-        MatchScore.match_id == match_id,
-        MatchScore.team_id == match.team_b_id
-    ).first()
+    scores = {
+        score.team_id: score
+        for score in db.query(MatchScore).filter(MatchScore.match_id == match_id).all()
+    }
+    team_a_score = scores.get(match.team_a_id)
+    team_b_score = scores.get(match.team_b_id)
     
     if not team_a_score or not team_b_score:
         raise ValueError("Match scores not found for both teams")
     
-    
-    team_a_points = db.query(PointTable).filter(
-        PointTable.tournament_id == match.tournament_id,
-        PointTable.team_id == match.team_a_id
-    ).first()
-    
-    if not team_a_points:
-        team_a_points = PointTable(
-            tournament_id=match.tournament_id,
-            team_id=match.team_a_id
-        )
-        db.add(team_a_points)
-    
-    team_b_points = db.query(PointTable).filter(
-        PointTable.tournament_id == match.tournament_id,
-        PointTable.team_id == match.team_b_id
-    ).first()
-    
-    if not team_b_points:
-        team_b_points = PointTable(
-            tournament_id=match.tournament_id,
-            team_id=match.team_b_id
-        )
-        db.add(team_b_points)
-    
-    
-    team_a_points.matches_played += 1
-    team_b_points.matches_played += 1
-    
-    # Update runs and overs for NRR calculation
-    team_a_points.runs_scored += team_a_score.runs
-    team_a_points.overs_faced += Decimal(str(team_a_score.overs))
-    team_a_points.runs_conceded += team_b_score.runs
-    team_a_points.overs_bowled += Decimal(str(team_b_score.overs))
-    
-    team_b_points.runs_scored += team_b_score.runs
-    team_b_points.overs_faced += Decimal(str(team_b_score.overs))
-    team_b_points.runs_conceded += team_a_score.runs
-    team_b_points.overs_bowled += Decimal(str(team_a_score.overs))
-    
-  
-    if match.winner_id is None:
-        # Match tied
-        team_a_points.matches_tied += 1
-        team_b_points.matches_tied += 1
-        team_a_points.points += 1  
-        team_b_points.points += 1
-    elif match.winner_id == match.team_a_id:
-        # Team A won
-        team_a_points.matches_won += 1
-        team_a_points.points += 2  
-        team_b_points.matches_lost += 1
-    else:
-        # Team B won
-        team_b_points.matches_won += 1
-        team_b_points.points += 2
-        team_a_points.matches_lost += 1
-    
-
-    team_a_points.net_run_rate = calculate_nrr(
-        team_a_points.runs_scored,
-        team_a_points.overs_faced,
-        team_a_points.runs_conceded,
-        team_a_points.overs_bowled
-    )
-    
-    team_b_points.net_run_rate = calculate_nrr(
-        team_b_points.runs_scored,
-        team_b_points.overs_faced,
-        team_b_points.runs_conceded,
-        team_b_points.overs_bowled
-    )
+    point_entries = _lock_point_entries(db, match.tournament_id, [match.team_a_id, match.team_b_id])
+    
+    # Claimed in the same transaction as the row updates, so a match is counted exactly once
+    claimed = db.query(Match).filter(
+        Match.id == match_id,
+        Match.standings_applied.is_(False)
+    ).update({Match.standings_applied: True}, synchronize_session=False)
+    if not claimed:
+        db.rollback()
+        return {
+            "message": "Point table already includes this match",
+            "match_id": match_id
+        }
+    
+    tallies = match_tallies(match, team_a_score, team_b_score, _max_overs(db, match.tournament_id))
+    for team_id, tally in tallies.items():
+        point_entry = point_entries.get(team_id)
+        if point_entry is None:
+            point_entry = _new_point_entry(match.tournament_id, team_id)
+            db.add(point_entry)
+            point_entries[team_id] = point_entry
+        totals = _totals(point_entry)
+        _apply_totals(point_entry, {field: totals[field] + tally[field] for field in TALLY_FIELDS})
+    bump_standings_version(db, match.tournament_id)
     
     db.commit()
+    standings_cache.refresh_standings(db, match.tournament_id)
+    team_a_points = point_entries[match.team_a_id]
+    team_b_points = point_entries[match.team_b_id]
     db.refresh(team_a_points)
     db.refresh(team_b_points)
     
@@ -165,68 +273,196 @@ def update_point_table_after_match(
         "team_b_points": team_b_points
     }
 
+
+def completed_match_totals(
+    db: Session,
+    tournament_id: int,
+    round_id: Optional[int] = None
+) -> Tuple[List[int], Dict[int, Dict[str, int]]]:
+    """tally_matches over the tournament's completed matches, or one round's, read with one query."""
+    query = db.query(Match, MatchScore).join(
+        MatchScore, MatchScore.match_id == Match.id
+    ).filter(
+        Match.tournament_id == tournament_id,
+        Match.match_status == 'completed'
+    )
+    if round_id is not None:
+        query = query.filter(Match.round_id == round_id)
+    
+    matches = {}
+    scores = {}
+    for match, score in query.all():
+        matches[match.id] = match
+        scores[(match.id, score.team_id)] = score
+    return tally_matches(matches.values(), scores, _max_overs(db, tournament_id))
+
+
+def rebuild_point_table(
+    db: Session,
+    tournament_id: int,
+    apply: bool = True
+) -> dict:
+    """
+    Recompute every row from the tournament's completed matches and compare with what's stored.
+    With apply, the rows are rewritten, every counted match is marked applied, and the
+    stored rows are read back and checked against the recomputation.
+    """
+    point_entries = _lock_point_entries(db, tournament_id)
+    
+    counted, totals_by_team = completed_match_totals(db, tournament_id)
+    rebuilt = {team_id: dict.fromkeys(TALLY_FIELDS, 0) for team_id in point_entries}
+    rebuilt.update(totals_by_team)
+    
+    mismatches = []
+    for team_id, totals in sorted(rebuilt.items()):
+        point_entry = point_entries.get(team_id)
+        expected = _new_point_entry(tournament_id, team_id)
+        _apply_totals(expected, totals)
+        for field in (*TALLY_FIELDS, "net_run_rate"):
+            stored = getattr(point_entry, field) if point_entry is not None else None
+            if stored != getattr(expected, field):
+                mismatches.append({
+                    "team_id": team_id,
+                    "field": field,
+                    "stored": stored,
+                    "rebuilt": getattr(expected, field)
+                })
+    
+    result = {
+        "tournament_id": tournament_id,
+        "matches_counted": len(counted),
+        "teams": len(rebuilt),
+        "mismatches": mismatches,
+        "applied": False,
+        "verified": not mismatches
+    }
+    if not apply:
+        db.rollback()
+        return result
+    
+    for team_id, totals in rebuilt.items():
+        point_entry = point_entries.get(team_id)
+        if point_entry is None:
+            point_entry = _new_point_entry(tournament_id, team_id)
+            db.add(point_entry)
+            point_entries[team_id] = point_entry
+        _apply_totals(point_entry, totals)
+    db.query(Match).filter(
+        Match.tournament_id == tournament_id
+    ).update(
+        {Match.standings_applied: Match.id.in_(counted) if counted else false()},
+        synchronize_session=False
+    )
+    bump_standings_version(db, tournament_id)
+    db.commit()
+    standings_cache.refresh_standings(db, tournament_id)
+    
+    for point_entry in point_entries.values():
+        db.refresh(point_entry)
+    result["applied"] = True
+    result["verified"] = all(
+        _totals(point_entries[team_id]) == totals for team_id, totals in rebuilt.items()
+    )
+    return result
+
+
 def calculate_nrr(
     runs_scored: int,
-    overs_faced: Decimal,
+    balls_faced: int,
     runs_conceded: int,
-    overs_bowled: Decimal
+    balls_bowled: int
 ) -> Decimal:
-    
-    run_rate_for = Decimal('0.0')
-    run_rate_against = Decimal('0.0')
-    
-    if overs_faced > 0:
-        run_rate_for = Decimal(runs_scored) / overs_faced
-    
-    if overs_bowled > 0:
-        run_rate_against = Decimal(runs_conceded) / overs_bowled
-    
+    # Exact: runs per over as fractions of whole balls, rounded once at the end
+    run_rate_for = Fraction(runs_scored * 6, balls_faced) if balls_faced > 0 else Fraction(0)
+    run_rate_against = Fraction(runs_conceded * 6, balls_bowled) if balls_bowled > 0 else Fraction(0)
     nrr = run_rate_for - run_rate_against
+    return (Decimal(nrr.numerator) / Decimal(nrr.denominator)).quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
+
+def _standings_teams(tournament_id: int):
+    # Teams with a row, plus enrolled teams that haven't had one created yet
+    return union(
+        select(PointTable.team_id.label("team_id")).where(
+            PointTable.tournament_id == tournament_id
+        ),
+        select(TournamentEnrollment.club_id.label("team_id")).where(
+            TournamentEnrollment.tournament_id == tournament_id,
+            TournamentEnrollment.payment_status == PaymentStatus.SUCCESS.value
+        )
+    ).subquery()
+
+
+def get_standings(
+    db: Session,
+    tournament_id: int
+) -> Tuple[int, List[dict]]:
+    """
+    The tournament's standings version and its ranked rows, read in one statement.
+    Ties on points are broken by net run rate, then wins, then team name and id,
+    so every reader sees the same order.
+    """
+    teams = _standings_teams(tournament_id)
+    counters = {
+        field: func.coalesce(getattr(PointTable, field), 0).label(field)
+        for field in (*TALLY_FIELDS, "overs_faced", "overs_bowled", "net_run_rate")
+    }
+    position = func.row_number().over(order_by=(
+        counters["points"].desc(),
+        counters["net_run_rate"].desc(),
+        counters["matches_won"].desc(),
+        Club.club_name.asc(),
+        Club.id.asc()
+    )).label("position")
+    
+    rows = db.query(
+        Tournament.standings_version,
+        position,
+        Club.id,
+        Club.club_name,
+        *counters.values()
+    ).select_from(
+        teams
+    ).join(
+        Club, Club.id == teams.c.team_id
+    ).join(
+        Tournament, Tournament.id == tournament_id
+    ).outerjoin(
+        PointTable,
+        (PointTable.tournament_id == tournament_id) & (PointTable.team_id == teams.c.team_id)
+    ).order_by(position).all()
     
-  
-    return round(nrr, 3)
+    if rows:
+        version = rows[0].standings_version
+    else:
+        version = db.query(Tournament.standings_version).filter(Tournament.id == tournament_id).scalar() or 0
+    
+    return version, [
+        {
+            "position": row.position,
+            "team_id": row.id,
+            "team_name": row.club_name,
+            "matches_played": row.matches_played,
+            "matches_won": row.matches_won,
+            "matches_lost": row.matches_lost,
+            "matches_tied": row.matches_tied,
+            "matches_no_result": row.matches_no_result,
+            "points": row.points,
+            "net_run_rate": float(row.net_run_rate),
+            "runs_scored": row.runs_scored,
+            "runs_conceded": row.runs_conceded,
+            "overs_faced": float(row.overs_faced),
+            "overs_bowled": float(row.overs_bowled),
+            "balls_faced": row.balls_faced,
+            "balls_bowled": row.balls_bowled
+        }
+        for row in rows
+    ]
+
 
 def get_point_table_by_tournament(
     db: Session,
     tournament_id: int
 ) -> List[dict]:
-   
-    point_entries = db.query(
-        PointTable,
-        Club.club_name
-    ).join(
-        Club, PointTable.team_id == Club.id
-    ).filter(
-        PointTable.tournament_id == tournament_id
-    ).order_by(
-        PointTable.points.desc(),
-        PointTable.net_run_rate.desc(),
-        PointTable.matches_won.desc()
-    ).all()
-    
-    result = []
-    position = 1
-    
-    for point_entry, team_name in point_entries:
-        result.append({
-            "position": position,
-            "team_id": point_entry.team_id,
-            "team_name": team_name,
-            "matches_played": point_entry.matches_played,
-            "matches_won": point_entry.matches_won,
-            "matches_lost": point_entry.matches_lost,
-            "matches_tied": point_entry.matches_tied,
-            "matches_no_result": point_entry.matches_no_result,
-            "points": point_entry.points,
-            "net_run_rate": float(point_entry.net_run_rate),
-            "runs_scored": point_entry.runs_scored,
-            "runs_conceded": point_entry.runs_conceded,
-            "overs_faced": float(point_entry.overs_faced),
-            "overs_bowled": float(point_entry.overs_bowled)
-        })
-        position += 1
-    
-    return result
+    return get_standings(db, tournament_id)[1]
 
 def reset_point_table_for_tournament(
     db: Session,
@@ -236,7 +472,13 @@ def reset_point_table_for_tournament(
     db.query(PointTable).filter(
         PointTable.tournament_id == tournament_id
     ).delete()
+    # So the matches are counted again when the table is next updated or rebuilt
+    db.query(Match).filter(
+        Match.tournament_id == tournament_id
+    ).update({Match.standings_applied: False}, synchronize_session=False)
+    bump_standings_version(db, tournament_id)
     
     db.commit()
+    standings_cache.refresh_standings(db, tournament_id)
     
     return {"message": "Point table reset successfully", "tournament_id": tournament_id}
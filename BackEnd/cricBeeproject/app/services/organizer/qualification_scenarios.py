@@ -0,0 +1,225 @@
+"""
+What each team needs from the rest of the league round to qualify.
+
+Every remaining Round 1 match is treated as a win for either side at even
+odds; ties and no results are rare enough to leave out. With up to
+EXACT_MAX_MATCHES left, all 2^n outcomes are enumerated. Beyond that,
+SAMPLE_SIZE outcomes are drawn, seeded by the tournament and its
+standings version so the same standings always give the same answer.
+Final points for every outcome come from two matrix products, so the
+cost is a handful of array operations rather than a loop per outcome.
+
+Teams level on points are ordered as they are today (net run rate, wins,
+name), since future run rates can't be known. A team has clinched when it
+makes the top places in every outcome even losing every tie on points,
+is eliminated when it misses out in every outcome even winning them all,
+and must win a match when losing it leaves no outcome in which it can
+still get through. A sample can miss the one outcome that decides these,
+so when outcomes are sampled they come from points bounds instead (what
+each team has now against the most it can reach), which can only
+understate them: a team is then "alive" unless the bounds settle it, and
+the sampled figures are probabilities only.
+
+Results are cached in Redis against the standings version, which every
+match completion bumps, and the number of league matches left.
+"""
+import hashlib
+import json
+import logging
+from typing import List, Tuple
+
+import numpy as np
+from redis.exceptions import RedisError
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.redis_config import get_redis
+from app.models.organizer.fixture import FixtureRound, Match
+from app.models.organizer.tournament import Tournament
+from app.services.organizer.point_table_service import WIN_POINTS, get_standings
+
+logger = logging.getLogger(__name__)
+
+EXACT_MAX_MATCHES = 16
+# Each top_n is cached separately, so it's bounded to keep the cache keys few
+MAX_TOP_N = 16
+SAMPLE_SIZE = 20000
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+def get_cache_key(tournament_id: int, top_n: int) -> str:
+    # v2: sampled results no longer claim clinched/eliminated from the sample alone
+    return f"qualification:v2:{tournament_id}:{top_n}"
+
+
+class QualificationSnapshot:
+    def __init__(self, tournament_id: int, tag: str, etag: str, body: str):
+        self.tournament_id = tournament_id
+        # Standings version and league matches left when it was calculated
+        self.tag = tag
+        self.etag = etag
+        self.body = body
+
+
+def get_remaining_league_matches(db: Session, tournament_id: int) -> List[Match]:
+    # Anything not finished is still to play, including matches waiting on or past the toss
+    return db.query(Match).join(
+        FixtureRound, FixtureRound.id == Match.round_id
+    ).filter(
+        Match.tournament_id == tournament_id,
+        FixtureRound.round_no == 1,
+        or_(Match.match_status.is_(None), Match.match_status.notin_(['completed', 'cancelled']))
+    ).order_by(Match.id).all()
+
+
+def _outcomes(match_count: int, seed: List[int]) -> Tuple[np.ndarray, bool]:
+    """One row per outcome, one column per match, True where team A wins; and whether every outcome is there."""
+    if match_count <= EXACT_MAX_MATCHES:
+        outcomes = np.arange(2 ** match_count, dtype=np.uint32)[:, None]
+        return ((outcomes >> np.arange(match_count, dtype=np.uint32)) & 1).astype(bool), True
+    return np.random.default_rng(seed).random((SAMPLE_SIZE, match_count)) < 0.5, False
+
+
+def calculate_scenarios(
+    standings: List[dict],
+    matches: List[Tuple[int, int, int]],
+    top_n: int,
+    seed: List[int]
+) -> dict:
+    """
+    standings are ranked rows as get_standings returns them; matches are
+    (match_id, team_a_id, team_b_id) for the league matches still to play.
+    """
+    team_count = len(standings)
+    index = {row["team_id"]: i for i, row in enumerate(standings)}
+    matches = [match for match in matches if match[1] in index and match[2] in index]
+
+    outcomes, exact = _outcomes(len(matches), seed)
+    team_a = np.zeros((len(matches), team_count))
+    team_b = np.zeros((len(matches), team_count))
+    for column, (_, team_a_id, team_b_id) in enumerate(matches):
+        team_a[column, index[team_a_id]] = 1
+        team_b[column, index[team_b_id]] = 1
+
+    wins = (outcomes @ team_a + ~outcomes @ team_b).astype(np.int32)
+    current = np.array([row["points"] for row in standings], dtype=np.int32)
+    points = current + WIN_POINTS * wins
+
+    # Ties on points go to the team ranked higher today
+    score = points * team_count + np.arange(team_count - 1, -1, -1)
+    rank = np.argsort(np.argsort(-score, axis=1), axis=1)
+    qualified = rank < top_n
+
+    # [outcome, team]: teams with more points, and with at least as many
+    ahead = (points[:, None, :] > points[:, :, None]).sum(axis=2)
+    level_or_ahead = (points[:, None, :] >= points[:, :, None]).sum(axis=2) - 1
+    can_qualify = ahead < top_n
+    probability = qualified.mean(axis=0)
+
+    most = current + WIN_POINTS * (team_a.sum(axis=0) + team_b.sum(axis=0)).astype(np.int32)
+    if exact:
+        clinched = (level_or_ahead < top_n).all(axis=0)
+        eliminated = ~can_qualify.any(axis=0)
+    else:
+        # Teams that can still reach this team's points, and teams already past the most it can reach
+        others = ~np.eye(team_count, dtype=bool)
+        clinched = ((most[None, :] >= current[:, None]) & others).sum(axis=1) < top_n
+        eliminated = ((current[None, :] > most[:, None]) & others).sum(axis=1) >= top_n
+
+    names = {row["team_id"]: row["team_name"] for row in standings}
+    teams = []
+    for i, row in enumerate(standings):
+        team_matches = []
+        must_win = []
+        for column, (match_id, team_a_id, team_b_id) in enumerate(matches):
+            if row["team_id"] not in (team_a_id, team_b_id):
+                continue
+            won = outcomes[:, column] if row["team_id"] == team_a_id else ~outcomes[:, column]
+            opponent_id = team_b_id if row["team_id"] == team_a_id else team_a_id
+            team_matches.append({
+                "match_id": match_id,
+                "opponent_id": opponent_id,
+                "opponent_name": names[opponent_id],
+                "if_win": round(float(qualified[won, i].mean()), 4) if won.any() else None,
+                "if_lose": round(float(qualified[~won, i].mean()), 4) if (~won).any() else None
+            })
+            if exact:
+                out_if_lost = not can_qualify[~won, i].any()
+            else:
+                # Losing it, enough teams are already past the most it could then reach
+                floor = current.copy()
+                floor[index[opponent_id]] += WIN_POINTS
+                floor[i] = -1
+                out_if_lost = (floor > most[i] - WIN_POINTS).sum() >= top_n
+            if not eliminated[i] and out_if_lost:
+                must_win.append(match_id)
+
+        if clinched[i]:
+            qualification_status = "clinched"
+        elif eliminated[i]:
+            qualification_status = "eliminated"
+        else:
+            qualification_status = "alive"
+
+        teams.append({
+            "team_id": row["team_id"],
+            "team_name": row["team_name"],
+            "position": row["position"],
+            "points": row["points"],
+            "max_points": int(most[i]),
+            "probability": round(float(probability[i]), 4),
+            "status": qualification_status,
+            "must_win": must_win,
+            "matches": team_matches
+        })
+
+    return {
+        "top_n": top_n,
+        "remaining_matches": len(matches),
+        "scenarios": int(outcomes.shape[0]),
+        "exact": exact,
+        "teams": teams
+    }
+
+
+def build_qualification_snapshot(db: Session, tournament_id: int, top_n: int) -> QualificationSnapshot:
+    version, standings = get_standings(db, tournament_id)
+    matches = [
+        (match.id, match.team_a_id, match.team_b_id)
+        for match in get_remaining_league_matches(db, tournament_id)
+    ]
+    result = calculate_scenarios(standings, matches, top_n, seed=[tournament_id, version])
+
+    body = json.dumps({"tournament_id": tournament_id, "standings_version": version, **result}, separators=(",", ":"))
+    digest = hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+    return QualificationSnapshot(tournament_id, f"{version}:{len(matches)}", f'"{version}-{digest}"', body)
+
+
+def get_qualification_snapshot(db: Session, tournament_id: int, top_n: int = 4) -> QualificationSnapshot:
+    if not 1 <= top_n <= MAX_TOP_N:
+        raise ValueError(f"top_n must be between 1 and {MAX_TOP_N}")
+
+    version = db.query(Tournament.standings_version).filter(Tournament.id == tournament_id).scalar()
+    if version is None:
+        raise ValueError("Tournament not found")
+    tag = f"{version}:{len(get_remaining_league_matches(db, tournament_id))}"
+
+    key = get_cache_key(tournament_id, top_n)
+    try:
+        cached_tag, etag, body = get_redis().hmget(key, "tag", "etag", "body")
+    except RedisError as e:
+        logger.error(f"Qualification scenarios read failed for tournament {tournament_id}: {e}")
+        return build_qualification_snapshot(db, tournament_id, top_n)
+
+    if body is not None and cached_tag == tag:
+        return QualificationSnapshot(tournament_id, cached_tag, etag, body)
+
+    snapshot = build_qualification_snapshot(db, tournament_id, top_n)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hset(key, mapping={"tag": snapshot.tag, "etag": snapshot.etag, "body": snapshot.body})
+        pipe.expire(key, CACHE_TTL_SECONDS)
+        pipe.execute()
+    except RedisError as e:
+        logger.error(f"Qualification scenarios store failed for tournament {tournament_id}: {e}")
+    return snapshot
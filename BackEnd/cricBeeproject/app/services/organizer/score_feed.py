@@ -0,0 +1,180 @@
+"""
+Live score messages for WebSocket subscribers.
+
+Clients get one snapshot (the full LiveScoreboardResponse) when they connect
+or ask for a resync, then a small ScorePatch per ball. Every patch carries
+`seq`, the number of balls recorded in the match, so a client that sees a gap
+knows it missed a ball and should send {"type": "resync"}.
+
+Every event on the score topic also carries `event_seq` from the replay log.
+A client reconnecting with ?since=<event_seq> (or resync with "since") gets
+only the events it missed, and a snapshot only when they have left the log.
+"""
+from typing import Optional
+
+from fastapi import WebSocket
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core import replay_log
+from app.core.websocket_manager import encode_message, manager, score_topic
+from app.db.session import SessionLocal
+from app.models.organizer.match_score import BallByBall
+from app.schemas.organizer.match_score import (
+    BallByBallResponse,
+    MatchScoreResponse,
+    PlayerStatsPatch,
+    ScorePatch
+)
+from app.services.organizer.innings_state import InningsState
+from app.services.organizer.match_score_service import get_live_scoreboard, live_win_probability
+
+
+def build_snapshot(db: Session, match_id: int) -> dict:
+    scoreboard = get_live_scoreboard(db, match_id)
+    return {
+        "type": "snapshot",
+        "match_id": match_id,
+        "seq": scoreboard.seq,
+        "scoreboard": scoreboard.model_dump(mode="json")
+    }
+
+
+def load_snapshot(match_id: int) -> dict:
+    # Sockets outlive requests, so they get a short-lived session per snapshot
+    db = SessionLocal()
+    try:
+        return build_snapshot(db, match_id)
+    finally:
+        db.close()
+
+
+def parse_since(value) -> Optional[int]:
+    try:
+        since = int(value)
+    except (TypeError, ValueError):
+        return None
+    return since if since >= 0 else None
+
+
+async def send_catch_up(websocket: WebSocket, match_id: int, since: Optional[int] = None):
+    """Bring a delta socket up to date: the events after `since` if still logged, otherwise a snapshot."""
+    # Live events wait until the catch-up is queued, then only newer ones follow it
+    manager.hold(websocket)
+    through_seq = None
+    try:
+        topic = score_topic(match_id)
+        replay = await replay_log.read_since(topic, since) if since is not None else None
+        if replay is not None:
+            through_seq, events = replay
+            for encoded in events:
+                await manager.send_personal_text(encoded, websocket)
+            return
+
+        # Read before building, so events the snapshot might miss are still sent after it
+        through_seq = await replay_log.current_seq(topic)
+        snapshot = await run_in_threadpool(load_snapshot, match_id)
+        snapshot["event_seq"] = through_seq
+        await manager.send_personal_text(encode_message(snapshot), websocket)
+    finally:
+        manager.release(websocket, through_seq)
+
+
+def build_full_update(db: Session, match_id: int) -> dict:
+    # Legacy ?protocol=full message: the whole scoreboard after each ball
+    scoreboard = get_live_scoreboard(db, match_id)
+    message = {
+        "type": "score_update",
+        "match_id": match_id,
+        "seq": scoreboard.seq,
+        "scoreboard": scoreboard.model_dump(mode="json")
+    }
+    if scoreboard.last_6_balls:
+        last_ball = scoreboard.last_6_balls[-1]
+        message["last_ball"] = {
+            "over_number": last_ball.over_number,
+            "ball_number": last_ball.ball_number,
+            "runs": last_ball.runs,
+            "is_wicket": last_ball.is_wicket,
+            "is_wide": last_ball.is_wide,
+            "is_no_ball": last_ball.is_no_ball,
+            "is_bye": last_ball.is_bye,
+            "is_leg_bye": last_ball.is_leg_bye,
+            "batsman_name": last_ball.batsman_name,
+            "bowler_name": last_ball.bowler_name
+        }
+    return message
+
+
+def load_full_update(match_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        return build_full_update(db, match_id)
+    finally:
+        db.close()
+
+
+def build_ball_patch(state: InningsState, ball_record: BallByBall) -> dict:
+    score_columns = state.score_columns()
+    batting_score = MatchScoreResponse(
+        id=state.score_id,
+        match_id=state.match_id,
+        team_id=state.batting_team_id,
+        team_name=state.team_names.get(state.batting_team_id),
+        **score_columns
+    )
+
+    ball = BallByBallResponse(
+        id=ball_record.id,
+        match_id=ball_record.match_id,
+        over_number=ball_record.over_number - state.over_offset,
+        ball_number=ball_record.ball_number,
+        batsman_id=ball_record.batsman_id,
+        batsman_name=state.player_names.get(ball_record.batsman_id),
+        bowler_id=ball_record.bowler_id,
+        bowler_name=state.player_names.get(ball_record.bowler_id),
+        runs=ball_record.runs,
+        is_wicket=ball_record.is_wicket,
+        wicket_type=ball_record.wicket_type,
+        dismissed_batsman_id=ball_record.dismissed_batsman_id,
+        dismissed_batsman_name=state.player_names.get(ball_record.dismissed_batsman_id),
+        is_wide=ball_record.is_wide,
+        is_no_ball=ball_record.is_no_ball,
+        is_bye=ball_record.is_bye,
+        is_leg_bye=ball_record.is_leg_bye,
+        is_four=ball_record.is_four,
+        is_six=ball_record.is_six,
+        commentary=ball_record.commentary,
+        created_at=ball_record.created_at
+    )
+
+    player_stats = []
+    for tally in state.dirty_players():
+        columns = tally.as_columns()
+        player_stats.append(PlayerStatsPatch(
+            **{field: columns.get(field) for field in PlayerStatsPatch.model_fields}
+        ))
+
+    over_number, current_ball = state.next_ball_position()
+    patch = ScorePatch(
+        match_id=state.match_id,
+        seq=state.ball_count,
+        innings_number=state.innings_number,
+        batting_score=batting_score,
+        ball=ball,
+        player_stats=player_stats,
+        current_batsman_id=state.striker_id,
+        current_batsman_name=state.player_names.get(state.striker_id),
+        current_non_striker_id=state.non_striker_id,
+        current_non_striker_name=state.player_names.get(state.non_striker_id),
+        current_bowler_id=state.bowler_id,
+        current_bowler_name=state.player_names.get(state.bowler_id),
+        current_over=over_number - state.over_offset,
+        current_ball=current_ball,
+        needs_bowler_selection=state.legal_balls_in_over >= 6,
+        win_probability=live_win_probability(
+            state.match_id, state.ball_count, state.innings_number,
+            state.runs, state.wickets, state.balls, state.max_overs, state.target
+        )
+    )
+    return patch.model_dump(mode="json")
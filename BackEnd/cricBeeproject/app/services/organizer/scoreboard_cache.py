@@ -0,0 +1,186 @@
+"""
+Serialized live scoreboards shared by every worker through Redis.
+
+The scoring write path (toss, start, each ball, innings end, batsmen/bowler
+selection, completion) rebuilds the snapshot right after it commits, so
+fan reads are one Redis read instead of a get_live_scoreboard rebuild.
+Each snapshot is kept twice: full, and lite (all_balls left empty).
+A snapshot is versioned by seq (balls recorded) and the match's
+state_version (bumped by every innings or player change), and only a
+strictly newer rebuild replaces it, so a rebuild that loses a race with a
+ball or a bowler change can never leave the older scoreboard in place.
+
+The async variants build snapshots in a threadpool thread on their own
+session: the rebuild is sync queries plus serialization and the
+win-probability estimate, none of which may run on the event loop.
+"""
+import hashlib
+import logging
+from typing import Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.redis_config import RedisClient, get_redis
+from app.db.session import SessionLocal
+from app.models.organizer.fixture import Match
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TTL_SECONDS = 6 * 60 * 60
+
+# Stores the snapshot only if its (seq, state_version) is newer than the one Redis holds.
+# With ARGV[5] = '1' (a reader filling a miss) it never replaces an existing one.
+_STORE_IF_NEWER = """
+local current = redis.call('HMGET', KEYS[1], 'seq', 'state_version')
+if current[1] then
+    if ARGV[5] == '1' then
+        return 0
+    end
+    local seq, new_seq = tonumber(current[1]), tonumber(ARGV[1])
+    local version, new_version = tonumber(current[2] or '-1'), tonumber(ARGV[8])
+    if seq > new_seq or (seq == new_seq and version >= new_version) then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[1], 'seq', ARGV[1], 'state_version', ARGV[8], 'etag', ARGV[2], 'body', ARGV[3], 'lite_etag', ARGV[6], 'lite_body', ARGV[7])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+def get_snapshot_key(match_id: int) -> str:
+    return f"scoreboard:{match_id}"
+
+
+class ScoreboardSnapshot:
+    def __init__(self, match_id: int, seq: int, etag: str, body: str, state_version: int = 0):
+        self.match_id = match_id
+        self.seq = seq
+        self.etag = etag
+        self.body = body
+        self.state_version = state_version
+
+
+def _snapshot(match_id: int, seq: int, state_version: int, body: str) -> ScoreboardSnapshot:
+    digest = hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+    return ScoreboardSnapshot(match_id, seq, f'"{seq}-{digest}"', body, state_version)
+
+
+def build_scoreboard_snapshots(db: Session, match_id: int) -> Tuple[ScoreboardSnapshot, ScoreboardSnapshot]:
+    """Full and lite snapshots from a single get_live_scoreboard rebuild."""
+    from app.services.organizer.match_score_service import get_live_scoreboard
+
+    # Read before the rebuild, so the snapshot is never labelled newer than what it shows
+    state_version = db.query(Match.state_version).filter(Match.id == match_id).scalar() or 0
+    scoreboard = get_live_scoreboard(db, match_id)
+    seq = scoreboard.seq or 0
+    full = _snapshot(match_id, seq, state_version, scoreboard.model_dump_json())
+    lite = _snapshot(match_id, seq, state_version, scoreboard.model_copy(update={"all_balls": []}).model_dump_json())
+    return full, lite
+
+
+def load_scoreboard_snapshots(match_id: int) -> Tuple[ScoreboardSnapshot, ScoreboardSnapshot]:
+    db = SessionLocal()
+    try:
+        return build_scoreboard_snapshots(db, match_id)
+    finally:
+        db.close()
+
+
+def _store_args(full: ScoreboardSnapshot, lite: ScoreboardSnapshot, only_if_missing: bool) -> tuple:
+    return (
+        _STORE_IF_NEWER, 1, get_snapshot_key(full.match_id),
+        full.seq, full.etag, full.body, SNAPSHOT_TTL_SECONDS,
+        1 if only_if_missing else 0, lite.etag, lite.body, full.state_version
+    )
+
+
+def _store_snapshots(full: ScoreboardSnapshot, lite: ScoreboardSnapshot, only_if_missing: bool = False):
+    try:
+        get_redis().eval(*_store_args(full, lite, only_if_missing))
+    except RedisError as e:
+        logger.error(f"Scoreboard snapshot store failed for match {full.match_id}: {e}")
+
+
+def refresh_scoreboard_snapshot(db: Session, match_id: int):
+    # Called after a scoring write commits; a failure here must not fail the write
+    try:
+        full, lite = build_scoreboard_snapshots(db, match_id)
+    except Exception as e:
+        logger.error(f"Scoreboard snapshot rebuild failed for match {match_id}: {e}")
+        invalidate_scoreboard_snapshot(match_id)
+        return
+
+    _store_snapshots(full, lite)
+
+
+async def refresh_scoreboard_snapshot_async(match_id: int):
+    """refresh_scoreboard_snapshot for async callers, after their write has committed."""
+    redis_client = RedisClient.get_async_client()
+    try:
+        full, lite = await run_in_threadpool(load_scoreboard_snapshots, match_id)
+    except Exception as e:
+        logger.error(f"Scoreboard snapshot rebuild failed for match {match_id}: {e}")
+        try:
+            await redis_client.delete(get_snapshot_key(match_id))
+        except RedisError as e:
+            logger.error(f"Scoreboard snapshot invalidation failed for match {match_id}: {e}")
+        return
+
+    try:
+        await redis_client.eval(*_store_args(full, lite, False))
+    except RedisError as e:
+        logger.error(f"Scoreboard snapshot store failed for match {match_id}: {e}")
+
+
+def invalidate_scoreboard_snapshot(match_id: int):
+    try:
+        get_redis().delete(get_snapshot_key(match_id))
+    except RedisError as e:
+        logger.error(f"Scoreboard snapshot invalidation failed for match {match_id}: {e}")
+
+
+def get_scoreboard_snapshot(db: Session, match_id: int, include_balls: bool = True) -> ScoreboardSnapshot:
+    prefix = "" if include_balls else "lite_"
+    try:
+        seq, etag, body = get_redis().hmget(
+            get_snapshot_key(match_id), "seq", f"{prefix}etag", f"{prefix}body"
+        )
+    except RedisError as e:
+        logger.error(f"Scoreboard snapshot read failed for match {match_id}: {e}")
+        full, lite = build_scoreboard_snapshots(db, match_id)
+        return full if include_balls else lite
+
+    if body is not None:
+        return ScoreboardSnapshot(match_id, int(seq), etag, body)
+
+    # Raises ValueError for an unknown match, like get_live_scoreboard
+    full, lite = build_scoreboard_snapshots(db, match_id)
+    _store_snapshots(full, lite, only_if_missing=True)
+    return full if include_balls else lite
+
+
+async def get_scoreboard_snapshot_async(match_id: int, include_balls: bool = True) -> ScoreboardSnapshot:
+    """get_scoreboard_snapshot for async routes: the async Redis client, and a miss rebuilt in a threadpool thread."""
+    prefix = "" if include_balls else "lite_"
+    redis_client = RedisClient.get_async_client()
+    try:
+        seq, etag, body = await redis_client.hmget(
+            get_snapshot_key(match_id), "seq", f"{prefix}etag", f"{prefix}body"
+        )
+    except RedisError as e:
+        logger.error(f"Scoreboard snapshot read failed for match {match_id}: {e}")
+        full, lite = await run_in_threadpool(load_scoreboard_snapshots, match_id)
+        return full if include_balls else lite
+
+    if body is not None:
+        return ScoreboardSnapshot(match_id, int(seq), etag, body)
+
+    full, lite = await run_in_threadpool(load_scoreboard_snapshots, match_id)
+    try:
+        await redis_client.eval(*_store_args(full, lite, True))
+    except RedisError as e:
+        logger.error(f"Scoreboard snapshot store failed for match {match_id}: {e}")
+    return full if include_balls else lite
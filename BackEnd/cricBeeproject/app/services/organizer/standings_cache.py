@@ -0,0 +1,105 @@
+"""
+Serialized tournament standings shared by every worker through Redis.
+
+The ranked table (point_table_service.get_standings) is serialized once
+per standings version and kept in Redis with its ETag. Every change to a
+tournament's standings bumps tournaments.standings_version in the same
+transaction: match completion, rebuild, reset, initialize, and a club's
+enrollment succeeding or being refunded. A read is a primary-key lookup
+of that version plus one Redis read; the body is only rebuilt when Redis
+holds an older version. Writers that commit here refresh the snapshot
+straight away, so readers rarely rebuild it.
+"""
+import hashlib
+import logging
+from typing import List
+
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from app.core.redis_config import get_redis
+from app.models.organizer.tournament import Tournament
+from app.schemas.organizer.point_table import PointTableResponse
+
+logger = logging.getLogger(__name__)
+
+# Club names are read when a body is built, so this bounds how long a rename takes to show
+SNAPSHOT_TTL_SECONDS = 24 * 60 * 60
+
+# A JSON array of rows, the shape GET /point_table/tournament/{id} has always returned
+_STANDINGS_ROWS = TypeAdapter(List[PointTableResponse])
+
+# Stores the snapshot unless Redis already holds one for the same or a later version
+_STORE_IF_NEWER = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if current and tonumber(current) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'version', ARGV[1], 'etag', ARGV[2], 'body', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+def get_standings_key(tournament_id: int) -> str:
+    return f"standings:{tournament_id}"
+
+
+class StandingsSnapshot:
+    def __init__(self, tournament_id: int, version: int, etag: str, body: str):
+        self.tournament_id = tournament_id
+        self.version = version
+        self.etag = etag
+        self.body = body
+
+
+def build_standings_snapshot(db: Session, tournament_id: int) -> StandingsSnapshot:
+    from app.services.organizer.point_table_service import get_standings
+
+    version, rows = get_standings(db, tournament_id)
+    body = _STANDINGS_ROWS.dump_json(_STANDINGS_ROWS.validate_python(rows)).decode("utf-8")
+    digest = hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+    return StandingsSnapshot(tournament_id, version, f'"{version}-{digest}"', body)
+
+
+def _store_snapshot(snapshot: StandingsSnapshot):
+    try:
+        get_redis().eval(
+            _STORE_IF_NEWER, 1, get_standings_key(snapshot.tournament_id),
+            snapshot.version, snapshot.etag, snapshot.body, SNAPSHOT_TTL_SECONDS
+        )
+    except RedisError as e:
+        logger.error(f"Standings snapshot store failed for tournament {snapshot.tournament_id}: {e}")
+
+
+def refresh_standings(db: Session, tournament_id: int):
+    # Called after a standings write commits; a failure here must not fail the write
+    try:
+        snapshot = build_standings_snapshot(db, tournament_id)
+    except Exception as e:
+        logger.error(f"Standings snapshot rebuild failed for tournament {tournament_id}: {e}")
+        return
+
+    _store_snapshot(snapshot)
+
+
+def get_standings_snapshot(db: Session, tournament_id: int) -> StandingsSnapshot:
+    version = db.query(Tournament.standings_version).filter(Tournament.id == tournament_id).scalar()
+    if version is None:
+        raise ValueError("Tournament not found")
+
+    try:
+        cached_version, etag, body = get_redis().hmget(
+            get_standings_key(tournament_id), "version", "etag", "body"
+        )
+    except RedisError as e:
+        logger.error(f"Standings snapshot read failed for tournament {tournament_id}: {e}")
+        return build_standings_snapshot(db, tournament_id)
+
+    if body is not None and int(cached_version) >= version:
+        return StandingsSnapshot(tournament_id, int(cached_version), etag, body)
+
+    snapshot = build_standings_snapshot(db, tournament_id)
+    _store_snapshot(snapshot)
+    return snapshot
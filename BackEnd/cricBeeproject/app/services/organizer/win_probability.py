@@ -0,0 +1,312 @@
+"""
+Win probability and projected score for a live innings, by Monte Carlo.
+
+Delivery outcomes (dot, 1, 2, 3, 4, 6, wicket, wide or no ball) are counted
+from the ball_by_ball rows of recently completed matches, by tournament
+overs, innings phase (how much of the innings has been bowled) and wickets
+down. Each format's table is smoothed toward the table for all formats,
+which is smoothed toward a generic prior, so a format with little history
+still gives sensible odds.
+
+After each delivery the rest of the innings is simulated from the score
+the scoring path already holds in memory, with NumPy: one array row per
+simulation, one step per delivery. In the first innings the chase is then
+simulated against each simulated total. Simulations run in chunks and
+stop once LATENCY_BUDGET_SECONDS is spent (after at least one chunk), so
+a slow moment costs precision rather than scoring latency.
+
+The tables live in memory on each worker and are rebuilt from the
+database in a background thread every RELOAD_INTERVAL_SECONDS; until the
+first build finishes, the prior alone is used.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.organizer.fixture import Match
+from app.models.organizer.match_score import BallByBall
+from app.models.organizer.tournament import TournamentDetails
+
+logger = logging.getLogger(__name__)
+
+# Outcome columns: dot, 1, 2, 3, 4, 6, wicket, wide or no ball
+OUTCOME_COUNT = 8
+WICKET_OUTCOME = 6
+EXTRA_OUTCOME = 7
+# Not an outcome: what a finished innings "bowls", changing nothing
+NO_OUTCOME = 8
+OUTCOME_RUNS = np.array([0, 1, 2, 3, 4, 6, 0, 1, 0])
+OUTCOME_WICKETS = np.array([0, 0, 0, 0, 0, 0, 1, 0, 0])
+OUTCOME_BALLS = np.array([1, 1, 1, 1, 1, 1, 1, 0, 0])
+# Runs off a legal ball -> outcome column; fives count as fours
+RUNS_OUTCOME = np.array([0, 1, 2, 3, 4, 4, 5])
+
+WICKETS_PER_INNINGS = 10
+PHASES = 4
+# Wickets down -> bucket: 0-2, 3-5, 6-7, 8-9
+WICKET_BUCKETS = np.array([0, 0, 0, 1, 1, 1, 2, 2, 3, 3, 3])
+BUCKET_COUNT = 4
+# Lookup row of a finished innings, after the PHASES * BUCKET_COUNT real ones
+FINISHED_CELL = PHASES * BUCKET_COUNT
+
+PRIOR = np.array([0.36, 0.34, 0.07, 0.005, 0.11, 0.045, 0.045, 0.025])
+PRIOR = PRIOR / PRIOR.sum()
+# Balls of evidence the smoothing is worth in each table cell
+PRIOR_WEIGHT = 60
+
+SIMULATIONS = 2000
+CHUNK_SIZE = 500
+LATENCY_BUDGET_SECONDS = 0.025
+HISTORY_MATCHES = 500
+RELOAD_INTERVAL_SECONDS = 60 * 60
+# Outcome probabilities are resolved to 1/LOOKUP_SIZE, so a draw is one table lookup
+LOOKUP_SIZE = 4096
+# Estimates kept for snapshot rebuilds of the same ball
+RECENT_ESTIMATES = 256
+
+
+def _lookup(probabilities: np.ndarray) -> np.ndarray:
+    """
+    [phase * BUCKET_COUNT + bucket, draw] -> outcome, for draws uniform over LOOKUP_SIZE.
+    The extra last row is for finished innings and always gives NO_OUTCOME.
+    """
+    cumulative = np.cumsum(probabilities.reshape(-1, OUTCOME_COUNT), axis=-1)
+    cumulative /= cumulative[:, -1:]
+    points = (np.arange(LOOKUP_SIZE) + 0.5) / LOOKUP_SIZE
+    rows = [np.minimum(np.searchsorted(row, points, side="right"), OUTCOME_COUNT - 1) for row in cumulative]
+    rows.append(np.full(LOOKUP_SIZE, NO_OUTCOME))
+    return np.stack(rows).astype(np.intp)
+
+
+def prior_tables() -> Dict[Optional[int], np.ndarray]:
+    return {None: _lookup(np.broadcast_to(PRIOR, (PHASES, BUCKET_COUNT, OUTCOME_COUNT)).copy())}
+
+
+def load_history(db: Session) -> np.ndarray:
+    """Deliveries of recent completed matches: overs, innings key, illegal, wicket, runs; in bowling order."""
+    recent = db.query(Match.id).filter(
+        Match.match_status == 'completed'
+    ).order_by(Match.id.desc()).limit(HISTORY_MATCHES).subquery()
+
+    rows = db.query(
+        TournamentDetails.overs,
+        BallByBall.match_id * 2 + BallByBall.innings_no,
+        BallByBall.is_wide | BallByBall.is_no_ball,
+        BallByBall.is_wicket,
+        BallByBall.runs
+    ).join(
+        recent, recent.c.id == BallByBall.match_id
+    ).join(
+        Match, Match.id == BallByBall.match_id
+    ).join(
+        TournamentDetails, TournamentDetails.tournament_id == Match.tournament_id
+    ).order_by(
+        BallByBall.match_id, BallByBall.innings_no, BallByBall.id
+    ).all()
+    return np.array(rows, dtype=np.int64).reshape(-1, 5)
+
+
+def build_tables(history: np.ndarray) -> Dict[Optional[int], np.ndarray]:
+    """Outcome lookups (see _lookup) per tournament overs, and for all formats (None)."""
+    tables = prior_tables()
+    if not len(history):
+        return tables
+    overs, innings, illegal, wicket, runs = history.T
+    illegal = illegal.astype(bool)
+    wicket = wicket.astype(bool)
+
+    outcome = RUNS_OUTCOME[np.clip(runs, 0, 6)]
+    outcome[wicket & ~illegal] = WICKET_OUTCOME
+    outcome[illegal] = EXTRA_OUTCOME
+
+    # Wickets and legal balls before each delivery, counted within its innings
+    starts = np.r_[True, innings[1:] != innings[:-1]]
+    group = np.cumsum(starts) - 1
+    wickets_before = np.cumsum(wicket) - wicket
+    wickets_before -= wickets_before[starts][group]
+    legal = ~illegal
+    balls_before = np.cumsum(legal) - legal
+    balls_before -= balls_before[starts][group]
+
+    phase = np.minimum(balls_before * PHASES // np.maximum(overs * 6, 1), PHASES - 1)
+    bucket = WICKET_BUCKETS[np.minimum(wickets_before, WICKETS_PER_INNINGS - 1)]
+    cell = (phase * BUCKET_COUNT + bucket) * OUTCOME_COUNT + outcome
+    size = PHASES * BUCKET_COUNT * OUTCOME_COUNT
+
+    def smoothed(counts: np.ndarray, base: np.ndarray) -> np.ndarray:
+        counts = counts.reshape(PHASES, BUCKET_COUNT, OUTCOME_COUNT)
+        return (counts + PRIOR_WEIGHT * base) / (counts.sum(axis=-1, keepdims=True) + PRIOR_WEIGHT)
+
+    pooled = smoothed(np.bincount(cell, minlength=size), PRIOR)
+    tables[None] = _lookup(pooled)
+    for format_overs in np.unique(overs):
+        counts = np.bincount(cell[overs == format_overs], minlength=size)
+        tables[int(format_overs)] = _lookup(smoothed(counts, pooled))
+    return tables
+
+
+def _cells(max_balls: int) -> np.ndarray:
+    """Innings position (legal balls * 11 + wickets) -> offset of its lookup row; the end maps to the finished row."""
+    phase = np.minimum(np.arange(max_balls + 1) * PHASES // max(max_balls, 1), PHASES - 1)
+    cells = phase[:, None] * BUCKET_COUNT + WICKET_BUCKETS[None, :]
+    cells[max_balls, :] = FINISHED_CELL
+    cells[:, WICKETS_PER_INNINGS] = FINISHED_CELL
+    return cells.ravel() * LOOKUP_SIZE
+
+
+def simulate_innings(
+    table: np.ndarray,
+    rng: np.random.Generator,
+    simulations: int,
+    runs: int,
+    wickets: int,
+    balls: int,
+    max_balls: int,
+    targets: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Final runs of each simulated innings: to the last ball, ten wickets, or its target."""
+    # Flat lookups with take: much cheaper per step than indexing with several arrays
+    lookup = table.ravel()
+    cells = _cells(max_balls)
+    finished = FINISHED_CELL * LOOKUP_SIZE
+    position_steps = OUTCOME_BALLS * (WICKETS_PER_INNINGS + 1) + OUTCOME_WICKETS
+
+    runs = np.full(simulations, runs, dtype=np.int64)
+    position = np.full(
+        simulations,
+        min(balls, max_balls) * (WICKETS_PER_INNINGS + 1) + min(wickets, WICKETS_PER_INNINGS),
+        dtype=np.int64
+    )
+    # Wides and no balls make an innings longer than its legal balls; bounded all the same
+    steps = 2 * max(max_balls - balls, 0) + 12
+    draws = rng.integers(0, LOOKUP_SIZE, size=(steps, simulations))
+    for step in range(steps):
+        cell = cells.take(position)
+        if targets is not None:
+            cell = np.where(runs < targets, cell, finished)
+        if step % 6 == 0 and (cell == finished).all():
+            break
+        outcome = lookup.take(cell + draws[step])
+        runs += OUTCOME_RUNS.take(outcome)
+        position += position_steps.take(outcome)
+    return runs
+
+
+def estimate(
+    table: np.ndarray,
+    innings_number: int,
+    runs: int,
+    wickets: int,
+    balls: int,
+    max_overs: int,
+    target: Optional[int],
+    seed: List[int]
+) -> dict:
+    """Outcome odds for the batting team, and its projected total, within the latency budget."""
+    rng = np.random.default_rng(seed)
+    max_balls = max_overs * 6
+    started = time.perf_counter()
+    totals = []
+    batting_wins = 0
+    ties = 0
+    done = 0
+    while done < SIMULATIONS:
+        finals = simulate_innings(
+            table, rng, CHUNK_SIZE, runs, wickets, balls, max_balls,
+            np.full(CHUNK_SIZE, target) if innings_number == 2 and target else None
+        )
+        if innings_number == 2 and target:
+            batting_wins += int((finals >= target).sum())
+            ties += int((finals == target - 1).sum())
+        else:
+            chase = simulate_innings(table, rng, CHUNK_SIZE, 0, 0, 0, max_balls, finals + 1)
+            batting_wins += int((chase < finals).sum())
+            ties += int((chase == finals).sum())
+        totals.append(finals)
+        done += CHUNK_SIZE
+        if time.perf_counter() - started > LATENCY_BUDGET_SECONDS:
+            break
+
+    totals = np.concatenate(totals)
+    low, median, high = np.percentile(totals, [10, 50, 90])
+    return {
+        "batting_team_win": round(batting_wins / done, 3),
+        "bowling_team_win": round((done - batting_wins - ties) / done, 3),
+        "tie": round(ties / done, 3),
+        "projected_score": int(round(float(median))),
+        "projected_score_low": int(low),
+        "projected_score_high": int(high),
+        "simulations": done
+    }
+
+
+class WinProbabilityModel:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = prior_tables()
+        self._loaded_at: Optional[float] = None
+        self._reloading = False
+        # match_id -> (seq, estimate): a snapshot rebuilt for the same ball reuses the patch's numbers
+        self._recent: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def reload(self, db: Session):
+        tables = build_tables(load_history(db))
+        with self._lock:
+            self._tables = tables
+            self._loaded_at = time.monotonic()
+
+    def _reload_in_background(self):
+        db = SessionLocal()
+        try:
+            self.reload(db)
+        except Exception as e:
+            logger.error(f"Win probability tables reload failed: {e}")
+            with self._lock:
+                # Try again after the usual interval rather than on every ball
+                self._loaded_at = time.monotonic()
+        finally:
+            db.close()
+            self._reloading = False
+
+    def table_for(self, max_overs: int) -> np.ndarray:
+        with self._lock:
+            stale = self._loaded_at is None or time.monotonic() - self._loaded_at > RELOAD_INTERVAL_SECONDS
+            if stale and not self._reloading:
+                self._reloading = True
+                threading.Thread(target=self._reload_in_background, daemon=True).start()
+            return self._tables.get(max_overs, self._tables[None])
+
+    def estimate(
+        self,
+        match_id: int,
+        seq: int,
+        innings_number: int,
+        runs: int,
+        wickets: int,
+        balls: int,
+        max_overs: int,
+        target: Optional[int]
+    ) -> dict:
+        with self._lock:
+            recent = self._recent.get(match_id)
+        if recent is not None and recent[0] == seq:
+            return recent[1]
+
+        result = estimate(
+            self.table_for(max_overs), innings_number, runs, wickets, balls, max_overs, target, [match_id, seq]
+        )
+        with self._lock:
+            self._recent[match_id] = (seq, result)
+            self._recent.move_to_end(match_id)
+            while len(self._recent) > RECENT_ESTIMATES:
+                self._recent.popitem(last=False)
+        return result
+
+
+win_probability_model = WinProbabilityModel()
@@ -1,8 +1,10 @@
 
+from . import career_stats_service
 from . import player_service
 from . import player_management_service
 
 __all__ = [
+    "career_stats_service",
     "player_service",
     "player_management_service",
 ]
@@ -0,0 +1,223 @@
+"""
+Career batting and bowling figures for each player.
+
+A player's player_career_stats row holds running totals, so reading a
+career is one primary-key lookup however many matches they have played;
+averages, strike rates and economy are worked out from the totals on read.
+
+apply_completed_matches adds matches to their players' totals. It runs in
+the transaction that completes a match, and claims
+matches.career_stats_applied in that transaction too, so a match is
+counted exactly once whether it arrives through completion or through
+backfill_career_stats. The backfill walks completed matches that were never
+added, BATCH_SIZE at a time, committing after each batch, so it can be
+stopped and run again at any point.
+"""
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.organizer.fixture import Match
+from app.models.organizer.match_score import PlayerMatchStats
+from app.models.player import PlayerCareerStats, PlayerProfile
+from app.schemas.player import PlayerCareerStatsResponse
+from app.services.organizer.innings_state import as_rate, balls_from_overs, overs_from_balls, rate_per_over
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+COUNTERS = (
+    "matches", "batting_innings", "not_outs", "runs", "balls_faced", "fours", "sixes",
+    "fifties", "hundreds", "ducks", "bowling_innings", "balls_bowled", "maidens",
+    "runs_conceded", "wickets", "five_wicket_hauls",
+)
+
+
+def _new_career(player_id: int) -> PlayerCareerStats:
+    return PlayerCareerStats(
+        player_id=player_id,
+        highest_score=None,
+        highest_score_not_out=False,
+        best_bowling_wickets=None,
+        best_bowling_runs=None,
+        **{field: 0 for field in COUNTERS}
+    )
+
+
+def _lock_careers(db: Session, player_ids: List[int]) -> Dict[int, PlayerCareerStats]:
+    # Always locked in player order, so concurrent completions can't deadlock
+    careers = {
+        career.player_id: career
+        for career in db.query(PlayerCareerStats).filter(
+            PlayerCareerStats.player_id.in_(player_ids)
+        ).order_by(PlayerCareerStats.player_id).with_for_update().all()
+    }
+    for player_id in sorted(set(player_ids) - set(careers)):
+        try:
+            with db.begin_nested():
+                career = _new_career(player_id)
+                db.add(career)
+        except IntegrityError:
+            # A concurrent completion created it first
+            career = db.query(PlayerCareerStats).filter(
+                PlayerCareerStats.player_id == player_id
+            ).with_for_update().one()
+        careers[player_id] = career
+    return careers
+
+
+def _add_match(career: PlayerCareerStats, stat) -> None:
+    career.matches += 1
+
+    # The playing XI all get a row when the match starts; only those who faced a ball or were out batted
+    if stat.balls_faced > 0 or stat.is_out:
+        career.batting_innings += 1
+        career.not_outs += 0 if stat.is_out else 1
+        career.runs += stat.runs
+        career.balls_faced += stat.balls_faced
+        career.fours += stat.fours
+        career.sixes += stat.sixes
+        if stat.runs >= 100:
+            career.hundreds += 1
+        elif stat.runs >= 50:
+            career.fifties += 1
+        if stat.runs == 0 and stat.is_out:
+            career.ducks += 1
+        if (
+            career.highest_score is None
+            or stat.runs > career.highest_score
+            or (stat.runs == career.highest_score and not stat.is_out)
+        ):
+            career.highest_score = stat.runs
+            career.highest_score_not_out = not stat.is_out
+
+    balls_bowled = balls_from_overs(stat.overs_bowled)
+    if balls_bowled > 0:
+        career.bowling_innings += 1
+        career.balls_bowled += balls_bowled
+        career.maidens += stat.maidens
+        career.runs_conceded += stat.runs_conceded
+        career.wickets += stat.wickets_taken
+        if stat.wickets_taken >= 5:
+            career.five_wicket_hauls += 1
+        if (
+            career.best_bowling_wickets is None
+            or stat.wickets_taken > career.best_bowling_wickets
+            or (stat.wickets_taken == career.best_bowling_wickets and stat.runs_conceded < career.best_bowling_runs)
+        ):
+            career.best_bowling_wickets = stat.wickets_taken
+            career.best_bowling_runs = stat.runs_conceded
+
+
+def apply_completed_matches(db: Session, match_ids: List[int]) -> List[int]:
+    """
+    Add completed matches to their players' career totals; matches already
+    added are skipped. Returns the ids added. The caller commits.
+    """
+    claimed = [
+        row.id for row in db.query(Match.id).filter(
+            Match.id.in_(match_ids),
+            Match.match_status == 'completed',
+            Match.career_stats_applied.is_(False)
+        ).order_by(Match.id).with_for_update().all()
+    ]
+    if not claimed:
+        return []
+
+    db.query(Match).filter(Match.id.in_(claimed)).update(
+        {Match.career_stats_applied: True}, synchronize_session=False
+    )
+
+    stats = db.query(
+        PlayerMatchStats.player_id,
+        PlayerMatchStats.runs,
+        PlayerMatchStats.balls_faced,
+        PlayerMatchStats.fours,
+        PlayerMatchStats.sixes,
+        PlayerMatchStats.is_out,
+        PlayerMatchStats.overs_bowled,
+        PlayerMatchStats.maidens,
+        PlayerMatchStats.runs_conceded,
+        PlayerMatchStats.wickets_taken
+    ).filter(
+        PlayerMatchStats.match_id.in_(claimed)
+    ).order_by(PlayerMatchStats.match_id, PlayerMatchStats.id).all()
+
+    careers = _lock_careers(db, [stat.player_id for stat in stats])
+    for stat in stats:
+        _add_match(careers[stat.player_id], stat)
+    db.flush()
+    return claimed
+
+
+def backfill_career_stats(db: Session, batch_size: int = BATCH_SIZE) -> dict:
+    """Add every completed match not yet in the career totals, one batch per transaction."""
+    added = 0
+    batches = 0
+    last_match_id = 0
+    while True:
+        batch = [
+            row.id for row in db.query(Match.id).filter(
+                Match.id > last_match_id,
+                Match.match_status == 'completed',
+                Match.career_stats_applied.is_(False)
+            ).order_by(Match.id).limit(batch_size).all()
+        ]
+        if not batch:
+            break
+        last_match_id = batch[-1]
+
+        try:
+            claimed = apply_completed_matches(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        added += len(claimed)
+        batches += 1
+        logger.info(f"Career stats backfill: added {len(claimed)} matches up to match {last_match_id}")
+
+    return {
+        "matches_added": added,
+        "batches": batches
+    }
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[Decimal]:
+    if denominator <= 0:
+        return None
+    return as_rate(Decimal(numerator) / Decimal(denominator))
+
+
+def career_stats_response(player_id: int, career: Optional[PlayerCareerStats]) -> PlayerCareerStatsResponse:
+    if career is None:
+        career = _new_career(player_id)
+
+    best_bowling = None
+    if career.best_bowling_wickets is not None:
+        best_bowling = f"{career.best_bowling_wickets}/{career.best_bowling_runs}"
+
+    return PlayerCareerStatsResponse(
+        player_id=player_id,
+        **{field: getattr(career, field) for field in COUNTERS},
+        highest_score=career.highest_score,
+        highest_score_not_out=career.highest_score_not_out,
+        batting_average=_ratio(career.runs, career.batting_innings - career.not_outs),
+        strike_rate=_ratio(career.runs * 100, career.balls_faced),
+        overs_bowled=overs_from_balls(career.balls_bowled),
+        economy=rate_per_over(career.runs_conceded, career.balls_bowled),
+        bowling_average=_ratio(career.runs_conceded, career.wickets),
+        bowling_strike_rate=_ratio(career.balls_bowled, career.wickets),
+        best_bowling=best_bowling
+    )
+
+
+def get_career_stats(db: Session, player_id: int) -> PlayerCareerStatsResponse:
+    career = db.get(PlayerCareerStats, player_id)
+    if career is None and db.get(PlayerProfile, player_id) is None:
+        raise ValueError("Player profile not found")
+    return career_stats_response(player_id, career)
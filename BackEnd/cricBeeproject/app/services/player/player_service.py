@@ -126,6 +126,8 @@ def get_player_dashboard_data(db: Session, user_id: int):
         PlayerDashboardResponse, PlayerDashboardClub, 
         PlayerDashboardTournament, PlayerDashboardMatch
     )
+    from app.services.player.career_stats_service import career_stats_response
+    from app.models.player import PlayerCareerStats
     
     # Get player profile
     player_profile = db.query(PlayerProfile).filter(PlayerProfile.user_id == user_id).first()
@@ -224,10 +226,13 @@ def get_player_dashboard_data(db: Session, user_id: int):
                 elif match.match_status in ['upcoming', 'live', None]:
                     stats["upcoming_matches"] += 1
     
+    career = db.get(PlayerCareerStats, player_profile.id)
+    
     return PlayerDashboardResponse(
         club=dashboard_club,
         tournaments=tournaments,
         matches=matches,
+        career=career_stats_response(player_profile.id, career),
         stats=stats
     )
 
@@ -0,0 +1,26 @@
+from celery import Celery
+from app.db.session import get_db
+# Tournament relates to Notification, which nothing else here imports when run on its own
+import app.models.notification
+from app.services.player.career_stats_service import BATCH_SIZE, backfill_career_stats
+
+celery_app = Celery('cricbee')
+
+@celery_app.task
+def backfill_player_career_stats(batch_size: int = BATCH_SIZE):
+    """
+    One-shot job: add every completed match that isn't in player_career_stats yet.
+    Matches completed from now on are added as they complete, so this only needs
+    running once after the migration; running it again picks up nothing new.
+    """
+    db = next(get_db())
+    
+    try:
+        return backfill_career_stats(db, batch_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    # python -m app.tasks.career_stats_tasks
+    print(backfill_player_career_stats(BATCH_SIZE))
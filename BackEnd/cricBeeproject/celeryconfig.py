@@ -24,7 +24,7 @@ task_time_limit = 30 * 60  # 30 minutes
 task_soft_time_limit = 25 * 60  # 25 minutes
 
 # Include tasks
-include = ["app.tasks.notification_tasks"]
+include = ["app.tasks.notification_tasks", "app.tasks.career_stats_tasks"]
 
 # Result backend settings
 result_expires = 3600  # 1 hour
@@ -0,0 +1,113 @@
+"""
+In-process stand-in for redis.asyncio.Redis covering publish, pipelines and
+pattern pub/sub, which is all the broadcast backend uses.
+
+Give one FakeRedis to several RedisBroadcastBackend objects to play several
+workers sharing a Redis server. go_down() makes every call fail the way a
+lost connection does, until come_back().
+"""
+import asyncio
+import fnmatch
+from typing import Optional, Set
+
+from redis.exceptions import ConnectionError
+
+
+class FakeRedis:
+    def __init__(self):
+        self._pubsubs: Set["FakePubSub"] = set()
+        self.down = False
+
+    def go_down(self):
+        self.down = True
+        for pubsub in list(self._pubsubs):
+            pubsub.lost = True
+            # Wake a listener waiting on this subscription so it sees the loss
+            pubsub.queue.put_nowait(None)
+        self._pubsubs.clear()
+
+    def come_back(self):
+        self.down = False
+
+    def check(self):
+        if self.down:
+            raise ConnectionError("Connection refused")
+
+    async def publish(self, channel: str, data: str) -> int:
+        self.check()
+        receivers = 0
+        for pubsub in list(self._pubsubs):
+            pattern = pubsub.match(channel)
+            if pattern is not None:
+                pubsub.queue.put_nowait({"type": "pmessage", "pattern": pattern, "channel": channel, "data": data})
+                receivers += 1
+        return receivers
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "FakePubSub":
+        return FakePubSub(self)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._pubsubs)
+
+    async def aclose(self):
+        self._pubsubs.clear()
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+
+    def publish(self, channel: str, data: str) -> "FakePipeline":
+        self.commands.append((channel, data))
+        return self
+
+    async def execute(self) -> list:
+        self.redis.check()
+        commands, self.commands = self.commands, []
+        return [await self.redis.publish(channel, data) for channel, data in commands]
+
+
+class FakePubSub:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.patterns: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # Set when the server goes away under this subscription
+        self.lost = False
+
+    async def psubscribe(self, *patterns: str):
+        self.redis.check()
+        self.patterns.update(patterns)
+        self.redis._pubsubs.add(self)
+
+    async def punsubscribe(self, *patterns: str):
+        self.patterns.difference_update(patterns or set(self.patterns))
+
+    def match(self, channel: str) -> Optional[str]:
+        for pattern in self.patterns:
+            if fnmatch.fnmatchcase(channel, pattern):
+                return pattern
+        return None
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: Optional[float] = 0.0):
+        try:
+            message = None if self.lost else await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if self.lost:
+            raise ConnectionError("Connection closed by server")
+        return message
+
+    async def aclose(self):
+        self.redis._pubsubs.discard(self)
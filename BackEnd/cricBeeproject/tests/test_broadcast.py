@@ -0,0 +1,215 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.broadcast import (
+    CHANNEL_PREFIX,
+    MemoryBroadcastBackend,
+    RedisBroadcastBackend,
+    create_broadcast_backend,
+    topic_channel,
+)
+from app.core.websocket_manager import ConnectionManager, chat_topic
+from tests.fake_redis import FakeRedis
+
+
+class Inbox:
+    """Event handler recording what a worker received."""
+
+    def __init__(self):
+        self.events = []
+
+    async def __call__(self, topic, event):
+        self.events.append((topic, event))
+
+
+async def wait_until(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def redis_worker(redis):
+    backend = RedisBroadcastBackend(client=redis)
+    backend.RECONNECT_DELAY_SECONDS = 0.01
+    backend.MAX_RECONNECT_DELAY_SECONDS = 0.05
+    return backend
+
+
+def test_memory_backend_delivers_to_its_own_handler():
+    async def scenario():
+        backend = MemoryBroadcastBackend()
+        inbox = Inbox()
+        await backend.start(inbox)
+        await backend.publish("score:1", {"event": "score", "patch": {"r": 4}})
+        await backend.publish_many([("chat:1", {"n": 1}), ("chat:1", {"n": 2})])
+        await backend.stop()
+        await backend.publish("score:1", {"event": "score", "patch": {"r": 6}})
+        return inbox.events
+
+    assert asyncio.run(scenario()) == [
+        ("score:1", {"event": "score", "patch": {"r": 4}}),
+        ("chat:1", {"n": 1}),
+        ("chat:1", {"n": 2}),
+    ]
+
+
+def test_redis_backend_delivers_across_workers():
+    async def scenario():
+        redis = FakeRedis()
+        worker_a, worker_b = redis_worker(redis), redis_worker(redis)
+        inbox_a, inbox_b = Inbox(), Inbox()
+        await worker_a.start(inbox_a)
+        await worker_b.start(inbox_b)
+        try:
+            await worker_a.publish("score:7", {"event": "score", "patch": {"r": 1}})
+            await wait_until(lambda: inbox_a.events and inbox_b.events)
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+        return inbox_a.events, inbox_b.events, redis.subscribers
+
+    events_a, events_b, subscribers = asyncio.run(scenario())
+    assert events_a == events_b == [("score:7", {"event": "score", "patch": {"r": 1}})]
+    assert subscribers == 0
+
+
+def test_redis_backend_publish_many_keeps_order_across_workers():
+    async def scenario():
+        redis = FakeRedis()
+        worker_a, worker_b = redis_worker(redis), redis_worker(redis)
+        inbox_b = Inbox()
+        await worker_a.start(Inbox())
+        await worker_b.start(inbox_b)
+        try:
+            await worker_a.publish_many([("score:2", {"n": n}) for n in range(5)] + [("chat:2", {"n": 5})])
+            await wait_until(lambda: len(inbox_b.events) == 6)
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+        return inbox_b.events
+
+    assert asyncio.run(scenario()) == [("score:2", {"n": n}) for n in range(5)] + [("chat:2", {"n": 5})]
+
+
+def test_redis_backend_skips_malformed_messages():
+    async def scenario():
+        redis = FakeRedis()
+        worker = redis_worker(redis)
+        inbox = Inbox()
+        await worker.start(inbox)
+        try:
+            await redis.publish(topic_channel("score:3"), "not json")
+            await redis.publish(topic_channel("score:3"), json.dumps({"n": 1}))
+            await wait_until(lambda: inbox.events)
+        finally:
+            await worker.stop()
+        return inbox.events
+
+    assert asyncio.run(scenario()) == [("score:3", {"n": 1})]
+
+
+def test_redis_backend_falls_back_to_local_delivery_when_redis_is_down():
+    async def scenario():
+        redis = FakeRedis()
+        worker_a, worker_b = redis_worker(redis), redis_worker(redis)
+        inbox_a, inbox_b = Inbox(), Inbox()
+        await worker_a.start(inbox_a)
+        await worker_b.start(inbox_b)
+        try:
+            redis.go_down()
+            await worker_a.publish("score:4", {"n": 1})
+            await worker_a.publish_many([("score:4", {"n": 2}), ("chat:4", {"n": 3})])
+            await asyncio.sleep(0.05)
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+        return inbox_a.events, inbox_b.events
+
+    events_a, events_b = asyncio.run(scenario())
+    assert events_a == [("score:4", {"n": 1}), ("score:4", {"n": 2}), ("chat:4", {"n": 3})]
+    assert events_b == []
+
+
+def test_redis_backend_resubscribes_after_losing_the_connection():
+    async def scenario():
+        redis = FakeRedis()
+        worker_a, worker_b = redis_worker(redis), redis_worker(redis)
+        inbox_b = Inbox()
+        await worker_a.start(Inbox())
+        await worker_b.start(inbox_b)
+        try:
+            redis.go_down()
+            await wait_until(lambda: worker_b._pubsub is None)
+            redis.come_back()
+            await wait_until(lambda: redis.subscribers == 2)
+            await worker_a.publish("chat:5", {"n": 1})
+            await wait_until(lambda: inbox_b.events)
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+        return inbox_b.events
+
+    assert asyncio.run(scenario()) == [("chat:5", {"n": 1})]
+
+
+def test_redis_backend_starts_while_redis_is_down_and_subscribes_later():
+    async def scenario():
+        redis = FakeRedis()
+        redis.go_down()
+        worker_a, worker_b = redis_worker(redis), redis_worker(redis)
+        inbox_b = Inbox()
+        await worker_a.start(Inbox())
+        await worker_b.start(inbox_b)
+        try:
+            assert redis.subscribers == 0
+            redis.come_back()
+            await wait_until(lambda: redis.subscribers == 2)
+            await worker_a.publish("score:6", {"n": 1})
+            await wait_until(lambda: inbox_b.events)
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+        return inbox_b.events
+
+    assert asyncio.run(scenario()) == [("score:6", {"n": 1})]
+
+
+def test_connection_managers_share_events_through_redis():
+    async def scenario():
+        redis = FakeRedis()
+        manager_a = ConnectionManager(backend=redis_worker(redis))
+        manager_b = ConnectionManager(backend=redis_worker(redis))
+        inbox_b = Inbox()
+        manager_b.add_listener(inbox_b)
+        await manager_a.start()
+        await manager_b.start()
+        try:
+            await manager_a.broadcast(chat_topic(9), {"type": "chat", "text": "six!"})
+            await wait_until(lambda: inbox_b.events)
+        finally:
+            await manager_a.stop()
+            await manager_b.stop()
+        return inbox_b.events
+
+    assert asyncio.run(scenario()) == [
+        ("chat:9", {"event": "message", "message": {"type": "chat", "text": "six!"}}),
+    ]
+
+
+def test_create_broadcast_backend_follows_the_environment(monkeypatch):
+    monkeypatch.setenv("BROADCAST_BACKEND", "memory")
+    assert isinstance(create_broadcast_backend(), MemoryBroadcastBackend)
+    monkeypatch.setenv("BROADCAST_BACKEND", "Redis")
+    assert isinstance(create_broadcast_backend(), RedisBroadcastBackend)
+    monkeypatch.setenv("BROADCAST_BACKEND", "kafka")
+    with pytest.raises(ValueError):
+        create_broadcast_backend()
+
+
+def test_topic_channel_is_prefixed():
+    assert topic_channel("score:1") == f"{CHANNEL_PREFIX}score:1"
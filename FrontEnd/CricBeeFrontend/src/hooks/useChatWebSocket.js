@@ -43,6 +43,17 @@ export const useChatWebSocket = (matchId) => {
       ws.onmessage = (event) => {
         try {
           const message = JSON.parse(event.data);
+          // Server heartbeat: answer so the connection isn't reaped as idle
+          if (message.type === 'ping') {
+            ws.send(JSON.stringify({ type: 'pong' }));
+            return;
+          }
+          if (message.type === 'chat_error') {
+            console.warn('Chat message not sent:', message.message);
+            return;
+          }
+          // Chat messages carry no type; typed frames are match events, not chat
+          if (message.type) return;
           setMessages((prev) => {
             // Avoid duplicates
             if (prev.find((m) => m.id === message.id)) {
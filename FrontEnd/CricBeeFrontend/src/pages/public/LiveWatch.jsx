@@ -10,6 +10,36 @@ import { getChatMessages, sendChatMessage } from '@/api/chat';
 import websocketService from '@/services/websocketService';
 import Swal from 'sweetalert2';
 
+// Merge one score_patch (a single ball) into the current scoreboard
+const applyScorePatch = (board, patch) => {
+  if (!board) return board;
+  const updatedStats = new Map(patch.player_stats.map((stat) => [stat.player_id, stat]));
+  const playerStats = board.player_stats.map((stat) =>
+    updatedStats.has(stat.player_id) ? { ...stat, ...updatedStats.get(stat.player_id) } : stat
+  );
+  board.player_stats.forEach((stat) => updatedStats.delete(stat.player_id));
+  playerStats.push(...updatedStats.values());
+
+  return {
+    ...board,
+    seq: patch.seq,
+    innings_number: patch.innings_number,
+    batting_score: { ...board.batting_score, ...patch.batting_score },
+    last_6_balls: [...board.last_6_balls, patch.ball].slice(-6),
+    all_balls: [...board.all_balls, patch.ball],
+    player_stats: playerStats,
+    current_batsman_id: patch.current_batsman_id,
+    current_batsman_name: patch.current_batsman_name,
+    current_non_striker_id: patch.current_non_striker_id,
+    current_non_striker_name: patch.current_non_striker_name,
+    current_bowler_id: patch.current_bowler_id,
+    current_bowler_name: patch.current_bowler_name,
+    current_over: patch.current_over,
+    current_ball: patch.current_ball,
+    needs_bowler_selection: patch.needs_bowler_selection,
+  };
+};
+
 const LiveWatch = () => {
   const params = useParams();
   const navigate = useNavigate();
@@ -25,6 +55,7 @@ const LiveWatch = () => {
   // WebSocket state for real-time score updates
   const [isWebSocketConnected, setIsWebSocketConnected] = useState(false);
   const [lastScoreUpdate, setLastScoreUpdate] = useState(null);
+  const scoreSeqRef = useRef(null);
   
   // Get user from Redux store
   const user = useSelector((state) => state.auth.user);
@@ -77,6 +108,23 @@ const LiveWatch = () => {
           setLastScoreUpdate(new Date());
           
           switch (data.type) {
+            case 'snapshot':
+              scoreSeqRef.current = data.seq;
+              setScoreboard(data.scoreboard);
+              break;
+            case 'score_patch':
+              // Patches before the first snapshot, or already in it, are skipped
+              if (scoreSeqRef.current === null || data.seq <= scoreSeqRef.current) {
+                break;
+              }
+              if (data.seq !== scoreSeqRef.current + 1) {
+                // Missed a ball - ask the server for a fresh snapshot
+                websocketService.sendMessage({ type: 'resync' });
+                break;
+              }
+              scoreSeqRef.current = data.seq;
+              setScoreboard((prev) => applyScorePatch(prev, data));
+              break;
             case 'score_update':
               if (data.scoreboard) {
                 setScoreboard(data.scoreboard);
@@ -4,12 +4,20 @@ class WebSocketService {
     this.reconnectAttempts = 0;
     this.maxReconnectAttempts = 5;
     this.reconnectInterval = 5000;
+    this.matchId = null;
+    this.lastEventSeq = null;
   }
 
   connect(matchId, onMessage, onError, onConnect) {
-    // Get the WebSocket URL
+    if (matchId !== this.matchId) {
+      this.matchId = matchId;
+      this.lastEventSeq = null;
+    }
+
+    // Get the WebSocket URL; on reconnect, ask only for the events missed since the last one seen
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/api/v1/matches/${matchId}/ws`;
+    const since = this.lastEventSeq !== null ? `&since=${this.lastEventSeq}` : '';
+    const wsUrl = `${protocol}//${window.location.host}/api/v1/matches/${matchId}/ws?protocol=delta${since}`;
     
     try {
       this.ws = new WebSocket(wsUrl);
@@ -23,6 +31,14 @@ class WebSocketService {
       this.ws.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
+          // Server heartbeat: answer so the connection isn't reaped as idle
+          if (data.type === 'ping') {
+            this.ws.send(JSON.stringify({ type: 'pong' }));
+            return;
+          }
+          if (typeof data.event_seq === 'number') {
+            this.lastEventSeq = data.event_seq;
+          }
           console.log('WebSocket message received:', data);
           if (onMessage) onMessage(data);
         } catch (error) {
@@ -56,6 +72,8 @@ class WebSocketService {
   }
 
   disconnect() {
+    // Resuming is only for automatic reconnects; a fresh connect starts from a snapshot
+    this.lastEventSeq = null;
     if (this.ws) {
       this.ws.close(1000, 'Client disconnect');
       this.ws = null;